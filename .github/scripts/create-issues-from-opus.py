@@ -1,83 +1,199 @@
 #!/usr/bin/env python3
 """
-🎯 Auto-create GitHub Issues from Opus Max Analysis
+🎯 Sync GitHub Issues with Opus Max Findings
+Reads the typed findings written by opus-max-analyzer.py (opus-findings.jsonl)
+and keeps exactly one issue per finding fingerprint:
+- New findings open an issue, changed ones update it, returning ones reopen it
+- Issues whose finding is gone (from a fully analyzed file) are closed
+- Existing issues are indexed with one paginated list call, so a repeat run
+  with the same findings makes no write requests
 """
 
 import os
-import json
-import requests
+import re
+import sys
+import time
+import random
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
-def create_github_issues():
-    """Create GitHub issues from Opus Max recommendations"""
-    
-    # GitHub API setup
-    github_token = os.getenv('GITHUB_TOKEN')
-    repo = os.getenv('GITHUB_REPOSITORY')
-    
-    if not github_token or not repo:
-        print("❌ GitHub token or repository not found")
-        return
-    
-    # Read Opus Max analysis
-    if not Path('opus-analysis.md').exists():
-        print("❌ No Opus Max analysis found")
-        return
-        
-    with open('opus-analysis.md', 'r') as f:
-        analysis = f.read()
-    
-    # Extract critical issues (simplified - you could make this smarter)
-    lines = analysis.split('\n')
-    critical_issues = []
-    
-    in_critical_section = False
-    for line in lines:
-        if '🚨 Critical Issues' in line:
-            in_critical_section = True
-            continue
-        elif line.startswith('##') and in_critical_section:
-            break
-        elif in_critical_section and line.strip().startswith('-'):
-            critical_issues.append(line.strip()[1:].strip())
-    
-    # Create issues for critical problems
-    headers = {
-        'Authorization': f'token {github_token}',
-        'Accept': 'application/vnd.github.v3+json'
-    }
-    
-    for i, issue_text in enumerate(critical_issues[:3]):  # Max 3 issues
-        issue_data = {
-            'title': f'🤖 Opus Max Alert: {issue_text[:50]}...',
-            'body': f"""## 🚨 Critical Issue Detected by Opus Max
+# Shared GOLDEX modules live at the repository root
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+import goldex_clients
+from opus_findings import FINDINGS_FILE, load_coverage, load_findings
+
+ISSUE_SEVERITIES = ('critical',)
+MAX_OPEN_ISSUES = int(os.getenv('OPUS_MAX_OPEN_ISSUES', '10'))
+SYNC_PARALLEL = int(os.getenv('OPUS_ISSUE_SYNC_PARALLEL', '3'))
+MAX_RETRIES = 5
+PAST_TENSE = {'create': 'Created', 'update': 'Updated', 'reopen': 'Reopened', 'close': 'Closed'}
+INDEX_LABEL = '🤖 opus-max'
+FINGERPRINT_RE = re.compile(r'<!-- opus-fingerprint: (\w+) -->')
 
-**Issue**: {issue_text}
+def issue_for(finding):
+    """Issue payload for one finding (fingerprint kept in a hidden marker)"""
+    return {
+        'title': f"🤖 Opus Max Alert: {finding['title'][:80]}",
+        'body': f"""## 🚨 Critical Issue Detected by Opus Max
 
-**Detected in**: Automated cloud analysis  
-**Priority**: High  
+**Issue**: {finding['title']}
+
+**File**: `{finding['file']}:{finding['line']}`
+**Category**: {finding['category']}
+**Priority**: {finding['severity'].title()}
 **Auto-generated**: Yes
 
-This issue was automatically detected by the Opus Max Cloud Debugger during the latest push.
+{finding['detail']}
 
-### 🔧 Recommended Actions
-1. Review the code mentioned in the issue
-2. Apply the suggested fixes
-3. Test thoroughly before merging
-4. Close this issue once resolved
+### 🔧 Recommended Fix
+{finding.get('fix') or 'Review the code mentioned above and apply a fix.'}
 
 *Generated by Opus Max Cloud Analysis*
+
+<!-- opus-fingerprint: {finding['fingerprint']} -->
 """,
-            'labels': ['🤖 opus-max', '🚨 critical', 'automated']
+        'labels': [INDEX_LABEL, f"🚨 {finding['severity']}", 'automated']
+    }
+
+class GitHubIssues:
+    """Minimal issues API client on the shared pooled session, with rate-limit backoff"""
+
+    def __init__(self, token, repo, api_url=None):
+        self.session = goldex_clients.get_http_session()
+        self.base = f"{(api_url or os.getenv('GITHUB_API_URL', 'https://api.github.com')).rstrip('/')}/repos/{repo}"
+        self.headers = {
+            'Authorization': f'token {token}',
+            'Accept': 'application/vnd.github.v3+json'
         }
-        
-        url = f'https://api.github.com/repos/{repo}/issues'
-        response = requests.post(url, headers=headers, json=issue_data)
-        
-        if response.status_code == 201:
-            print(f"✅ Created issue: {issue_text[:50]}...")
+
+    def request(self, method, url, **kwargs):
+        """Send a request, waiting out primary and secondary rate limits"""
+        for attempt in range(MAX_RETRIES):
+            response = self.session.request(method, url, headers=self.headers,
+                                            timeout=goldex_clients.HTTP_TIMEOUT, **kwargs)
+            if response.status_code not in (403, 429) and response.status_code < 500:
+                return response
+
+            limited = response.status_code == 429 or (
+                response.status_code == 403 and (
+                    'retry-after' in response.headers
+                    or response.headers.get('x-ratelimit-remaining') == '0'
+                    or 'rate limit' in response.text.lower()))
+            if response.status_code == 403 and not limited:
+                return response
+            if attempt == MAX_RETRIES - 1:
+                return response
+
+            if 'retry-after' in response.headers:
+                delay = float(response.headers['retry-after'])
+            elif response.headers.get('x-ratelimit-remaining') == '0':
+                delay = max(0.0, float(response.headers.get('x-ratelimit-reset', 0)) - time.time()) + 1
+            else:
+                # Secondary limits without a hint: wait at least a minute between tries
+                delay = (60 if limited else 2 ** attempt) * (1 + random.random() / 2)
+            print(f"⏳ GitHub {response.status_code}, retrying in {delay:.0f}s")
+            time.sleep(delay)
+        return response
+
+    def index(self):
+        """fingerprint -> issue for every issue this tool has filed (open or closed)"""
+        issues = {}
+        url = f"{self.base}/issues"
+        params = {'labels': INDEX_LABEL, 'state': 'all', 'per_page': 100,
+                  'sort': 'created', 'direction': 'asc'}
+        while url:
+            response = self.request('GET', url, params=params)
+            response.raise_for_status()
+            for issue in response.json():
+                match = FINGERPRINT_RE.search(issue.get('body') or '')
+                if match and 'pull_request' not in issue:
+                    # Keep the lowest number if a fingerprint was ever filed twice
+                    issues.setdefault(match.group(1), issue)
+            url = response.links.get('next', {}).get('url')
+            params = None  # the next link already carries the query
+        return issues
+
+    def create(self, payload):
+        return self.request('POST', f"{self.base}/issues", json=payload)
+
+    def update(self, number, payload):
+        return self.request('PATCH', f"{self.base}/issues/{number}", json=payload)
+
+def plan_sync(findings, existing, coverage):
+    """Work list of (action, issue number, payload, finding title)"""
+    wanted = {}
+    for finding in findings:
+        if finding['severity'] in ISSUE_SEVERITIES:
+            wanted.setdefault(finding['fingerprint'], finding)
+
+    analyzed = set(coverage['analyzed'])
+    open_count = sum(1 for fp, issue in existing.items() if issue['state'] == 'open' and fp in wanted)
+    actions = []
+    for fp, finding in wanted.items():
+        payload = issue_for(finding)
+        issue = existing.get(fp)
+        if issue is None:
+            if open_count >= MAX_OPEN_ISSUES:
+                continue
+            open_count += 1
+            actions.append(('create', None, payload, finding['title']))
+        elif issue['state'] != 'open':
+            # A maintainer closing it as "not planned" is final
+            if issue.get('state_reason') == 'not_planned' or open_count >= MAX_OPEN_ISSUES:
+                continue
+            open_count += 1
+            actions.append(('reopen', issue['number'], {**payload, 'state': 'open'}, finding['title']))
+        elif issue['title'] != payload['title'] or (issue.get('body') or '').strip() != payload['body'].strip():
+            # Same finding, new line number or wording: refresh in place
+            actions.append(('update', issue['number'],
+                            {'title': payload['title'], 'body': payload['body']}, finding['title']))
+
+    for fp, issue in existing.items():
+        if issue['state'] != 'open' or fp in wanted:
+            continue
+        # Only close when this run fully reviewed the file (or it was deleted)
+        match = re.search(r'\*\*File\*\*: `([^`]+?):\d+`', issue.get('body') or '')
+        path = match.group(1) if match else None
+        if path and (path in analyzed or not Path(path).exists()):
+            actions.append(('close', issue['number'],
+                            {'state': 'closed', 'state_reason': 'completed'}, issue['title']))
+    return actions
+
+def sync_github_issues():
+    """Create, update, reopen and close issues so they match the findings"""
+
+    # GitHub API setup
+    github_token = os.getenv('GITHUB_TOKEN')
+    repo = os.getenv('GITHUB_REPOSITORY')
+
+    if not github_token or not repo:
+        print("❌ GitHub token or repository not found")
+        return
+
+    # Read Opus Max findings
+    if not Path(FINDINGS_FILE).exists():
+        print("❌ No Opus Max findings found")
+        return
+
+    github = GitHubIssues(github_token, repo)
+    existing = github.index()
+    actions = plan_sync(load_findings(), existing, load_coverage())
+    print(f"📋 {len(existing)} indexed issues, {len(actions)} changes to apply")
+
+    def apply(action):
+        kind, number, payload, title = action
+        if kind == 'create':
+            response = github.create(payload)
         else:
-            print(f"❌ Failed to create issue: {response.status_code}")
+            response = github.update(number, payload)
+        return kind, title, response.status_code
+
+    with ThreadPoolExecutor(max_workers=max(1, SYNC_PARALLEL)) as pool:
+        for kind, title, status in pool.map(apply, actions):
+            if status in (200, 201):
+                print(f"✅ {PAST_TENSE[kind]} issue: {title[:50]}")
+            else:
+                print(f"❌ Failed to {kind} issue ({status}): {title[:50]}")
 
 if __name__ == "__main__":
-    create_github_issues()
\ No newline at end of file
+    sync_github_issues()
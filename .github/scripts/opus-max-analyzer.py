@@ -5,11 +5,92 @@ GitHub Actions integration for automated Claude-powered code analysis
 """
 
 import os
+import sys
 import json
-import anthropic
 import subprocess
 from pathlib import Path
 
+# Shared GOLDEX modules live at the repository root
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+import goldex_clients
+import goldex_gateway
+from opus_cache import AnalysisCache
+import opus_findings
+import opus_sharder
+
+# Bump when the prompt or response format changes: invalidates every cached review
+PROMPT_VERSION = '3'
+ANALYSIS_MODEL = "claude-3-opus-20240229"
+TOP_ACTIONS = 5
+ANALYSIS_DEADLINE = float(os.getenv('OPUS_SHARD_DEADLINE', '600'))
+ANALYSIS_RETRIES = int(os.getenv('OPUS_SHARD_RETRIES', '4'))
+# The tool_use answer grows with the number of files; claude-3-opus caps output at 4096
+MAX_OUTPUT_TOKENS = int(os.getenv('OPUS_MAX_OUTPUT_TOKENS', '4096'))
+OUTPUT_TOKENS_BASE = 512
+OUTPUT_TOKENS_PER_UNIT = 512
+
+def collect_findings(reviews, units):
+    """Flatten per-unit reviews into findings with absolute file lines"""
+    findings = []
+    for unit_id, review in reviews.items():
+        unit = units[unit_id]
+        for item in review['findings']:
+            finding = {'file': unit['path'],
+                       'line': unit['start_line'] + item['line'] - 1,
+                       **{k: v for k, v in item.items() if k != 'line'}}
+            finding['fingerprint'] = opus_findings.fingerprint(
+                unit['path'], item['category'], item['title'])
+            findings.append(finding)
+
+    # The same issue reported twice (e.g. in overlapping chunks) is kept once
+    unique = {}
+    for finding in sorted(findings, key=opus_findings.sort_key):
+        unique.setdefault(finding['fingerprint'], finding)
+    return sorted(unique.values(), key=opus_findings.sort_key)
+
+def render_report(findings, reviews, units):
+    """Markdown report for PR comments, rendered from the typed findings"""
+    if not reviews:
+        return "No Swift files to analyze."
+
+    def bullet(f):
+        return f"- **{f['severity']}** `{f['file']}:{f['line']}` {f['title']}: {f['detail']}"
+
+    lines = ["## 🚨 Critical Issues Found"]
+    critical = [f for f in findings if f['severity'] == 'critical']
+    lines.extend(bullet(f) for f in critical)
+    if not critical:
+        lines.append("_Nothing found_")
+    lines.append("")
+
+    for key, heading in opus_findings.CATEGORIES:
+        lines.append(f"## {heading}")
+        items = [f for f in findings if f['category'] == key and f['severity'] != 'critical']
+        lines.extend(bullet(f) for f in items)
+        if not items:
+            lines.append("_Nothing found_")
+        lines.append("")
+
+    lines.append("## ⭐ Overall Assessment")
+    scores = [r['score'] for r in reviews.values() if isinstance(r.get('score'), int)]
+    if scores:
+        lines.append(f"Average score **{sum(scores) / len(scores):.1f}/10** across {len(reviews)} "
+                     f"files/chunks, {len(findings)} findings.")
+    for unit_id, review in sorted(reviews.items()):
+        if isinstance(review.get('score'), int) and review['score'] <= 5 and review['summary']:
+            lines.append(f"- `{units[unit_id]['path']}` ({review['score']}/10): {review['summary']}")
+    lines.append("")
+    return "\n".join(lines)
+
+def render_actions(findings):
+    """Top findings with their concrete fixes (no extra model call)"""
+    top = [f for f in findings if f['severity'] in ('critical', 'high')][:TOP_ACTIONS]
+    if not top:
+        return "No critical or high severity findings. 🎉"
+    return "\n".join(f"{i}. **{f['title']}** (`{f['file']}:{f['line']}`, {f['severity']})"
+                     f"{chr(10)}   {f.get('fix') or f['detail']}"
+                     for i, f in enumerate(top, 1))
+
 class OpusMaxCloudDebugger:
     def __init__(self):
         self.api_key = os.getenv('ANTHROPIC_API_KEY')
@@ -17,44 +98,60 @@ class OpusMaxCloudDebugger:
             print("❌ ANTHROPIC_API_KEY not found in secrets!")
             exit(1)
             
-        self.client = anthropic.Anthropic(api_key=self.api_key)
+        self.client = goldex_clients.anthropic_client(self.api_key)
         self.project_path = Path('.')
+        self.cache = AnalysisCache(prompt_version=PROMPT_VERSION, model=ANALYSIS_MODEL)
+        self.reviews = {}
+        self.units = {}
+        self.failed = []
         
-    def get_changed_files(self):
-        """Get list of changed Swift files from git"""
+    def get_swift_files(self):
+        """List every tracked Swift file (the cache decides what is re-analyzed)"""
         try:
-            result = subprocess.run(['git', 'diff', '--name-only', 'HEAD~1'], 
-                                  capture_output=True, text=True)
-            files = result.stdout.strip().split('\n')
-            return [f for f in files if f.endswith('.swift') and Path(f).exists()]
-        except:
-            # Fallback: analyze all Swift files
-            return list(self.project_path.rglob('*.swift'))
-    
-    def analyze_with_opus_max(self, files):
-        """Send files to Claude for Opus Max level analysis"""
-        
-        file_contents = {}
-        for file_path in files[:10]:  # Limit to 10 files to avoid token limits
+            result = subprocess.run(['git', 'ls-files', '-z', '--', '*.swift'],
+                                    capture_output=True, text=True, check=True)
+            files = [f for f in result.stdout.split('\0') if f]
+        except (OSError, subprocess.CalledProcessError):
+            files = [str(p) for p in self.project_path.rglob('*.swift')]
+        return sorted(f for f in files if Path(f).is_file())
+
+    def get_changed_files(self, files):
+        """Split files into cached reviews and units that still need analysis
+
+        Files over the shard budget become declaration-aligned chunks, each
+        cached on its own so editing one view only re-analyzes that chunk.
+        """
+        pending = []
+        for file_path in files:
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    file_contents[str(file_path)] = f.read()
-            except:
+                data = Path(file_path).read_bytes()
+            except OSError:
                 continue
-        
-        if not file_contents:
-            return "No Swift files to analyze."
-            
-        prompt = f"""
+            content = data.decode('utf-8', errors='replace')
+            units = opus_sharder.split_file(file_path, content)
+            for unit in units:
+                self.units[unit['id']] = {'path': unit['path'], 'start_line': unit['start_line']}
+                raw = data if len(units) == 1 else unit['content'].encode()
+                unit['key'] = self.cache.key(raw)
+                review = self.cache.get(unit['key'])
+                if review is not None:
+                    self.reviews[unit['id']] = review
+                else:
+                    pending.append(unit)
+        return pending
+
+    def build_prompt(self, units):
+        """Analysis prompt for one shard of files (or file chunks)"""
+        return f"""
 🚀 OPUS MAX CLOUD ANALYSIS - Planet ProTrader
 
 You are Opus Max, the most advanced SwiftUI debugging AI in the cloud! Analyze these files with MAXIMUM INTELLIGENCE:
 
-FILES TO ANALYZE:
-{json.dumps(list(file_contents.keys()), indent=2)}
+FILES TO ANALYZE (entries ending in :<start>-<end> are line ranges of a larger file):
+{json.dumps([unit['id'] for unit in units], indent=2)}
 
 CODE:
-{chr(10).join([f"=== {path} ==={chr(10)}{content}{chr(10)}" for path, content in file_contents.items()])}
+{chr(10).join([f"=== {unit['id']} ==={chr(10)}{unit['content']}{chr(10)}" for unit in units])}
 
 OPUS MAX ANALYSIS REQUIREMENTS:
 🔍 CRITICAL ISSUES (Fix immediately):
@@ -86,71 +183,84 @@ OPUS MAX ANALYSIS REQUIREMENTS:
 - Firebase connection optimizations
 
 RESPONSE FORMAT:
-## 🚨 Critical Issues Found
-- List urgent problems that need immediate fixing
+Call the record_findings tool exactly once with an entry for EVERY listed file id
+(use the id exactly as listed). Report line numbers within the code shown for that id.
+Severity: critical = crash, build break or data loss; high = user-visible bug or major
+slowdown; medium/low = improvements. Leave findings empty if nothing applies.
 
-## ⚡ Performance Optimizations  
-- Specific improvements for speed/memory
-
-## 🔧 Code Quality Improvements
-- Best practices and modern Swift patterns
+Make it ACTIONABLE and SPECIFIC - like a senior iOS architect reviewing the code!
+"""
 
-## 🎯 Trading Platform Enhancements
-- Domain-specific improvements for trading features
+    def analyze_shard(self, shard):
+        """One Claude request for a shard; returns {unit id: review}
 
-## ⭐ Overall Assessment
-- Rate the code quality (1-10) and provide summary
+        An answer cut off at max_tokens is discarded and the shard re-asked in
+        halves, so every unit eventually gets a complete review (and is cached).
+        """
+        units = shard['units']
+        max_tokens = min(MAX_OUTPUT_TOKENS, OUTPUT_TOKENS_BASE + OUTPUT_TOKENS_PER_UNIT * len(units))
+        # The gateway's anthropic limits (GOLDEX_ANTHROPIC_TPM, ...) pace the shards
+        response = goldex_gateway.call(
+            'anthropic', 'analyze_with_opus_max', client=self.client,
+            deadline=ANALYSIS_DEADLINE, retries=ANALYSIS_RETRIES,
+            model=ANALYSIS_MODEL,
+            max_tokens=max_tokens,
+            temperature=0.3,
+            tools=[opus_findings.FINDINGS_TOOL],
+            tool_choice={"type": "tool", "name": opus_findings.FINDINGS_TOOL['name']},
+            messages=[{"role": "user", "content": self.build_prompt(units)}]
+        )['response']
+        if getattr(response, 'stop_reason', None) == 'max_tokens' and len(units) > 1:
+            half = len(units) // 2
+            print(f"✂️ Answer for {len(units)} units hit max_tokens ({max_tokens}), re-splitting")
+            reviews = {}
+            for part in (units[:half], units[half:]):
+                reviews.update(self.analyze_shard({'units': part, 'tokens': sum(u['tokens'] for u in part)}))
+            return reviews
+        block = next((b for b in response.content if b.type == 'tool_use'), None)
+        files = (block.input.get('files') or []) if block else []
+        return {str(entry.get('file', '')).strip('`'): opus_findings.normalize(entry)
+                for entry in files if isinstance(entry, dict)}
 
-Make it ACTIONABLE and SPECIFIC - like a senior iOS architect reviewing the code!
-"""
+    def analyze_with_opus_max(self, units):
+        """Pack uncached units into token-budgeted shards and analyze them in parallel
 
-        try:
-            response = self.client.messages.create(
-                model="claude-3-opus-20240229",
-                max_tokens=4000,
-                temperature=0.3,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            
-            return response.content[0].text
-        except Exception as e:
-            return f"❌ Opus Max analysis failed: {str(e)}"
-    
-    def generate_action_items(self, analysis):
-        """Generate GitHub Issues from Opus Max analysis"""
-        
-        # Extract critical issues and create actionable items
-        action_prompt = f"""
-Based on this Opus Max analysis, create GitHub issue-ready action items:
+        Returns the typed findings for every unit, cached or fresh.
+        """
+        shards = opus_sharder.pack_shards(units)
+        if shards:
+            print(f"🧩 {len(units)} units packed into {len(shards)} shards "
+                  f"(≤{opus_sharder.SHARD_TOKEN_BUDGET} tokens, "
+                  f"{opus_sharder.MAX_PARALLEL} in parallel)")
 
-ANALYSIS:
-{analysis}
+        for shard, reviews, error in opus_sharder.dispatch(shards, self.analyze_shard):
+            ids = [unit['id'] for unit in shard['units']]
+            if error is not None:
+                print(f"❌ Opus Max analysis failed for {len(ids)} units: {str(error)}")
+                self.failed.extend(ids)
+                continue
 
-Create 3-5 specific, actionable GitHub issues with:
-- Clear title
-- Problem description  
-- Specific solution steps
-- Priority level (High/Medium/Low)
-- Estimated effort (Small/Medium/Large)
+            print(f"🧠 Shard done: {len(ids)} units, ~{shard['tokens']} tokens")
+            for unit in shard['units']:
+                review = reviews.get(unit['id'])
+                if review is None:
+                    # Not reviewed (e.g. response cut off) - retried on the next run
+                    self.failed.append(unit['id'])
+                    continue
+                self.cache.put(unit['key'], review, path=unit['id'])
+                self.reviews[unit['id']] = review
 
-Format as JSON array of issues.
-"""
-        
-        try:
-            response = self.client.messages.create(
-                model="claude-3-haiku-20240307",  # Faster model for this task
-                max_tokens=1500,
-                temperature=0.1,
-                messages=[{"role": "user", "content": action_prompt}]
-            )
-            
-            return response.content[0].text
-        except:
-            return "Could not generate action items"
+        return collect_findings(self.reviews, self.units)
     
-    def save_analysis_results(self, analysis, action_items):
+    def save_analysis_results(self, findings):
         """Save results to files for GitHub Actions to use"""
-        
+        opus_findings.write_findings(findings)
+        failed = {self.units[unit_id]['path'] for unit_id in self.failed}
+        analyzed = {unit['path'] for unit in self.units.values()} - failed
+        opus_findings.write_coverage(analyzed, failed)
+        analysis = render_report(findings, self.reviews, self.units)
+        action_items = render_actions(findings)
+
         # Main analysis file
         with open('opus-analysis.md', 'w') as f:
             f.write(f"""# 🤖 Opus Max Cloud Analysis Results
@@ -169,7 +279,8 @@ Format as JSON array of issues.
 - **Repository**: {os.getenv('GITHUB_REPOSITORY', 'keontapeat/Planet-ProTrader')}
 - **Commit**: {os.getenv('GITHUB_SHA', 'unknown')}
 - **Timestamp**: {subprocess.run(['date'], capture_output=True, text=True).stdout.strip()}
-- **Analyzer**: Opus Max Cloud Debugger v2.0
+- **Findings**: {len(findings)} ({opus_findings.FINDINGS_FILE})
+- **Analyzer**: Opus Max Cloud Debugger v3.0
 
 *Generated automatically by GitHub Actions + Claude Opus Max*
 """)
@@ -185,7 +296,7 @@ Format as JSON array of issues.
 """)
             
         print("✅ Opus Max analysis complete!")
-        print("📁 Results saved to opus-analysis.md")
+        print(f"📁 Results saved to opus-analysis.md and {opus_findings.FINDINGS_FILE}")
 
 def main():
     print("🚀 Starting Opus Max Cloud Analysis...")
@@ -194,16 +305,23 @@ def main():
     
     debugger = OpusMaxCloudDebugger()
     
-    # Get files to analyze
-    changed_files = debugger.get_changed_files()
-    print(f"📊 Analyzing {len(changed_files)} files...")
+    # Only files whose content has no cached review are sent to Claude
+    swift_files = debugger.get_swift_files()
+    changed_files = debugger.get_changed_files(swift_files)
+    print(f"📊 {len(swift_files)} Swift files: {len(debugger.reviews)} units cached, "
+          f"{len(changed_files)} to analyze...")
     
-    # Run Opus Max analysis
-    analysis = debugger.analyze_with_opus_max(changed_files)
-    action_items = debugger.generate_action_items(analysis)
+    # Run Opus Max analysis and merge cached findings back in
+    findings = debugger.analyze_with_opus_max(changed_files)
+    if not debugger.failed:
+        print(f"🧹 Pruned {debugger.cache.prune()} stale cache entries")
+    else:
+        print(f"⚠️ {len(debugger.failed)} units not analyzed - will retry next run")
+    print(f"🗄️ Cache: {debugger.cache.stats()}")
+    goldex_gateway.print_report()
     
     # Save results
-    debugger.save_analysis_results(analysis, action_items)
+    debugger.save_analysis_results(findings)
     
     print("🎉 Opus Max Cloud Analysis Complete!")
 
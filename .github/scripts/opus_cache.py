@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+🗄️ Opus Max Analysis Cache
+Content-addressed store for per-file review results, kept in the GitHub
+Actions cache directory so unchanged files are never sent to Claude again.
+"""
+
+import os
+import json
+import hashlib
+from pathlib import Path
+
+DEFAULT_CACHE_DIR = '.opus-cache'
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class AnalysisCache:
+    """Findings keyed by sha256(prompt version + model + unit content)"""
+
+    def __init__(self, cache_dir=None, prompt_version='1', model=''):
+        self.cache_dir = Path(cache_dir or os.getenv('OPUS_CACHE_DIR', DEFAULT_CACHE_DIR))
+        self.prompt_version = prompt_version
+        self.model = model
+        self.used = set()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, content: bytes) -> str:
+        """Cache key for one analysis unit (a file or a declaration chunk)"""
+        salt = f"{self.prompt_version}\0{self.model}\0".encode()
+        return content_hash(salt + content)
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str):
+        """Cached result for a key, or None"""
+        try:
+            with open(self._path(key), 'r') as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+        self.used.add(key)
+        self.hits += 1
+        return entry['result']
+
+    def put(self, key: str, result, **meta):
+        """Store a result (atomic write so a cancelled job never leaves half a file)"""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({'prompt_version': self.prompt_version, 'model': self.model,
+                       'result': result, **meta}, f)
+        os.replace(tmp_path, path)
+        self.used.add(key)
+
+    def prune(self):
+        """Delete entries not used by this run so the Actions cache stays small
+
+        Only call after a full pass over the repository.
+        """
+        removed = 0
+        if not self.cache_dir.exists():
+            return removed
+        for path in self.cache_dir.glob('*/*.json'):
+            if path.stem not in self.used:
+                path.unlink()
+                removed += 1
+        return removed
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'entries_used': len(self.used)}
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+📋 Opus Max Findings
+Typed findings shared by opus-max-analyzer.py (writer) and
+create-issues-from-opus.py (reader), one JSON object per line:
+
+    {"file": "...", "line": 42, "severity": "critical", "category": "correctness",
+     "title": "...", "detail": "...", "fix": "...", "fingerprint": "..."}
+"""
+
+import os
+import re
+import json
+import hashlib
+
+FINDINGS_FILE = 'opus-findings.jsonl'
+COVERAGE_FILE = 'opus-coverage.json'
+LINE_RE = re.compile(r'\s*L?(\d+)')
+
+SEVERITIES = ['critical', 'high', 'medium', 'low']
+CATEGORIES = [
+    ('correctness', '🐛 Correctness & Crash Risks'),
+    ('performance', '⚡ Performance Optimizations'),
+    ('quality', '🔧 Code Quality Improvements'),
+    ('trading', '🎯 Trading Platform Enhancements'),
+]
+
+# Forced tool call: Claude returns the findings as validated JSON in one response
+FINDINGS_TOOL = {
+    'name': 'record_findings',
+    'description': 'Record the review of every file (or file chunk) in this request.',
+    'input_schema': {
+        'type': 'object',
+        'properties': {
+            'files': {
+                'type': 'array',
+                'items': {
+                    'type': 'object',
+                    'properties': {
+                        'file': {'type': 'string',
+                                 'description': 'File id exactly as listed in the request'},
+                        'score': {'type': 'integer', 'minimum': 1, 'maximum': 10},
+                        'summary': {'type': 'string', 'description': 'One-sentence assessment'},
+                        'findings': {
+                            'type': 'array',
+                            'items': {
+                                'type': 'object',
+                                'properties': {
+                                    'line': {'type': 'integer',
+                                             'description': 'Line number within the listed code'},
+                                    'severity': {'type': 'string', 'enum': SEVERITIES},
+                                    'category': {'type': 'string',
+                                                 'enum': [key for key, _ in CATEGORIES]},
+                                    'title': {'type': 'string', 'description': 'Short, specific title'},
+                                    'detail': {'type': 'string'},
+                                    'fix': {'type': 'string', 'description': 'Concrete fix'},
+                                },
+                                'required': ['line', 'severity', 'category', 'title', 'detail'],
+                            },
+                        },
+                    },
+                    'required': ['file', 'score', 'summary', 'findings'],
+                },
+            },
+        },
+        'required': ['files'],
+    },
+}
+
+
+def fingerprint(path, category, title):
+    """Stable id for a finding: survives line shifts and rewording of the detail"""
+    normalized = re.sub(r'\W+', ' ', title.lower()).strip()
+    return hashlib.sha256(f"{path}\0{category}\0{normalized}".encode()).hexdigest()[:16]
+
+
+def parse_line(value):
+    """Line number from whatever the model sent: 42, "42", "12-14" -> 12, "N/A" -> 1"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return max(1, int(value))
+    match = LINE_RE.match(str(value or ''))
+    return max(1, int(match.group(1))) if match else 1
+
+
+def normalize(review):
+    """Clamp one file review from the model to the schema (bad values dropped)"""
+    categories = {key for key, _ in CATEGORIES}
+    findings = []
+    for item in review.get('findings') or []:
+        if not isinstance(item, dict) or not item.get('title'):
+            continue
+        findings.append({
+            'line': parse_line(item.get('line')),
+            'severity': item.get('severity') if item.get('severity') in SEVERITIES else 'medium',
+            'category': item.get('category') if item.get('category') in categories else 'quality',
+            'title': str(item['title']).strip(),
+            'detail': str(item.get('detail', '')).strip(),
+            'fix': str(item.get('fix', '')).strip(),
+        })
+    return {
+        'score': review.get('score'),
+        'summary': str(review.get('summary', '')).strip(),
+        'findings': findings,
+    }
+
+
+def sort_key(finding):
+    return (SEVERITIES.index(finding['severity']), finding['file'], finding['line'])
+
+
+def write_findings(findings, path=FINDINGS_FILE):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        for finding in sorted(findings, key=sort_key):
+            f.write(json.dumps(finding) + '\n')
+    os.replace(tmp_path, path)
+
+
+def load_findings(path=FINDINGS_FILE):
+    """Findings from a JSONL file (skips blank or truncated lines)"""
+    findings = []
+    with open(path, 'r') as f:
+        for line in f:
+            try:
+                findings.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return findings
+
+
+def write_coverage(analyzed, failed, path=COVERAGE_FILE):
+    """Which files this run fully reviewed (issue sync only closes issues for those)"""
+    with open(path, 'w') as f:
+        json.dump({'analyzed': sorted(analyzed), 'failed': sorted(failed)}, f, indent=2)
+
+
+def load_coverage(path=COVERAGE_FILE):
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {'analyzed': [], 'failed': []}
+    return {'analyzed': data.get('analyzed', []), 'failed': data.get('failed', [])}
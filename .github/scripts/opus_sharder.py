@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+🧩 Opus Max Sharder
+Token-aware packing of Swift files into analysis shards:
+- Estimates tokens per file and packs files into shards under a budget
+  (first-fit decreasing bin packing)
+- Splits oversized files along top-level Swift declaration boundaries
+- Dispatches shards concurrently with bounded parallelism; rate limiting,
+  retries and deadlines come from goldex_gateway, which analyze() calls
+"""
+
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+CHARS_PER_TOKEN = 3.5  # Swift source runs a little denser than prose
+SHARD_TOKEN_BUDGET = int(os.getenv('OPUS_SHARD_TOKENS', '30000'))
+MAX_UNITS_PER_SHARD = int(os.getenv('OPUS_MAX_UNITS_PER_SHARD', '10'))
+MAX_PARALLEL = int(os.getenv('OPUS_MAX_PARALLEL', '4'))
+
+DECLARATION_RE = re.compile(
+    r'^(?:@\w+(?:\([^)]*\))?\s+)*'
+    r'(?:(?:public|private|fileprivate|internal|open|final|static|nonisolated|indirect)\s+)*'
+    r'(?:struct|class|enum|extension|protocol|actor|func|typealias|let|var)\b'
+    r'|^// MARK:'
+)
+PREAMBLE_RE = re.compile(r'^(?://|/\*|\*|@)')
+
+
+def estimate_tokens(text):
+    return int(len(text) / CHARS_PER_TOKEN) + 1
+
+
+def _brace_delta(line, state):
+    """Net brace depth change for a line, skipping strings and comments
+
+    `state` carries whether we are inside a /* block comment */ or a
+    multi-line \"\"\" string across lines.
+    """
+    delta = 0
+    i = 0
+    n = len(line)
+    while i < n:
+        if state['block_comment']:
+            end = line.find('*/', i)
+            if end == -1:
+                return delta
+            state['block_comment'] = False
+            i = end + 2
+            continue
+        if state['multiline_string']:
+            end = line.find('"""', i)
+            if end == -1:
+                return delta
+            state['multiline_string'] = False
+            i = end + 3
+            continue
+
+        ch = line[i]
+        if line.startswith('//', i):
+            return delta
+        if line.startswith('/*', i):
+            state['block_comment'] = True
+            i += 2
+        elif line.startswith('"""', i):
+            state['multiline_string'] = True
+            i += 3
+        elif ch == '"':
+            i += 1
+            while i < n and line[i] != '"':
+                i += 2 if line[i] == '\\' else 1
+            i += 1
+        elif ch == '{':
+            delta += 1
+            i += 1
+        elif ch == '}':
+            delta -= 1
+            i += 1
+        else:
+            i += 1
+    return delta
+
+
+def declaration_boundaries(lines):
+    """Line indexes where a top-level declaration (with its doc comments) starts"""
+    boundaries = []
+    depth = 0
+    state = {'block_comment': False, 'multiline_string': False}
+    for index, line in enumerate(lines):
+        if depth == 0 and not state['block_comment'] and not state['multiline_string']:
+            if DECLARATION_RE.match(line.strip()):
+                start = index
+                # Attach doc comments / attributes directly above the declaration
+                while start > 0 and PREAMBLE_RE.match(lines[start - 1].strip()):
+                    start -= 1
+                if not boundaries or start > boundaries[-1]:
+                    boundaries.append(start)
+        depth = max(0, depth + _brace_delta(line, state))
+    return boundaries
+
+
+def split_file(path, content, max_tokens=SHARD_TOKEN_BUDGET):
+    """One unit per file, or declaration-aligned chunks for oversized files"""
+    if estimate_tokens(content) <= max_tokens:
+        return [{'id': path, 'path': path, 'start_line': 1, 'content': content,
+                 'tokens': estimate_tokens(content)}]
+
+    lines = content.splitlines(keepends=True)
+    cuts = [0] + [b for b in declaration_boundaries(lines) if b > 0] + [len(lines)]
+    segments = [(cuts[i], cuts[i + 1]) for i in range(len(cuts) - 1) if cuts[i] < cuts[i + 1]]
+
+    # A single declaration bigger than the budget is cut on line boundaries
+    pieces = []
+    for start, end in segments:
+        text = ''.join(lines[start:end])
+        if estimate_tokens(text) <= max_tokens:
+            pieces.append((start, end))
+            continue
+        piece_start, size = start, 0
+        for index in range(start, end):
+            line_tokens = estimate_tokens(lines[index])
+            if size + line_tokens > max_tokens and index > piece_start:
+                pieces.append((piece_start, index))
+                piece_start, size = index, 0
+            size += line_tokens
+        pieces.append((piece_start, end))
+
+    # Greedily merge neighbouring pieces back up to the budget (keeps order)
+    chunks = []
+    for start, end in pieces:
+        text = ''.join(lines[start:end])
+        if chunks and chunks[-1]['tokens'] + estimate_tokens(text) <= max_tokens:
+            chunks[-1]['end'] = end
+            chunks[-1]['tokens'] += estimate_tokens(text)
+        else:
+            chunks.append({'start': start, 'end': end, 'tokens': estimate_tokens(text)})
+
+    units = []
+    for chunk in chunks:
+        text = ''.join(lines[chunk['start']:chunk['end']])
+        units.append({
+            'id': f"{path}:{chunk['start'] + 1}-{chunk['end']}",
+            'path': path,
+            'start_line': chunk['start'] + 1,
+            'content': text,
+            'tokens': estimate_tokens(text),
+        })
+    return units
+
+
+def pack_shards(units, budget=SHARD_TOKEN_BUDGET, max_units=MAX_UNITS_PER_SHARD):
+    """First-fit decreasing bin packing of units into shards under the budget"""
+    shards = []
+    for unit in sorted(units, key=lambda u: u['tokens'], reverse=True):
+        for shard in shards:
+            if shard['tokens'] + unit['tokens'] <= budget and len(shard['units']) < max_units:
+                shard['units'].append(unit)
+                shard['tokens'] += unit['tokens']
+                break
+        else:
+            shards.append({'units': [unit], 'tokens': unit['tokens']})
+    for shard in shards:
+        shard['units'].sort(key=lambda u: u['id'])
+    return shards
+
+
+def dispatch(shards, analyze, max_parallel=MAX_PARALLEL):
+    """Run analyze(shard) for every shard concurrently
+
+    Returns [(shard, result or None, error or None)] in completion order.
+    analyze() is expected to go through goldex_gateway, which paces and
+    retries the requests; a shard whose call still fails keeps its error.
+    """
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, max_parallel)) as pool:
+        futures = {pool.submit(analyze, shard): shard for shard in shards}
+        for future in as_completed(futures):
+            shard = futures[future]
+            try:
+                results.append((shard, future.result(), None))
+            except Exception as e:
+                results.append((shard, None, e))
+    return results
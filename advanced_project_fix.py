@@ -12,6 +12,9 @@ import uuid
 import shutil
 from datetime import datetime
 
+import goldex_pbxproj
+from goldex_pbxproj_check import check_project, print_report
+
 class XcodeProjectFixer:
     def __init__(self, project_path):
         self.project_path = project_path
@@ -25,27 +28,19 @@ class XcodeProjectFixer:
         print(f"✅ Backup created: {self.backup_path}")
         
     def read_project_file(self):
-        """Read and parse the project.pbxproj file"""
-        with open(self.pbxproj_path, 'r', encoding='utf-8') as f:
-            return f.read()
+        """Read and parse the project.pbxproj file into an object graph"""
+        return goldex_pbxproj.load(self.pbxproj_path)
     
     def write_project_file(self, content):
-        """Write the fixed content back to project.pbxproj"""
-        with open(self.pbxproj_path, 'w', encoding='utf-8') as f:
+        """Write the fixed content back to project.pbxproj (atomically)"""
+        tmp_path = f"{self.pbxproj_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
             f.write(content)
+        os.replace(tmp_path, self.pbxproj_path)
             
-    def find_duplicate_guids(self, content):
-        """Find duplicate GUID references"""
-        guid_pattern = r'([A-F0-9]{24})\s*='
-        guids = re.findall(guid_pattern, content)
-        
-        # Count occurrences
-        guid_counts = {}
-        for guid in guids:
-            guid_counts[guid] = guid_counts.get(guid, 0) + 1
-            
-        # Find duplicates
-        duplicates = {guid: count for guid, count in guid_counts.items() if count > 1}
+    def find_duplicate_guids(self, graph):
+        """Find GUIDs defined by more than one object (references don't count)"""
+        duplicates = graph.duplicate_ids()
         
         if duplicates:
             print(f"⚠️  Found duplicate GUIDs: {duplicates}")
@@ -58,6 +53,20 @@ class XcodeProjectFixer:
         """Generate a new 24-character hex GUID"""
         return uuid.uuid4().hex.upper()[:24]
     
+    def repair_duplicate_guids(self, graph):
+        """Remap extra definitions (and the references that name them) in one pass"""
+        report = goldex_pbxproj.repair_duplicate_ids(graph)
+        for old_guid, remapped in report['remap'].items():
+            for new_guid, comment in remapped:
+                print(f"🔄 Replaced {old_guid} with {new_guid} ({comment or 'no comment'})")
+        if report['removed']:
+            print(f"🗑️  Removed {report['removed']} pasted copies of existing objects")
+        print(f"🔗 Retargeted {report['retargeted']} references")
+        if report['duplicates'] or report['dangling']:
+            print(f"⚠️  After repair: {len(report['duplicates'])} duplicate ids, "
+                  f"{len(report['dangling'])} dangling references")
+        return report['text']
+    
     def fix_package_references(self, content):
         """Fix malformed package references and dependencies"""
         print("🔧 Fixing package references...")
@@ -76,39 +85,22 @@ class XcodeProjectFixer:
         
         return content
     
-    def regenerate_project_structure(self, content):
-        """Regenerate clean project structure"""
+    def regenerate_project_structure(self, graph):
+        """Section index of the parsed project: section -> object ids"""
         print("🔄 Regenerating project structure...")
         
-        # Define clean project template sections
-        clean_sections = {
-            'PBXBuildFile': [],
-            'PBXFileReference': [],
-            'PBXGroup': [],
-            'PBXNativeTarget': [],
-            'PBXProject': [],
-            'XCRemoteSwiftPackageReference': [],
-            'XCSwiftPackageProductDependency': []
-        }
-        
-        # Extract existing valid sections
-        for section_type in clean_sections.keys():
-            pattern = rf'/\* Begin {section_type} section \*/(.*?)/\* End {section_type} section \*/'
-            match = re.search(pattern, content, re.DOTALL)
-            if match:
-                clean_sections[section_type] = match.group(1).strip()
+        structure = dict(graph.section_objects)
+        for section_type, object_ids in sorted(structure.items()):
+            print(f"   {len(object_ids):5}  {section_type or '(outside sections)'}")
         
-        return content
+        return structure
     
     def validate_project_syntax(self):
-        """Validate project file syntax using plutil"""
-        try:
-            os.system(f'plutil -lint "{self.pbxproj_path}" > /dev/null 2>&1')
-            print("✅ Project file syntax validated")
-            return True
-        except:
-            print("⚠️  Project file has syntax issues")
-            return False
+        """Validate structure and references of the written project file"""
+        # One-shot run: no section cache left behind in the working directory
+        result = check_project(self.pbxproj_path, cache_path=None)
+        print_report(result)
+        return result['ok']
     
     def fix_project(self):
         """Main fix method"""
@@ -120,29 +112,33 @@ class XcodeProjectFixer:
         
         # 2. Read project file
         print("📖 Reading project file...")
-        content = self.read_project_file()
+        try:
+            graph = self.read_project_file()
+        except goldex_pbxproj.PbxprojError as e:
+            print(f"❌ Project file is not parseable ({e}) - restore from backup")
+            return
+        content = graph.text
+        self.regenerate_project_structure(graph)
         
         # 3. Find duplicate GUIDs
-        duplicates = self.find_duplicate_guids(content)
-        
-        # 4. Fix package references
-        content = self.fix_package_references(content)
+        duplicates = self.find_duplicate_guids(graph)
         
-        # 5. Replace duplicate GUIDs with new ones
+        # 4. Replace duplicate GUIDs with new ones (one remap, one rewrite)
         if duplicates:
             print("🔧 Replacing duplicate GUIDs...")
-            for duplicate_guid in duplicates.keys():
-                new_guid = self.generate_new_guid()
-                # Replace all but the first occurrence
-                content = content.replace(duplicate_guid, new_guid, duplicates[duplicate_guid] - 1)
-                print(f"🔄 Replaced {duplicate_guid} with {new_guid}")
+            content = self.repair_duplicate_guids(graph)
+        
+        # 5. Fix package references
+        content = self.fix_package_references(content)
         
         # 6. Write fixed content
         print("💾 Writing fixed project file...")
         self.write_project_file(content)
         
         # 7. Validate
-        self.validate_project_syntax()
+        if not self.validate_project_syntax():
+            print(f"\n⚠️  Project still has issues - backup at {self.backup_path}")
+            return
         
         print("\n🎉 ADVANCED FIX COMPLETE!")
         print("=" * 50)
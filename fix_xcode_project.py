@@ -5,10 +5,12 @@ Fixes corrupted Xcode project with duplicate GUIDs
 """
 import os
 import re
-import uuid
 import shutil
 from datetime import datetime
 
+import goldex_pbxproj
+from goldex_pbxproj_check import check_project, print_report
+
 def fix_xcode_project():
     project_path = "/Users/keonta/Documents/GOLDEX AI copy 23.backup.1752876581/GOLDEX AI.xcodeproj/project.pbxproj"
     
@@ -20,42 +22,31 @@ def fix_xcode_project():
     shutil.copy2(project_path, backup_path)
     print(f"✅ Created backup: {os.path.basename(backup_path)}")
     
-    # Read project file
-    with open(project_path, 'r') as f:
-        content = f.read()
-    
-    print(f"📊 Original file size: {len(content)} characters")
-    
-    # Find and fix duplicate GUIDs
-    guid_pattern = r'[A-F0-9]{24}'
-    guids_found = re.findall(guid_pattern, content)
-    guid_counts = {}
+    # Read and parse project file (one pass builds the object graph)
+    try:
+        graph = goldex_pbxproj.load(project_path)
+    except goldex_pbxproj.PbxprojError as e:
+        print(f"❌ Project file is not parseable: {e}")
+        return
+    content = graph.text
     
-    for guid in guids_found:
-        guid_counts[guid] = guid_counts.get(guid, 0) + 1
+    print(f"📊 Original file size: {len(content)} characters, "
+          f"{len(graph.objects)} objects in {len(graph.sections)} sections")
     
-    duplicates = {guid: count for guid, count in guid_counts.items() if count > 1}
+    # Find and fix duplicate GUIDs (ids defined more than once, not every reference)
+    duplicates = graph.duplicate_ids()
     
     if duplicates:
         print(f"🔍 Found {len(duplicates)} duplicate GUIDs")
         
-        # Replace duplicates with new GUIDs
-        for duplicate_guid in duplicates:
-            # Generate new GUID
-            new_guid = uuid.uuid4().hex[:24].upper()
-            
-            # Replace only subsequent occurrences (keep first one)
-            occurrences = 0
-            def replace_func(match):
-                nonlocal occurrences
-                occurrences += 1
-                if occurrences == 1:
-                    return match.group(0)  # Keep first occurrence
-                else:
-                    return new_guid  # Replace subsequent ones
-            
-            content = re.sub(duplicate_guid, replace_func, content)
-            print(f"✅ Fixed duplicate GUID: {duplicate_guid} → {new_guid}")
+        # One remap table for all duplicates, applied in a single rewrite
+        report = goldex_pbxproj.repair_duplicate_ids(graph)
+        for duplicate_guid, remapped in report['remap'].items():
+            for new_guid, comment in remapped:
+                print(f"✅ Fixed duplicate GUID: {duplicate_guid} → {new_guid} ({comment})")
+        content = report['text']
+        if report['dangling']:
+            print(f"⚠️ {len(report['dangling'])} references point to ids no object defines")
     
     # Fix common Xcode corruption issues
     fixes_applied = []
@@ -95,10 +86,17 @@ def fix_xcode_project():
         f.write(content)
     
     print(f"📊 Fixed file size: {len(content)} characters")
+    # One-shot run: no section cache left behind in the working directory
+    result = check_project(project_path, cache_path=None)
+    print_report(result)
     print(f"🔧 Fixes applied: {len(fixes_applied)}")
     for fix in fixes_applied:
         print(f"   • {fix}")
     
+    if not result['ok']:
+        print(f"\n⚠️ Project still has issues - backup at {os.path.basename(backup_path)}")
+        return
+    
     print("\n🎉 XCODE PROJECT FIXED!")
     print("=" * 50)
     print("✅ Project file corruption resolved")
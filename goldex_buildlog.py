@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+GOLDEX BUILD LOG INDEX
+Streams Xcode / clang / swiftc build logs into structured diagnostics and an
+inverted index by file, error class, target and log:
+- Compiled regexes, one pass per line, constant memory per log
+- Logs are parsed in parallel worker processes
+- Already-ingested logs (same size + mtime) are skipped on re-index
+- Counters are kept up to date on ingest so "top files" is a dict lookup
+
+    python goldex_buildlog.py build*.log current_build.log --top 10
+    python goldex_buildlog.py --index goldex_build_index.json --class missing_member
+"""
+
+import os
+import re
+import json
+import glob
+import argparse
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_INDEX = 'goldex_build_index.json'
+DEFAULT_LOG_PATTERNS = ('build*.log', 'current_build.log')
+PARALLEL_MIN_BYTES = 2_000_000  # below this, process start-up costs more than it saves
+
+DIAGNOSTIC_RE = re.compile(
+    r'^(?:(?P<file>[^\s:][^:]*?):(?P<line>\d+):(?:(?P<column>\d+):)?\s+'
+    r'|(?P<tool>clang|clang\+\+|ld|swift-frontend|swift-driver|swiftc|libtool):\s+)?'
+    r'(?P<severity>fatal error|error|warning|note|remark):\s+(?P<message>.*?)\s*$'
+)
+# Linker failures that carry no severity word: `ld: symbol(s) not found ...`, `Undefined symbols ...:`
+LINKER_RE = re.compile(
+    r'^(?:ld:\s+(?P<ld>.*?)|(?P<undefined>Undefined symbols? for architecture \S+?):?)\s*$'
+)
+TARGET_RE = re.compile(r"\s*\(in target '(?P<target>[^']+)' from project '(?P<project>[^']+)'\)$")
+CODE_RE = re.compile(r'\s*\[(?P<code>-W[\w+-]+|[A-Z][A-Za-z]*\d+|[\w-]+\.[\w.-]+)\]$')
+
+# Ordered: the first matching class wins
+ERROR_CLASSES = [
+    ('missing_member', r'has no member'),
+    ('missing_symbol', r'cannot find .+ in scope|use of unresolved identifier|undeclared type'),
+    ('missing_module', r'no such module|could not build module|module map file .+ not found'),
+    ('type_mismatch', r'cannot convert value of type|cannot assign value of type'),
+    ('protocol_conformance', r'does not conform to protocol|type .+ does not conform'),
+    ('argument_mismatch', r'argument|extra arguments?|missing arguments? for parameter|takes no arguments'),
+    ('redeclaration', r'invalid redeclaration|redefinition of|duplicate'),
+    ('ambiguous', r'ambiguous'),
+    ('concurrency', r'actor-isolated|main actor|sendable|data race'),
+    ('property_wrapper', r'property wrapper'),
+    ('optional', r'must be unwrapped|optional type'),
+    ('access_control', r'inaccessible due to|is private|is internal'),
+    ('deprecated', r'deprecated'),
+    ('unused', r'never used|never mutated|unused'),
+    ('file_system', r'no such file|file exists but is not a directory|permission denied'),
+    ('build_setting', r'no rule to process|cannot be processed by a copy bundle resources|identity of'),
+    ('linker', r'undefined symbols?|symbol\(s\) not found|linker command failed|ld:'),
+]
+_CLASS_RE = re.compile('|'.join(f'(?P<{name}>{pattern})' for name, pattern in ERROR_CLASSES),
+                       re.IGNORECASE)
+
+# Record tuple layout (compact to pickle between processes and to store)
+FIELDS = ('log', 'file', 'line', 'column', 'severity', 'message', 'code',
+          'error_class', 'target', 'count')
+
+
+def classify(message: str) -> str:
+    match = _CLASS_RE.search(message)
+    return match.lastgroup if match else 'other'
+
+
+def parse_line(line: str) -> Optional[Dict]:
+    """One diagnostic from one log line, or None"""
+    if ':' not in line:
+        return None
+    match = DIAGNOSTIC_RE.match(line)
+    if not match:
+        linker = LINKER_RE.match(line)
+        if not linker:
+            return None
+        message = linker.group('ld') or linker.group('undefined')
+        return {'file': None, 'line': None, 'column': None, 'severity': 'error', 'message': message,
+                'code': None, 'error_class': classify(message), 'target': None}
+    message = match.group('message')
+    target = None
+    target_match = TARGET_RE.search(message)
+    if target_match:
+        target = target_match.group('target')
+        message = message[:target_match.start()]
+    code = None
+    code_match = CODE_RE.search(message)
+    if code_match:
+        code = code_match.group('code')
+        message = message[:code_match.start()]
+    severity = match.group('severity')
+    return {
+        'file': match.group('file'),
+        'line': int(match.group('line')) if match.group('line') else None,
+        'column': int(match.group('column')) if match.group('column') else None,
+        'severity': 'error' if severity == 'fatal error' else severity,
+        'message': message,
+        'code': code,
+        'error_class': classify(message),
+        'target': target,
+    }
+
+
+def iter_diagnostics(path: str) -> Iterator[Dict]:
+    """Stream diagnostics from a log of any size"""
+    with open(path, 'r', errors='replace') as f:
+        for line in f:
+            diagnostic = parse_line(line.rstrip('\n'))
+            if diagnostic:
+                yield diagnostic
+
+
+def parse_log(path: str) -> Tuple[str, Dict, List[tuple]]:
+    """Parse one log: (path, signature, records), repeats folded into a count
+
+    Xcode prints the same diagnostic once per architecture/pass, so identical
+    lines within one build count as one diagnostic seen `count` times.
+    """
+    stat = os.stat(path)
+    seen: Dict[tuple, int] = {}
+    for d in iter_diagnostics(path):
+        key = (d['file'], d['line'], d['column'], d['severity'], d['message'],
+               d['code'], d['error_class'], d['target'])
+        seen[key] = seen.get(key, 0) + 1
+    records = [(path,) + key + (count,) for key, count in seen.items()]
+    return path, {'size': stat.st_size, 'mtime': stat.st_mtime}, records
+
+
+class BuildLogIndex:
+    """Diagnostics from many builds with inverted indexes and running counters"""
+
+    def __init__(self):
+        self.records: List[tuple] = []
+        self.logs: Dict[str, Dict] = {}
+        self.by_file: Dict[str, List[int]] = defaultdict(list)
+        self.by_class: Dict[str, List[int]] = defaultdict(list)
+        self.by_target: Dict[str, List[int]] = defaultdict(list)
+        self.by_log: Dict[str, List[int]] = defaultdict(list)
+        self.file_counts: Dict[str, Counter] = defaultdict(Counter)
+        self.class_counts: Dict[str, Counter] = defaultdict(Counter)
+        self.target_counts: Dict[str, Counter] = defaultdict(Counter)
+
+    # ---------------------------------------------------------------- ingest
+
+    def _add(self, record: tuple):
+        rid = len(self.records)
+        self.records.append(record)
+        log, file, _, _, severity, _, _, error_class, target, count = record
+        self.by_log[log].append(rid)
+        self.by_class[error_class].append(rid)
+        self.class_counts[severity][error_class] += count
+        if file:
+            self.by_file[file].append(rid)
+            self.file_counts[severity][file] += count
+        if target:
+            self.by_target[target].append(rid)
+            self.target_counts[severity][target] += count
+
+    def _drop_logs(self, logs: set):
+        """Forget logs that changed on disk (indexes are rebuilt once)"""
+        kept_logs = {path: sig for path, sig in self.logs.items() if path not in logs}
+        kept = [record for record in self.records if record[0] not in logs]
+        self.__init__()
+        self.logs = kept_logs
+        for record in kept:
+            self._add(record)
+
+    def ingest(self, paths: List[str], workers: Optional[int] = None) -> int:
+        """Parse new or changed logs (in parallel) and index them; returns logs parsed"""
+        todo = []
+        for path in dict.fromkeys(paths):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            known = self.logs.get(path)
+            if known and known['size'] == stat.st_size and known['mtime'] == stat.st_mtime:
+                continue
+            todo.append((path, stat.st_size))
+        changed = {path for path, _ in todo if path in self.logs}
+        if changed:
+            self._drop_logs(changed)
+        if not todo:
+            return 0
+
+        total_bytes = sum(size for _, size in todo)
+        paths = [path for path, _ in sorted(todo, key=lambda t: -t[1])]
+        if len(paths) > 1 and total_bytes >= PARALLEL_MIN_BYTES and workers != 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(parse_log, paths, chunksize=max(1, len(paths) // 32)))
+        else:
+            results = [parse_log(path) for path in paths]
+
+        for path, signature, records in results:
+            self.logs[path] = signature
+            for record in records:
+                self._add(record)
+        return len(results)
+
+    # ----------------------------------------------------------------- query
+
+    def top_files(self, n: int = 10, severity: str = 'error') -> List[Tuple[str, int]]:
+        return self.file_counts[severity].most_common(n)
+
+    def top_classes(self, n: int = 10, severity: str = 'error') -> List[Tuple[str, int]]:
+        return self.class_counts[severity].most_common(n)
+
+    def top_targets(self, n: int = 10, severity: str = 'error') -> List[Tuple[str, int]]:
+        """Errors Xcode reported per target without a source location"""
+        return self.target_counts[severity].most_common(n)
+
+    def find(self, file: Optional[str] = None, error_class: Optional[str] = None,
+             target: Optional[str] = None, log: Optional[str] = None,
+             severity: Optional[str] = None) -> List[Dict]:
+        """Diagnostics matching every given filter (posting-list intersection)"""
+        postings = [index[key] for index, key in ((self.by_file, file), (self.by_class, error_class),
+                                                  (self.by_target, target), (self.by_log, log))
+                    if key is not None]
+        if postings:
+            postings.sort(key=len)
+            ids = set(postings[0]).intersection(*postings[1:])
+        else:
+            ids = range(len(self.records))
+        results = [dict(zip(FIELDS, self.records[rid])) for rid in sorted(ids)]
+        if severity:
+            results = [r for r in results if r['severity'] == severity]
+        return results
+
+    def summary(self, n: int = 10) -> Dict:
+        totals = Counter()
+        for record in self.records:
+            totals[record[4]] += record[9]
+        return {
+            'logs': len(self.logs),
+            'diagnostics': len(self.records),
+            'totals': dict(totals),
+            'top_files': self.top_files(n),
+            'top_classes': self.top_classes(n),
+            'top_targets': self.top_targets(n),
+        }
+
+    # ----------------------------------------------------------- persistence
+
+    def save(self, path: str = DEFAULT_INDEX):
+        """Write the records; indexes and counters are rebuilt on load"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'fields': FIELDS, 'logs': self.logs, 'records': self.records}, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_INDEX) -> 'BuildLogIndex':
+        index = cls()
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return index
+        if tuple(data.get('fields', ())) != FIELDS:
+            return index  # format changed: re-ingest from the logs
+        index.logs = data['logs']
+        for record in data['records']:
+            index._add(tuple(record))
+        return index
+
+
+def find_logs(directory: str = '.', patterns=DEFAULT_LOG_PATTERNS) -> List[str]:
+    return sorted({path for pattern in patterns for path in glob.glob(os.path.join(directory, pattern))})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GOLDEX build log index")
+    parser.add_argument('logs', nargs='*', help="build logs (default: build*.log, current_build.log)")
+    parser.add_argument('--index', default=DEFAULT_INDEX, help="index file to update")
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--severity', default='error')
+    parser.add_argument('--file', help="show diagnostics for one file")
+    parser.add_argument('--class', dest='error_class', help="show diagnostics of one error class")
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    index = BuildLogIndex.load(args.index)
+    parsed = index.ingest(args.logs or find_logs(), workers=args.workers)
+    if parsed:
+        index.save(args.index)
+
+    if args.file or args.error_class:
+        for d in index.find(file=args.file, error_class=args.error_class, severity=args.severity):
+            location = f"{d['file']}:{d['line']}:{d['column']}" if d['file'] else d['target'] or '-'
+            print(f" [{d['error_class']}] {location} {d['message']} (x{d['count']})")
+        return
+
+    summary = index.summary(args.top)
+    print(f" {summary['logs']} logs ({parsed} parsed now), {summary['diagnostics']} distinct diagnostics")
+    print(f" Totals: {summary['totals']}")
+    print(f"\n Top files ({args.severity}):")
+    for file, count in index.top_files(args.top, args.severity):
+        print(f"  {count:6}  {file}")
+    print(f"\n Top error classes ({args.severity}):")
+    for error_class, count in index.top_classes(args.top, args.severity):
+        print(f"  {count:6}  {error_class}")
+    print(f"\n Top targets ({args.severity}):")
+    for target, count in index.top_targets(args.top, args.severity):
+        print(f"  {count:6}  {target}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+GOLDEX SHARED CLIENTS
+One process-wide set of SDK clients for every GOLDEX bot and tool:
+- Anthropic / OpenAI clients share a single keep-alive HTTP pool
+  (plus one async pool for streaming / concurrent callers)
+- Clients are built lazily on first use (no connectivity test at startup)
+- Optional background warm-up opens the TLS connection ahead of time
+- Firebase app is initialized once and reused on every later call
+- SDK retries are off (max_retries=0): goldex_gateway owns retries, backoff
+  and deadlines for every model call
+"""
+
+import os
+import logging
+import threading
+from typing import Callable, Dict, Optional
+
+from goldex_imports import lazy_import
+
+# Heavy SDKs are only imported when a client is actually built
+httpx = lazy_import('httpx')
+requests = lazy_import('requests')
+anthropic = lazy_import('anthropic')
+openai = lazy_import('openai')
+firebase_admin = lazy_import('firebase_admin')
+
+logger = logging.getLogger(__name__)
+
+# Keep-alive pool shared by every model client in the process
+HTTP_MAX_CONNECTIONS = int(os.getenv('GOLDEX_HTTP_MAX_CONNECTIONS', '20'))
+HTTP_MAX_KEEPALIVE = int(os.getenv('GOLDEX_HTTP_MAX_KEEPALIVE', '10'))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv('GOLDEX_HTTP_KEEPALIVE_EXPIRY', '120'))
+HTTP_TIMEOUT = float(os.getenv('GOLDEX_HTTP_TIMEOUT', '60'))
+
+PROVIDER_BASE_URLS = {
+    'anthropic': 'https://api.anthropic.com',
+    'openai': 'https://api.openai.com',
+}
+
+_lock = threading.RLock()
+_clients: Dict[tuple, object] = {}
+_http_client = None
+_async_http_client = None
+_http_session = None
+
+
+class LazyClient:
+    """Proxy that builds the real SDK client on first attribute access"""
+
+    def __init__(self, factory: Callable[[], object], name: str):
+        self._factory = factory
+        self._name = name
+        self._client = None
+        self._lock = threading.Lock()
+
+    def resolve(self):
+        """Build (once) and return the wrapped client"""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._factory()
+                    logger.debug(f"Built {self._name} client")
+        return self._client
+
+    @property
+    def ready(self) -> bool:
+        return self._client is not None
+
+    def __getattr__(self, item):
+        return getattr(self.resolve(), item)
+
+    def __repr__(self):
+        state = 'ready' if self.ready else 'lazy'
+        return f"<LazyClient {self._name} ({state})>"
+
+
+def get_http_client():
+    """Shared httpx client with keep-alive pooling (used by the model SDKs)"""
+    global _http_client
+    with _lock:
+        if _http_client is None:
+            _http_client = httpx.Client(
+                timeout=HTTP_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                    keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+                ),
+            )
+        return _http_client
+
+
+def get_async_http_client():
+    """Shared httpx async client for streaming and concurrent requests
+
+    Must be used from a single event loop for the life of the process.
+    """
+    global _async_http_client
+    with _lock:
+        if _async_http_client is None:
+            _async_http_client = httpx.AsyncClient(
+                timeout=HTTP_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                    keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+                ),
+            )
+        return _async_http_client
+
+
+def get_http_session():
+    """Shared requests session with a pooled adapter for plain REST calls"""
+    global _http_session
+    with _lock:
+        if _http_session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=HTTP_MAX_KEEPALIVE,
+                                                    pool_maxsize=HTTP_MAX_CONNECTIONS)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _http_session = session
+        return _http_session
+
+
+def _cached(key: tuple, factory: Callable[[], object]) -> LazyClient:
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = LazyClient(factory, key[0])
+            _clients[key] = client
+        return client
+
+
+def anthropic_client(api_key: Optional[str] = None) -> LazyClient:
+    """Shared Anthropic client (falls back to ANTHROPIC_API_KEY / CLAUDE_API_KEY)"""
+    api_key = api_key or os.getenv('ANTHROPIC_API_KEY') or os.getenv('CLAUDE_API_KEY')
+
+    def build():
+        return anthropic.Anthropic(api_key=api_key, http_client=get_http_client(), max_retries=0)
+
+    return _cached(('anthropic', api_key), build)
+
+
+def openai_client(api_key: Optional[str] = None) -> LazyClient:
+    """Shared OpenAI client (falls back to OPENAI_API_KEY)"""
+    api_key = api_key or os.getenv('OPENAI_API_KEY')
+
+    def build():
+        return openai.OpenAI(api_key=api_key, http_client=get_http_client(), max_retries=0)
+
+    return _cached(('openai', api_key), build)
+
+
+def async_anthropic_client(api_key: Optional[str] = None) -> LazyClient:
+    """Shared AsyncAnthropic client on the async keep-alive pool"""
+    api_key = api_key or os.getenv('ANTHROPIC_API_KEY') or os.getenv('CLAUDE_API_KEY')
+
+    def build():
+        return anthropic.AsyncAnthropic(api_key=api_key, http_client=get_async_http_client(), max_retries=0)
+
+    return _cached(('async_anthropic', api_key), build)
+
+
+def async_openai_client(api_key: Optional[str] = None) -> LazyClient:
+    """Shared AsyncOpenAI client on the async keep-alive pool"""
+    api_key = api_key or os.getenv('OPENAI_API_KEY')
+
+    def build():
+        return openai.AsyncOpenAI(api_key=api_key, http_client=get_async_http_client(), max_retries=0)
+
+    return _cached(('async_openai', api_key), build)
+
+
+def firebase_app(cred_path: Optional[str] = None, options: Optional[Dict] = None):
+    """Return the default Firebase app, initializing it only the first time"""
+    credentials = lazy_import('firebase_admin.credentials')
+
+    with _lock:
+        try:
+            return firebase_admin.get_app()
+        except ValueError:
+            cred = credentials.Certificate(cred_path or os.getenv('FIREBASE_CREDENTIALS_PATH'))
+            return firebase_admin.initialize_app(cred, options)
+
+
+def firestore_client(cred_path: Optional[str] = None, options: Optional[Dict] = None):
+    """Shared Firestore client bound to the default Firebase app"""
+    def build():
+        firestore = lazy_import('firebase_admin.firestore')
+        return firestore.client(firebase_app(cred_path, options))
+
+    return _cached(('firestore', cred_path), build)
+
+
+def storage_bucket(cred_path: Optional[str] = None, options: Optional[Dict] = None):
+    """Shared default Cloud Storage bucket for the Firebase app"""
+    def build():
+        storage = lazy_import('firebase_admin.storage')
+        return storage.bucket(app=firebase_app(cred_path, options))
+
+    return _cached(('storage', cred_path), build)
+
+
+def warm_up(*clients: LazyClient) -> threading.Thread:
+    """Build clients and open pooled connections in a background thread
+
+    Returns immediately; the first real request then reuses a hot connection.
+    """
+    def run():
+        for client in clients:
+            provider = client._name
+            try:
+                client.resolve()
+                base_url = PROVIDER_BASE_URLS.get(provider)
+                if base_url:
+                    get_http_client().head(base_url, timeout=5)
+                logger.debug(f"Warmed up {provider}")
+            except Exception as e:
+                logger.debug(f"Warm-up for {provider} skipped: {e}")
+
+    thread = threading.Thread(target=run, name='goldex-warm-up', daemon=True)
+    thread.start()
+    return thread
+
+
+async def warm_up_async(*clients: LazyClient):
+    """Async counterpart of warm_up() for clients on the async pool"""
+    for client in clients:
+        provider = client._name.replace('async_', '')
+        try:
+            client.resolve()
+            base_url = PROVIDER_BASE_URLS.get(provider)
+            if base_url:
+                await get_async_http_client().head(base_url, timeout=5)
+            logger.debug(f"Warmed up {client._name}")
+        except Exception as e:
+            logger.debug(f"Warm-up for {client._name} skipped: {e}")
+
+
+def close_all():
+    """Close pooled connections (for clean shutdown in long-running workers)"""
+    global _http_client, _http_session
+    with _lock:
+        if _http_client is not None:
+            _http_client.close()
+            _http_client = None
+        if _http_session is not None:
+            _http_session.close()
+            _http_session = None
+        _clients.clear()
+
+
+async def aclose_async():
+    """Close the async pool (call from the event loop that used it)"""
+    global _async_http_client
+    with _lock:
+        client, _async_http_client = _async_http_client, None
+        for key in [key for key in _clients if key[0].startswith('async_')]:
+            del _clients[key]
+    if client is not None:
+        await client.aclose()
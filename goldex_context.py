@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+GOLDEX CONVERSATION CONTEXT
+Session memory for Universe AI with a hard token budget:
+- Stable prefix (system prompt + pinned notes) that providers can prefix-cache
+- Token counts tracked per message as it is added (no re-counting the history)
+- Oldest turns are folded into a rolling summary, then dropped, to stay in budget
+- Sessions persist to ~/.goldex/sessions/<name>.json
+"""
+
+import os
+import json
+import time
+import hashlib
+from typing import Callable, Dict, List, Optional
+
+from goldex_imports import is_available, lazy_import
+
+SESSION_DIR = os.path.expanduser(os.getenv('GOLDEX_SESSION_DIR', '~/.goldex/sessions'))
+CONTEXT_BUDGET = int(os.getenv('GOLDEX_CONTEXT_BUDGET', '6000'))
+SUMMARY_BUDGET = int(os.getenv('GOLDEX_SUMMARY_BUDGET', '600'))
+
+MESSAGE_OVERHEAD = 4  # role/separator tokens the chat format adds per message
+SUMMARY_SNIPPET_CHARS = 160
+
+tiktoken = lazy_import('tiktoken')
+_encoding = None
+
+
+def count_tokens(text: str) -> int:
+    """Token count with tiktoken when installed, ~4 chars/token otherwise"""
+    global _encoding
+    if _encoding is None and is_available('tiktoken'):
+        try:
+            _encoding = tiktoken.get_encoding('o200k_base')
+        except Exception:
+            _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+class ConversationContext:
+    """Conversation history kept within a token budget"""
+
+    def __init__(self, system_prompt: str, name: str = 'default',
+                 budget: int = CONTEXT_BUDGET, summary_budget: int = SUMMARY_BUDGET,
+                 summarizer: Optional[Callable[[str, str], str]] = None,
+                 session_dir: str = SESSION_DIR):
+        self.system_prompt = system_prompt
+        self.name = name
+        self.budget = budget
+        self.summary_budget = summary_budget
+        self.summarizer = summarizer
+        self.session_dir = session_dir
+
+        self.pinned: List[str] = []
+        self.turns: List[Dict] = []
+        self.summary = ''
+        self.summary_tokens = 0
+        self.turn_tokens = 0
+        self.dropped_turns = 0
+        self._prefix = None
+
+    # ---------------------------------------------------------------- prefix
+
+    @property
+    def prefix(self) -> Dict:
+        """System message (system prompt + pinned notes); identical across turns"""
+        if self._prefix is None:
+            content = self.system_prompt
+            if self.pinned:
+                content += "\n\nPINNED CONTEXT:\n" + "\n".join(f"- {note}" for note in self.pinned)
+            self._prefix = {
+                'message': {'role': 'system', 'content': content},
+                'tokens': count_tokens(content) + MESSAGE_OVERHEAD,
+                'hash': hashlib.sha256(content.encode()).hexdigest()[:12],
+            }
+        return self._prefix
+
+    def pin(self, note: str):
+        """Add a note to the cached prefix (invalidates the prefix once)"""
+        self.pinned.append(note)
+        self._prefix = None
+        self.enforce_budget()
+
+    def unpin(self, index: int):
+        del self.pinned[index]
+        self._prefix = None
+
+    # ----------------------------------------------------------------- turns
+
+    @property
+    def total_tokens(self) -> int:
+        summary = self.summary_tokens + MESSAGE_OVERHEAD if self.summary else 0
+        return self.prefix['tokens'] + summary + self.turn_tokens
+
+    def messages(self, question: Optional[str] = None) -> List[Dict]:
+        """Messages to send: prefix, rolling summary, kept turns, new question"""
+        messages = [self.prefix['message']]
+        if self.summary:
+            messages.append({'role': 'system',
+                             'content': f"Summary of the earlier conversation:\n{self.summary}"})
+        messages.extend({'role': turn['role'], 'content': turn['content']} for turn in self.turns)
+        if question is not None:
+            messages.append({'role': 'user', 'content': question})
+        return messages
+
+    def add_turn(self, question: str, answer: str):
+        """Record one question/answer exchange and trim to budget"""
+        for role, content in (('user', question), ('assistant', answer)):
+            tokens = count_tokens(content) + MESSAGE_OVERHEAD
+            self.turns.append({'role': role, 'content': content,
+                               'tokens': tokens, 'timestamp': time.time()})
+            self.turn_tokens += tokens
+        self.enforce_budget()
+
+    @property
+    def summary_cap(self) -> int:
+        """Tokens reserved for the rolling summary (at most a quarter of the budget)"""
+        return min(self.summary_budget, self.budget // 4)
+
+    def enforce_budget(self):
+        """Fold the oldest exchanges into the summary until under budget"""
+        if self.total_tokens <= self.budget:
+            return
+
+        # Leave room for the summary to grow up to its cap
+        limit = self.budget - self.prefix['tokens'] - self.summary_cap - MESSAGE_OVERHEAD
+        evicted = []
+        while self.turn_tokens > limit and len(self.turns) > 2:
+            # Evict a whole user/assistant pair so roles stay alternating
+            for _ in range(2):
+                turn = self.turns.pop(0)
+                self.turn_tokens -= turn['tokens']
+                evicted.append(turn)
+        if evicted:
+            self.dropped_turns += len(evicted)
+            self._fold_into_summary(evicted)
+
+    def _fold_into_summary(self, turns: List[Dict]):
+        if self.summarizer:
+            transcript = "\n".join(f"{t['role']}: {t['content']}" for t in turns)
+            try:
+                self.summary = self.summarizer(self.summary, transcript).strip()
+            except Exception:
+                self._extractive_summary(turns)
+        else:
+            self._extractive_summary(turns)
+
+        # Oldest summary lines go first when the summary itself is over budget
+        lines = self.summary.splitlines()
+        while lines and count_tokens("\n".join(lines)) > self.summary_cap:
+            lines.pop(0)
+        self.summary = "\n".join(lines)
+        self.summary_tokens = count_tokens(self.summary) if self.summary else 0
+
+    def _extractive_summary(self, turns: List[Dict]):
+        """Local fallback: keep the opening of each evicted message"""
+        lines = [self.summary] if self.summary else []
+        for turn in turns:
+            snippet = " ".join(turn['content'].split())
+            if len(snippet) > SUMMARY_SNIPPET_CHARS:
+                snippet = snippet[:SUMMARY_SNIPPET_CHARS].rsplit(' ', 1)[0] + '...'
+            lines.append(f"{turn['role']}: {snippet}")
+        self.summary = "\n".join(lines)
+
+    def clear(self):
+        """Forget the conversation (pinned notes stay)"""
+        self.turns = []
+        self.turn_tokens = 0
+        self.summary = ''
+        self.summary_tokens = 0
+        self.dropped_turns = 0
+
+    def stats(self) -> Dict:
+        return {
+            'session': self.name,
+            'turns': len(self.turns) // 2,
+            'total_tokens': self.total_tokens,
+            'budget': self.budget,
+            'prefix_tokens': self.prefix['tokens'],
+            'prefix_hash': self.prefix['hash'],
+            'summary_tokens': self.summary_tokens,
+            'dropped_messages': self.dropped_turns,
+            'pinned': len(self.pinned),
+        }
+
+    # ----------------------------------------------------------- persistence
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.session_dir, f"{self.name}.json")
+
+    def save(self):
+        """Write the session atomically (temp file + rename)"""
+        os.makedirs(self.session_dir, exist_ok=True)
+        data = {
+            'name': self.name,
+            'pinned': self.pinned,
+            'summary': self.summary,
+            'dropped_turns': self.dropped_turns,
+            'turns': self.turns,
+            'saved_at': time.time(),
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    def load(self) -> bool:
+        """Restore a saved session; returns False if there is none"""
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return False
+
+        self.pinned = data.get('pinned', [])
+        self.summary = data.get('summary', '')
+        self.dropped_turns = data.get('dropped_turns', 0)
+        self.turns = data.get('turns', [])
+        self._prefix = None
+        self.summary_tokens = count_tokens(self.summary) if self.summary else 0
+        self.turn_tokens = sum(turn['tokens'] for turn in self.turns)
+        self.enforce_budget()
+        return True
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+GOLDEX DOCS CRAWLER
+Concurrent, resumable crawler for documentation sites (SwiftUI docs):
+- FIFO frontier in a deque plus a `seen` set, so queueing and membership are O(1)
+- Bounded asyncio fetch pool (httpx.AsyncClient when installed, stdlib urllib
+  on worker threads otherwise) with per-host connection caps and spacing
+- Pages already cached are revalidated with If-None-Match / If-Modified-Since;
+  a 304 reuses the cached file (its links are read from disk)
+- Frontier, seen set and validators are checkpointed to crawl_state.json, so an
+  interrupted crawl resumes where it stopped
+
+    python goldex_docs_crawler.py https://developer.apple.com/documentation/swiftui/ swiftui_cache
+"""
+
+import os
+import json
+import time
+import asyncio
+import argparse
+import urllib.error
+import urllib.request
+from collections import deque
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urldefrag, urljoin, urlsplit
+
+from goldex_imports import is_available, lazy_import
+
+httpx = lazy_import('httpx')
+
+STATE_FILE = 'crawl_state.json'
+CONCURRENCY = int(os.getenv('GOLDEX_CRAWL_CONCURRENCY', '8'))
+PER_HOST = int(os.getenv('GOLDEX_CRAWL_PER_HOST', '4'))
+HOST_DELAY = float(os.getenv('GOLDEX_CRAWL_HOST_DELAY', '0.1'))  # seconds between requests to one host
+TIMEOUT = float(os.getenv('GOLDEX_CRAWL_TIMEOUT', '30'))
+RETRIES = 2
+CHECKPOINT_EVERY = 25  # pages between state saves
+USER_AGENT = 'GOLDEX-docs-crawler/1.0'
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class _LinkExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.links: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'a':
+            for name, value in attrs:
+                if name == 'href' and value:
+                    self.links.append(value)
+
+
+def extract_links(html: str) -> List[str]:
+    parser = _LinkExtractor()
+    try:
+        parser.feed(html)
+        parser.close()
+    except Exception:
+        pass  # keep whatever was found before the malformed part
+    return parser.links
+
+
+class _HostGate:
+    """At most `limit` requests in flight per host, started `delay` seconds apart"""
+
+    def __init__(self, limit: int, delay: float):
+        self.semaphore = asyncio.Semaphore(limit)
+        self.delay = delay
+        self.next_start = 0.0
+        self.lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        await self.semaphore.acquire()
+        async with self.lock:
+            wait = self.next_start - time.monotonic()
+            self.next_start = max(self.next_start, time.monotonic()) + self.delay
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    async def __aexit__(self, *exc):
+        self.semaphore.release()
+
+
+class DocsCrawler:
+    """Breadth-first crawl of every page under `base_url` into `cache_dir`"""
+
+    def __init__(self, base_url: str, cache_dir: str, concurrency: int = CONCURRENCY,
+                 per_host: int = PER_HOST, host_delay: float = HOST_DELAY, timeout: float = TIMEOUT):
+        self.base_url = base_url
+        self.prefix = base_url.rstrip('/')
+        self.cache_dir = cache_dir
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.host_delay = host_delay
+        self.timeout = timeout
+        self.state_path = os.path.join(cache_dir, STATE_FILE)
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self.frontier: deque = deque()
+        self.seen: set = set()
+        self.pages: Dict[str, Dict] = {}   # url -> {'file', 'etag', 'last_modified', 'fetched_at'}
+        self.stats = {'fetched': 0, 'not_modified': 0, 'failed': 0}
+        self.gates: Dict[str, _HostGate] = {}
+        self.client = None
+        self.load_state()
+
+    # ----------------------------------------------------------------- state
+
+    def load_state(self):
+        if not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Crawl state unreadable ({e}), starting over")
+            return
+        if state.get('base_url') != self.base_url:
+            return
+        self.pages = state.get('pages', {})
+        if state.get('frontier'):
+            # Interrupted crawl: resume with the same frontier and seen set
+            self.frontier = deque(state['frontier'])
+            self.seen = set(state.get('seen', []))
+
+    def save_state(self):
+        state = {'base_url': self.base_url, 'frontier': list(self.frontier),
+                 'seen': sorted(self.seen), 'pages': self.pages}
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+    # ------------------------------------------------------------------ urls
+
+    def filename(self, url: str) -> str:
+        name = url[len(self.base_url):] if url.startswith(self.base_url) else urlsplit(url).path
+        return f"{name.strip('/').replace('/', '_') or 'root'}.html"
+
+    def normalize(self, href: str, page_url: str) -> Optional[str]:
+        """Absolute URL without fragment/query if it is inside the crawled tree"""
+        url = urldefrag(urljoin(page_url, href))[0].split('?', 1)[0]
+        if url.rstrip('/') == self.prefix:
+            return self.base_url   # `.../swiftui` and `.../swiftui/` are the same page
+        if url.startswith(self.prefix + '/'):
+            return url
+        return None
+
+    def enqueue(self, url: str):
+        if url not in self.seen:
+            self.seen.add(url)
+            self.frontier.append(url)
+
+    # ----------------------------------------------------------------- fetch
+
+    def _fetch_blocking(self, url: str, headers: Dict[str, str]) -> Tuple[int, Dict[str, str], str]:
+        request = urllib.request.Request(url, headers=headers)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                charset = response.headers.get_content_charset() or 'utf-8'
+                body = response.read().decode(charset, errors='replace')
+                return response.status, {k.lower(): v for k, v in response.headers.items()}, body
+        except urllib.error.HTTPError as e:
+            return e.code, {k.lower(): v for k, v in e.headers.items()}, ''
+
+    async def fetch(self, url: str, headers: Dict[str, str]) -> Tuple[int, Dict[str, str], str]:
+        """(status, lower-cased headers, body), retrying throttling and server errors"""
+        gate = self.gates.setdefault(urlsplit(url).netloc, _HostGate(self.per_host, self.host_delay))
+        for attempt in range(RETRIES + 1):
+            try:
+                async with gate:
+                    if self.client is not None:
+                        response = await self.client.get(url, headers=headers)
+                        result = (response.status_code, {k.lower(): v for k, v in response.headers.items()},
+                                  response.text)
+                    else:
+                        result = await asyncio.to_thread(self._fetch_blocking, url, headers)
+            except (OSError, asyncio.TimeoutError) as e:
+                error = e
+            except Exception as e:  # httpx transport errors
+                if self.client is None:
+                    raise
+                error = e
+            else:
+                if result[0] not in RETRY_STATUSES or attempt == RETRIES:
+                    return result
+                retry_after = result[1].get('retry-after', '')
+                error = f"HTTP {result[0]}"
+                if retry_after.isdigit():
+                    await asyncio.sleep(min(float(retry_after), 60))
+                    continue
+            if attempt == RETRIES:
+                raise RuntimeError(str(error))
+            await asyncio.sleep(0.5 * 2 ** attempt)
+
+    async def visit(self, url: str) -> Optional[str]:
+        """Fetch (or revalidate) one page; returns its HTML for link extraction"""
+        known = self.pages.get(url)
+        path = os.path.join(self.cache_dir, known['file'] if known else self.filename(url))
+        headers = {'User-Agent': USER_AGENT}
+        if known and os.path.exists(path):
+            if known.get('etag'):
+                headers['If-None-Match'] = known['etag']
+            if known.get('last_modified'):
+                headers['If-Modified-Since'] = known['last_modified']
+
+        try:
+            status, response_headers, html = await self.fetch(url, headers)
+        except Exception as e:
+            print(f"[SwiftUI Docs] Failed to fetch {url}: {e}")
+            self.stats['failed'] += 1
+            return None
+
+        if status == 304:
+            self.stats['not_modified'] += 1
+            with open(path, 'r', encoding='utf-8') as f:
+                return f.read()
+        if status != 200:
+            print(f"[SwiftUI Docs] Failed to fetch {url}: HTTP {status}")
+            self.stats['failed'] += 1
+            return None
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(html)
+        os.replace(tmp_path, path)
+        self.pages[url] = {'file': os.path.basename(path), 'etag': response_headers.get('etag'),
+                           'last_modified': response_headers.get('last-modified'),
+                           'fetched_at': time.time()}
+        self.stats['fetched'] += 1
+        return html
+
+    # ------------------------------------------------------------------- run
+
+    async def crawl(self, max_pages: Optional[int] = None) -> Dict[str, int]:
+        if not self.frontier:
+            self.seen = set()
+            self.enqueue(self.base_url)
+        if is_available('httpx'):
+            self.client = httpx.AsyncClient(timeout=self.timeout, follow_redirects=True,
+                                            limits=httpx.Limits(max_connections=self.concurrency))
+        in_flight: Dict[asyncio.Task, str] = {}
+        visited = 0
+        try:
+            while self.frontier or in_flight:
+                while self.frontier and len(in_flight) < self.concurrency and \
+                        (max_pages is None or visited + len(in_flight) < max_pages):
+                    url = self.frontier.popleft()
+                    in_flight[asyncio.ensure_future(self.visit(url))] = url
+                if not in_flight:
+                    break
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    url = in_flight.pop(task)
+                    html = task.result()
+                    visited += 1
+                    if html:
+                        for href in extract_links(html):
+                            link = self.normalize(href, url)
+                            if link:
+                                self.enqueue(link)
+                    if visited % CHECKPOINT_EVERY == 0:
+                        self.save_state()
+        finally:
+            # Pages still in flight go back to the front so a resume retries them
+            for task, url in in_flight.items():
+                task.cancel()
+                self.frontier.appendleft(url)
+            self.save_state()
+            if self.client is not None:
+                await self.client.aclose()
+                self.client = None
+        return dict(self.stats, visited=visited, queued=len(self.frontier))
+
+    def run(self, max_pages: Optional[int] = None) -> Dict[str, int]:
+        return asyncio.run(self.crawl(max_pages))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GOLDEX docs crawler")
+    parser.add_argument('base_url', nargs='?', default='https://developer.apple.com/documentation/swiftui/')
+    parser.add_argument('cache_dir', nargs='?', default='./swiftui_cache')
+    parser.add_argument('--concurrency', type=int, default=CONCURRENCY)
+    parser.add_argument('--max-pages', type=int, default=None)
+    args = parser.parse_args()
+
+    crawler = DocsCrawler(args.base_url, args.cache_dir, concurrency=args.concurrency)
+    if crawler.frontier:
+        print(f"↩️  Resuming crawl: {len(crawler.frontier)} queued, {len(crawler.seen)} seen")
+    started = time.perf_counter()
+    try:
+        stats = crawler.run(args.max_pages)
+    except KeyboardInterrupt:
+        print(f"⏸️  Interrupted - {len(crawler.frontier)} queued, resume by running again")
+        return
+    print(f"✅ {stats['visited']} pages in {time.perf_counter() - started:.1f}s: {stats['fetched']} fetched, "
+          f"{stats['not_modified']} not modified, {stats['failed']} failed, {stats['queued']} still queued")
+
+
+if __name__ == "__main__":
+    main()
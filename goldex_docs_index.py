@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+"""
+GOLDEX DOCS INDEX
+Offline BM25 index over cached documentation pages (SwiftUI docs HTML):
+- Pages are parsed once at index time into section chunks (one per heading,
+  paragraphs + code blocks), never again per query
+- Parsed pages go to a JSONL sidecar keyed by content hash, parsed in a
+  process pool and only when the content changed (a touched file is not)
+- Inverted index term -> [(chunk, tf)] persisted as JSON; chunk text stays
+  in the sidecar and is read through mmap only for the hits of a query
+- Identifiers are split too (NavigationStack -> navigation, stack), so
+  prose queries find API pages
+- A query scores only the postings of its own terms and returns the top-k
+  chunks, trimmed to a token budget for the prompt
+
+    python goldex_docs_index.py swiftui_cache --update
+    python goldex_docs_index.py swiftui_cache -q "view not updating after state change"
+"""
+
+import os
+import re
+import json
+import mmap
+import math
+import heapq
+import hashlib
+import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+
+from goldex_context import count_tokens
+
+DEFAULT_INDEX = 'index.json'
+PAGES_FILE = 'pages.jsonl'   # parsed-page sidecar next to the index
+INDEX_VERSION = 2
+PARALLEL_MIN_BYTES = 2_000_000  # below this, process start-up costs more than it saves
+PAGE_CACHE_SIZE = 64
+TOP_K = int(os.getenv('GOLDEX_DOCS_TOP_K', '6'))
+DOCS_BUDGET = int(os.getenv('GOLDEX_DOCS_BUDGET', '2500'))  # prompt tokens for retrieved docs
+K1 = 1.2
+B = 0.75
+HEADING_WEIGHT = 3   # a heading or title word counts as this many body words
+MAX_CHUNK_CHARS = 4000
+
+WORD_RE = re.compile(r'[A-Za-z_][A-Za-z0-9_]*|\d+')
+CAMEL_RE = re.compile(r'[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+')
+STOPWORDS = frozenset(
+    'a an and are as at be but by can do for from has have how i if in into is it its '
+    'my not of on or so that the this to use was what when where which with you your'.split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased words; identifiers also yield their camelCase/snake_case parts"""
+    tokens = []
+    for word in WORD_RE.findall(text):
+        lower = word.lower()
+        if lower not in STOPWORDS:
+            tokens.append(lower)
+        parts = CAMEL_RE.findall(word)
+        if len(parts) > 1:
+            tokens.extend(p.lower() for p in parts if len(p) > 1 and p.lower() not in STOPWORDS)
+    return tokens
+
+
+class _SectionExtractor(HTMLParser):
+    """HTML -> title + [(heading, paragraphs, code blocks)], split at h1-h3"""
+
+    SKIP = {'script', 'style', 'nav', 'header', 'footer', 'noscript', 'svg'}
+    HEADINGS = {'h1', 'h2', 'h3'}
+    BLOCKS = {'p', 'li', 'dd', 'dt', 'td', 'blockquote'}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ''
+        self.sections: List[Dict] = []
+        self.skip_depth = 0
+        self.capture: Optional[str] = None   # 'heading', 'block' or 'code'
+        self.buffer: List[str] = []
+        self.pre_depth = 0
+        self._new_section('')
+
+    def _new_section(self, heading: str):
+        self.sections.append({'heading': heading, 'text': [], 'code': []})
+
+    def _flush(self):
+        text = ''.join(self.buffer)
+        kind, self.capture, self.buffer = self.capture, None, []
+        if kind == 'code':
+            if text.strip():
+                self.sections[-1]['code'].append(text.strip('\n'))
+            return
+        text = ' '.join(text.split())
+        if not text:
+            return
+        if kind == 'heading':
+            if not self.title:
+                self.title = text
+            self._new_section(text)
+        else:
+            self.sections[-1]['text'].append(text)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP:
+            self.skip_depth += 1
+        if self.skip_depth:
+            return
+        if tag == 'pre':
+            self.pre_depth += 1
+            if self.pre_depth == 1:
+                self._flush()
+                self.capture = 'code'
+        elif self.pre_depth:
+            return
+        elif tag in self.HEADINGS:
+            self._flush()
+            self.capture = 'heading'
+        elif tag in self.BLOCKS and self.capture != 'block':
+            self._flush()
+            self.capture = 'block'
+        elif tag == 'br':
+            self.buffer.append(' ')
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP and self.skip_depth:
+            self.skip_depth -= 1
+            return
+        if self.skip_depth:
+            return
+        if tag == 'pre' and self.pre_depth:
+            self.pre_depth -= 1
+            if not self.pre_depth:
+                self._flush()
+        elif not self.pre_depth and (tag in self.HEADINGS or tag in self.BLOCKS):
+            self._flush()
+
+    def handle_data(self, data):
+        if not self.skip_depth and self.capture:
+            self.buffer.append(data)
+
+    def close(self):
+        super().close()
+        self._flush()
+
+
+def extract_sections(html: str, name: str = '') -> List[Dict]:
+    """Section chunks of one page: {'title', 'heading', 'text', 'code'}"""
+    parser = _SectionExtractor()
+    parser.feed(html)
+    parser.close()
+    title = parser.title or name
+    chunks = []
+    for section in parser.sections:
+        if not section['text'] and not section['code']:
+            continue
+        text = '\n'.join(section['text'])
+        if len(text) > MAX_CHUNK_CHARS:
+            text = text[:MAX_CHUNK_CHARS].rsplit(' ', 1)[0] + ' ...'
+        chunks.append({'title': title, 'heading': section['heading'] or title,
+                       'text': text, 'code': section['code']})
+    return chunks
+
+
+def chunk_terms(chunk: Dict) -> Tuple[Dict[str, int], int]:
+    """BM25 term frequencies and length of one chunk (headings weighted)"""
+    heading = tokenize(f"{chunk['title']} {chunk['heading']}")
+    body = tokenize(chunk['text']) + tokenize('\n'.join(chunk['code']))
+    tf = Counter(body)
+    for term in heading:
+        tf[term] += HEADING_WEIGHT
+    return dict(tf), len(body) + HEADING_WEIGHT * len(heading)
+
+
+def parse_page(path: str) -> Tuple[List[Dict], List[Tuple[Dict[str, int], int]]]:
+    """Chunks of one cached page and their terms (process-pool worker)"""
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        html = f.read()
+    chunks = extract_sections(html, os.path.splitext(os.path.basename(path))[0])
+    return chunks, [chunk_terms(chunk) for chunk in chunks]
+
+
+def _file_hash(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+
+class DocsIndex:
+    """Persistent BM25 inverted index over section chunks of cached pages
+
+    Parsed pages live in a JSONL sidecar (one line per distinct page content,
+    keyed by content hash); the index itself holds only postings and
+    (page hash, chunk number) pointers, and chunk text is read through mmap
+    for the hits a query returns.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.pages_path = os.path.join(os.path.dirname(path or '.'), PAGES_FILE)
+        self.generation = None                     # sidecar identity (changes on compaction)
+        self.files: Dict[str, List] = {}           # page file -> [size, mtime_ns, content hash]
+        self.pages: Dict[str, List[int]] = {}      # content hash -> [offset, length] in the sidecar
+        self.chunks: List[List] = []               # chunk id -> [file, content hash, chunk number]
+        self.lengths: List[int] = []               # chunk id -> token count
+        self.postings: Dict[str, List[List[int]]] = {}   # term -> [[chunk id, tf], ...]
+        self._map = None
+        self._map_file = None
+        self._page_cache: Dict[str, List[Dict]] = {}
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path: str) -> 'DocsIndex':
+        index = cls(path)
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Docs index unreadable ({e}), rebuilding")
+                return index
+            if data.get('version') == INDEX_VERSION and data.get('generation') == index._sidecar_generation():
+                index.generation = data['generation']
+                index.files = data['files']
+                index.pages = data['pages']
+                index.chunks = data['chunks']
+                index.lengths = data['lengths']
+                index.postings = data['postings']
+        return index
+
+    def save(self, path: Optional[str] = None):
+        path = path or self.path
+        self._compact()
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': INDEX_VERSION, 'generation': self.generation, 'files': self.files,
+                       'pages': self.pages, 'chunks': self.chunks, 'lengths': self.lengths,
+                       'postings': self.postings}, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+        self.dirty = False
+
+    # --------------------------------------------------------------- sidecar
+
+    def _sidecar_generation(self) -> Optional[str]:
+        try:
+            with open(self.pages_path, 'rb') as f:
+                return json.loads(f.readline()).get('generation')
+        except (OSError, ValueError, AttributeError):
+            return None
+
+    def _close_map(self):
+        if self._map is not None:
+            self._map.close()
+            self._map_file.close()
+            self._map = self._map_file = None
+
+    def _append_pages(self, records: List[Tuple[str, List[Dict]]]):
+        if self.generation is None or self._sidecar_generation() != self.generation:
+            self._close_map()
+            self.generation = os.urandom(8).hex()
+            self.pages = {}
+            with open(self.pages_path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps({'generation': self.generation}) + '\n')
+        with open(self.pages_path, 'ab') as f:
+            offset = f.tell()
+            for content_hash, chunks in records:
+                line = (json.dumps({'hash': content_hash, 'chunks': chunks}, ensure_ascii=False,
+                                   separators=(',', ':')) + '\n').encode('utf-8')
+                f.write(line)
+                self.pages[content_hash] = [offset, len(line)]
+                offset += len(line)
+        self._close_map()  # the file grew: remap on the next read
+
+    def page_chunks(self, content_hash: str) -> List[Dict]:
+        """Parsed chunks of one page, read lazily through a memory map of the sidecar"""
+        chunks = self._page_cache.get(content_hash)
+        if chunks is None:
+            if self._map is None:
+                self._map_file = open(self.pages_path, 'rb')
+                self._map = mmap.mmap(self._map_file.fileno(), 0, access=mmap.ACCESS_READ)
+            offset, length = self.pages[content_hash]
+            chunks = json.loads(self._map[offset:offset + length])['chunks']
+            if len(self._page_cache) >= PAGE_CACHE_SIZE:
+                self._page_cache.pop(next(iter(self._page_cache)))
+            self._page_cache[content_hash] = chunks
+        return chunks
+
+    def chunk(self, chunk_id: int) -> Dict:
+        name, content_hash, number = self.chunks[chunk_id]
+        return dict(self.page_chunks(content_hash)[number], file=name)
+
+    def _compact(self):
+        """Rewrite the sidecar without dead pages once they outweigh the live ones"""
+        live = {entry[2] for entry in self.files.values()}
+        dead = sum(length for h, (_, length) in self.pages.items() if h not in live)
+        if not dead or dead < sum(length for h, (_, length) in self.pages.items() if h in live):
+            return
+        records = [(h, self.page_chunks(h)) for h in self.pages if h in live]
+        self.generation = None  # a new sidecar generation (the old index no longer matches it)
+        self._page_cache.clear()
+        self._append_pages(records)
+
+    # -------------------------------------------------------------- indexing
+
+    def update(self, directory: str, suffix: str = '.html', workers: Optional[int] = None) -> Dict[str, int]:
+        """(Re)index pages in `directory` whose content changed; drop deleted ones
+
+        Unchanged content (same hash) is never re-parsed; new content is parsed
+        in a process pool when there is enough of it.
+        """
+        current = {}
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(suffix):
+                stat = os.stat(os.path.join(directory, name))
+                current[name] = [stat.st_size, stat.st_mtime_ns]
+        if self.pages and self._sidecar_generation() != self.generation:
+            self.__init__(self.path)  # sidecar replaced or lost: rebuild from scratch
+
+        changed = {}
+        for name, signature in current.items():
+            known = self.files.get(name)
+            if known and known[:2] == signature:
+                continue
+            content_hash = _file_hash(os.path.join(directory, name))
+            self.dirty = True
+            if known and known[2] == content_hash:
+                known[:2] = signature  # touched, not changed
+                continue
+            changed[name] = content_hash
+        stale = {name for name in self.files if name not in current} | set(changed)
+        if stale:
+            self._drop(stale)
+            self.dirty = True
+
+        todo = {}
+        for name, content_hash in changed.items():
+            if content_hash not in self.pages:
+                todo.setdefault(content_hash, name)
+        paths = [os.path.join(directory, name) for name in todo.values()]
+        total_bytes = sum(current[name][0] for name in todo.values())
+        if len(paths) > 1 and total_bytes >= PARALLEL_MIN_BYTES and (workers or os.cpu_count() or 1) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(parse_page, paths, chunksize=max(1, len(paths) // 32)))
+        else:
+            results = [parse_page(path) for path in paths]
+        terms = {}
+        records = []
+        for content_hash, (chunks, chunk_stats) in zip(todo, results):
+            records.append((content_hash, chunks))
+            terms[content_hash] = chunk_stats
+        if records:
+            self._append_pages(records)
+
+        for name, content_hash in changed.items():
+            stats = terms.get(content_hash)
+            if stats is None:
+                stats = [chunk_terms(chunk) for chunk in self.page_chunks(content_hash)]
+                terms[content_hash] = stats
+            for number, (tf, length) in enumerate(stats):
+                self._add([name, content_hash, number], tf, length)
+            self.files[name] = current[name] + [content_hash]
+        return {'pages': len(current), 'indexed': len(changed), 'parsed': len(todo),
+                'removed': len(stale) - len(changed), 'chunks': len(self.chunks)}
+
+    def _add(self, pointer: List, tf: Dict[str, int], length: int):
+        chunk_id = len(self.chunks)
+        self.chunks.append(pointer)
+        self.lengths.append(length)
+        for term, count in tf.items():
+            self.postings.setdefault(term, []).append([chunk_id, count])
+
+    def _drop(self, files: set):
+        """Remove the chunks of `files` and renumber the rest (one pass over postings)"""
+        keep = [i for i, chunk in enumerate(self.chunks) if chunk[0] not in files]
+        renumber = {old: new for new, old in enumerate(keep)}
+        self.chunks = [self.chunks[i] for i in keep]
+        self.lengths = [self.lengths[i] for i in keep]
+        postings = {}
+        for term, entries in self.postings.items():
+            entries = [[renumber[c], tf] for c, tf in entries if c in renumber]
+            if entries:
+                postings[term] = entries
+        self.postings = postings
+        for name in files:
+            self.files.pop(name, None)
+
+    # ----------------------------------------------------------------- query
+
+    def search(self, query: str, k: int = TOP_K) -> List[Tuple[float, Dict]]:
+        """Top-k (score, chunk) by BM25 over the query's terms"""
+        n = len(self.chunks)
+        if not n:
+            return []
+        avgdl = sum(self.lengths) / n
+        scores: Dict[int, float] = {}
+        for term, qtf in Counter(tokenize(query)).items():
+            entries = self.postings.get(term)
+            if not entries:
+                continue
+            idf = math.log(1 + (n - len(entries) + 0.5) / (len(entries) + 0.5))
+            for chunk_id, tf in entries:
+                norm = K1 * (1 - B + B * self.lengths[chunk_id] / avgdl)
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + qtf * idf * tf * (K1 + 1) / (tf + norm)
+        best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [(score, self.chunk(chunk_id)) for chunk_id, score in best]
+
+
+def render_hits(hits: List[Tuple[float, Dict]], budget: int = DOCS_BUDGET) -> str:
+    """Retrieved chunks as prompt context, best first, stopping at the token budget"""
+    parts, used = [], 0
+    for _, chunk in hits:
+        heading = chunk['title'] if chunk['heading'] == chunk['title'] else f"{chunk['title']} - {chunk['heading']}"
+        part = f"### {heading}\n{chunk['text']}"
+        if chunk['code']:
+            part += ''.join(f"\n```swift\n{code}\n```" for code in chunk['code'])
+        tokens = count_tokens(part)
+        if used + tokens > budget:
+            if parts:
+                break
+            part = part[:budget * 4]  # one oversized chunk is still better than none
+            tokens = budget
+        parts.append(part)
+        used += tokens
+    return '\n\n'.join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GOLDEX docs BM25 index")
+    parser.add_argument('cache_dir', nargs='?', default='./swiftui_cache', help="directory of cached pages")
+    parser.add_argument('--index', help=f"index file (default: <cache_dir>/{DEFAULT_INDEX})")
+    parser.add_argument('--update', action='store_true', help="index new and changed pages")
+    parser.add_argument('-q', '--query', help="show the top chunks for a query")
+    parser.add_argument('-k', type=int, default=TOP_K)
+    args = parser.parse_args()
+
+    path = args.index or os.path.join(args.cache_dir, DEFAULT_INDEX)
+    index = DocsIndex.load(path)
+    if args.update or not index.chunks:
+        stats = index.update(args.cache_dir)
+        if index.dirty:
+            index.save(path)
+        print(f" {stats['pages']} pages ({stats['indexed']} indexed now, {stats['parsed']} parsed, "
+              f"{stats['removed']} removed), "
+              f"{stats['chunks']} chunks, {len(index.postings)} terms")
+    if args.query:
+        for score, chunk in index.search(args.query, args.k):
+            print(f"  {score:6.2f}  {chunk['file']}: {chunk['heading']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+GOLDEX ERROR CLUSTERS
+Collapses thousands of compiler diagnostics into root causes:
+- Messages are normalized into templates (quoted identifiers, paths and
+  numbers stripped) plus the identifiers they mention
+- Templates are MinHashed and bucketed with LSH, so reworded variants of the
+  same diagnostic fall into one family without comparing every pair
+- A root cause is a family plus its identifiers: one missing
+  `TradingMode.icon` is one cause however many files report it
+
+    python goldex_error_clusters.py build*.log --top 20
+"""
+
+import os
+import re
+import hashlib
+import argparse
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+NUM_PERM = 64
+BANDS = 16          # 16 bands x 4 rows: pairs above ~0.5 Jaccard become candidates
+SIMILARITY = 0.7    # estimated Jaccard needed to merge two templates
+MAX_LOCATIONS = 5
+
+_PRIME = (1 << 61) - 1
+QUOTED_RE = re.compile(r"'([^']*)'|‘([^’]*)’|\"([^\"]*)\"")
+PATH_RE = re.compile(r'(?:~|\.{1,2})?(?:/[\w.@+\- ]+)+/?')
+HEX_RE = re.compile(r'\b0x[0-9a-fA-F]+\b')
+NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+WORD_RE = re.compile(r'<\w+>|\w+')
+
+
+def normalize(message: str) -> Tuple[str, Tuple[str, ...]]:
+    """Message -> (template, identifiers)
+
+    "value of type 'SharedTypes.TradingMode' has no member 'icon'" becomes
+    ("value of type <id> has no member <id>", ("SharedTypes.TradingMode", "icon")).
+    """
+    args = []
+
+    def quoted(match):
+        value = next(group for group in match.groups() if group is not None)
+        if '/' in value:
+            value = os.path.basename(value.rstrip('/'))  # per-machine paths are not the cause
+        args.append(value)
+        return '<id>'
+
+    template = QUOTED_RE.sub(quoted, message)
+    template = PATH_RE.sub('<path>', template)
+    template = HEX_RE.sub('<hex>', template)
+    template = NUMBER_RE.sub('<n>', template)
+    return ' '.join(template.split()).lower(), tuple(args)
+
+
+def shingles(template: str) -> set:
+    """Words plus word bigrams (diagnostics are too short for longer shingles)"""
+    words = WORD_RE.findall(template)
+    return set(words) | {f"{a} {b}" for a, b in zip(words, words[1:])} or {template}
+
+
+class MinHasher:
+    """MinHash signatures from NUM_PERM universal hash functions"""
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = 1):
+        self.num_perm = num_perm
+        self.params = []
+        for i in range(num_perm):
+            digest = hashlib.blake2b(f"{seed}:{i}".encode(), digest_size=16).digest()
+            a = int.from_bytes(digest[:8], 'little') % (_PRIME - 1) + 1
+            b = int.from_bytes(digest[8:], 'little') % _PRIME
+            self.params.append((a, b))
+
+    def signature(self, tokens: Iterable[str]) -> Tuple[int, ...]:
+        hashes = [int.from_bytes(hashlib.blake2b(t.encode(), digest_size=8).digest(), 'little')
+                  for t in tokens]
+        return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in self.params)
+
+
+def similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+def template_families(templates: List[str], threshold: float = SIMILARITY,
+                      bands: int = BANDS, num_perm: int = NUM_PERM) -> Dict[str, str]:
+    """Map each template to a family id (union-find over LSH candidate pairs)"""
+    hasher = MinHasher(num_perm)
+    rows = num_perm // bands
+    signatures = {t: hasher.signature(shingles(t)) for t in templates}
+
+    parent = {t: t for t in templates}
+
+    def find(t):
+        while parent[t] != t:
+            parent[t] = parent[parent[t]]
+            t = parent[t]
+        return t
+
+    buckets = defaultdict(list)
+    for template, sig in signatures.items():
+        for band in range(bands):
+            buckets[(band, sig[band * rows:(band + 1) * rows])].append(template)
+
+    checked = set()
+    for members in buckets.values():
+        for i, first in enumerate(members):
+            for other in members[i + 1:]:
+                if (first, other) in checked:
+                    continue
+                checked.add((first, other))
+                root_a, root_b = find(first), find(other)
+                if root_a != root_b and similarity(signatures[first], signatures[other]) >= threshold:
+                    parent[max(root_a, root_b)] = min(root_a, root_b)
+    return {t: find(t) for t in templates}
+
+
+def cluster_diagnostics(diagnostics: Iterable[Dict], threshold: float = SIMILARITY) -> List[Dict]:
+    """Group diagnostics (dicts with at least 'message') into root causes, biggest first
+
+    Only unique templates are MinHashed, so cost follows the number of distinct
+    messages rather than the number of diagnostics.
+    """
+    groups: Dict[Tuple[str, Tuple[str, ...]], List[Dict]] = defaultdict(list)
+    for diagnostic in diagnostics:
+        template, args = normalize(diagnostic['message'])
+        groups[(template, args)].append(diagnostic)
+
+    template_counts = Counter()
+    for (template, _), members in groups.items():
+        template_counts[template] += sum(d.get('count', 1) for d in members)
+    families = template_families(list(template_counts), threshold)
+
+    causes: Dict[Tuple[str, Tuple[str, ...]], Dict] = {}
+    for (template, args), members in groups.items():
+        key = (families[template], args)
+        cause = causes.setdefault(key, {
+            'family': families[template], 'identifiers': list(args), 'templates': Counter(),
+            'count': 0, 'files': Counter(), 'severities': Counter(), 'error_classes': Counter(),
+            'messages': Counter(), 'locations': [],
+        })
+        for d in members:
+            count = d.get('count', 1)
+            cause['count'] += count
+            cause['templates'][template] += count
+            cause['messages'][d['message']] += count
+            cause['severities'][d.get('severity', 'error')] += count
+            cause['error_classes'][d.get('error_class', 'other')] += count
+            location = d.get('file') or d.get('target')
+            if location:
+                cause['files'][location] += count
+                if len(cause['locations']) < MAX_LOCATIONS:
+                    cause['locations'].append({k: d.get(k) for k in ('file', 'line', 'column', 'target')})
+
+    results = []
+    for cause in causes.values():
+        results.append({
+            'id': hashlib.sha1(f"{cause['family']}|{'|'.join(cause['identifiers'])}".encode()).hexdigest()[:12],
+            'template': cause['templates'].most_common(1)[0][0],
+            'message': cause['messages'].most_common(1)[0][0],
+            'identifiers': cause['identifiers'],
+            'count': cause['count'],
+            'distinct_messages': len(cause['messages']),
+            'severity': cause['severities'].most_common(1)[0][0],
+            'error_class': cause['error_classes'].most_common(1)[0][0],
+            'files': len(cause['files']),
+            'top_files': cause['files'].most_common(MAX_LOCATIONS),
+            'locations': cause['locations'],
+        })
+    results.sort(key=lambda c: (c['severity'] != 'error', -c['count']))
+    return results
+
+
+def main():
+    from goldex_buildlog import BuildLogIndex, find_logs
+
+    parser = argparse.ArgumentParser(description="GOLDEX root-cause clustering of build diagnostics")
+    parser.add_argument('logs', nargs='*', help="build logs (default: build*.log, current_build.log)")
+    parser.add_argument('--severity', default='error')
+    parser.add_argument('--threshold', type=float, default=SIMILARITY)
+    parser.add_argument('--top', type=int, default=20)
+    args = parser.parse_args()
+
+    index = BuildLogIndex()
+    index.ingest(args.logs or find_logs())
+    diagnostics = index.find(severity=args.severity)
+    causes = cluster_diagnostics(diagnostics, args.threshold)
+
+    total = sum(c['count'] for c in causes)
+    print(f" {total} {args.severity}s -> {len(causes)} root causes")
+    for cause in causes[:args.top]:
+        print(f"\n [{cause['id']}] x{cause['count']} in {cause['files']} files/targets ({cause['error_class']})")
+        print(f"   {cause['message'][:160]}")
+        for location, count in cause['top_files'][:3]:
+            print(f"     {count:5}  {location}")
+
+
+if __name__ == "__main__":
+    main()
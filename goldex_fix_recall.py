@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+GOLDEX FIX RECALL
+Answers repeat errors from past (error, fix) pairs instead of asking a model:
+- Errors are embedded locally as character n-gram TF-IDF vectors (no
+  embedding service); reworded or re-pathed variants still overlap heavily
+- File paths and line:column locations are stripped before matching
+- Quoted names ('Text', 'bar') must be identical: a fix for a missing member
+  'bar' is never reused for 'baz', however similar the rest of the message
+- Inverted index gram -> [entries]: candidates come from the query's rarest
+  grams only, then exact cosine similarity over candidates and a threshold
+- IDF is frozen at build time and rebuilt once the history grew by a quarter
+- Lookup counters (hits, misses, latency) for hit-rate reporting
+
+    python goldex_fix_recall.py swiftui_cache/goldex_store.db -q "Cannot find 'Foo' in scope"
+"""
+
+import os
+import re
+import math
+import time
+import argparse
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+NGRAM_SIZES = (3, 4)
+THRESHOLD = float(os.getenv('GOLDEX_FIX_RECALL_THRESHOLD', '0.85'))
+REBUILD_GROWTH = 1.25   # rebuild IDF once the history grew by this factor
+MAX_GRAMS = 2000        # longer errors are truncated (stack traces add nothing to the match)
+
+CANDIDATE_GRAMS = 24    # rarest query grams used to pick candidates
+MAX_CANDIDATES = 256
+
+_SPACE_RE = re.compile(r'\s+')
+# `/abs/path/File.swift:12:5:` -> `File.swift:` (machines and line numbers differ, the error doesn't)
+_LOCATION_RE = re.compile(r'(?:[~.]?/[^\s:]*/)?([\w.+-]+\.\w+)(?::\d+){1,2}\b')
+_PATH_RE = re.compile(r'(?:[~.]?/[^\s:\'"]*/)([\w.+-]+)')
+# 'Name' but not the apostrophe in "doesn't"
+_QUOTED_RE = re.compile(r"(?<!\w)'([^'\n]+)'")
+
+
+def _strip_locations(text: str) -> str:
+    text = _LOCATION_RE.sub(r'\1', text)
+    return _PATH_RE.sub(r'\1', text)
+
+
+def _canonical(text: str) -> str:
+    return _SPACE_RE.sub(' ', _strip_locations(text).lower()).strip()
+
+
+def quoted_names(text: str) -> Tuple[str, ...]:
+    """Identifiers and types the compiler quoted, in order (case kept: 'text' is not 'Text')"""
+    return tuple(_QUOTED_RE.findall(_strip_locations(text)[:MAX_GRAMS]))
+
+
+def grams(text: str) -> Counter:
+    """Character n-grams of the lower-cased, whitespace-collapsed text"""
+    text = f" {_canonical(text)} "
+    counts = Counter()
+    for n in NGRAM_SIZES:
+        counts.update(text[i:i + n] for i in range(min(len(text) - n + 1, MAX_GRAMS)))
+    return counts
+
+
+class FixRecall:
+    """Char n-gram TF-IDF nearest neighbour over (error, fix) pairs"""
+
+    def __init__(self, threshold: float = THRESHOLD):
+        self.threshold = threshold
+        self.entries: List[Dict] = []                  # {'error', 'fix', ...}
+        self.counts: List[Counter] = []                # raw gram counts per entry
+        self.names: List[Tuple[str, ...]] = []         # quoted names per entry
+        self.exact: Dict[str, int] = {}                # canonical error -> entry
+        self.vectors: List[Dict[str, float]] = []     # normalized TF-IDF per entry
+        self.postings: Dict[str, List[int]] = {}
+        self.idf: Dict[str, float] = {}
+        self.built_size = 0
+        self.stats = {'lookups': 0, 'hits': 0, 'misses': 0, 'seconds': 0.0}
+
+    # ----------------------------------------------------------------- build
+
+    def add(self, error: str, fix: str, **extra):
+        """Remember one answered error (exact repeats only refresh the fix)"""
+        if not self._append(dict(extra, error=error, fix=fix)):
+            return
+        if len(self.entries) > max(8, self.built_size * REBUILD_GROWTH):
+            self.rebuild()
+        else:
+            self._index(len(self.entries) - 1)
+
+    def add_all(self, pairs: Iterable[Dict]):
+        """Bulk load dicts with 'error' and 'fix' (one IDF build at the end)"""
+        for pair in pairs:
+            self._append(pair)
+        self.rebuild()
+
+    def _append(self, pair: Dict) -> bool:
+        """True if a new entry was added (False: invalid, or an exact repeat refreshed)"""
+        if not pair.get('error') or not pair.get('fix'):
+            return False
+        key = _canonical(pair['error'])
+        if key in self.exact:
+            self.entries[self.exact[key]] = pair
+            return False
+        self.exact[key] = len(self.entries)
+        self.entries.append(pair)
+        self.counts.append(grams(pair['error']))
+        self.names.append(quoted_names(pair['error']))
+        return True
+
+    def rebuild(self):
+        n = len(self.entries)
+        df = Counter()
+        for counts in self.counts:
+            df.update(counts.keys())
+        self.idf = {gram: math.log((1 + n) / (1 + d)) + 1 for gram, d in df.items()}
+        self.postings = {}
+        self.vectors = []
+        for i in range(n):
+            self._index(i)
+        self.built_size = n
+
+    def _vector(self, counts: Counter) -> Dict[str, float]:
+        default = math.log(1 + len(self.entries)) + 1  # unseen gram: rarest possible
+        vector = {gram: (1 + math.log(tf)) * self.idf.get(gram, default) for gram, tf in counts.items()}
+        norm = math.sqrt(sum(w * w for w in vector.values())) or 1.0
+        return {gram: w / norm for gram, w in vector.items()}
+
+    def _index(self, i: int):
+        vector = self._vector(self.counts[i])
+        self.vectors.append(vector)
+        for gram in vector:
+            self.postings.setdefault(gram, []).append(i)
+
+    # ---------------------------------------------------------------- lookup
+
+    def nearest(self, error: str) -> Tuple[Optional[Dict], float]:
+        """Most similar past entry quoting the same names, and its cosine similarity"""
+        query = self._vector(grams(error))
+        names = quoted_names(error)
+        # A near-duplicate shares the query's rare grams; common ones (" of", "type")
+        # would touch every entry, so they only count in the exact score below
+        rare = sorted((g for g in query if g in self.postings), key=lambda g: len(self.postings[g]))
+        hits = Counter()
+        for gram in rare[:CANDIDATE_GRAMS]:
+            hits.update(self.postings[gram])
+        if not hits:
+            return None, 0.0
+        scores = {}
+        for i, _ in hits.most_common(MAX_CANDIDATES):
+            if self.names[i] != names:
+                continue
+            vector = self.vectors[i]
+            scores[i] = sum(weight * vector.get(gram, 0.0) for gram, weight in query.items())
+        if not scores:
+            return None, 0.0
+        # Ties go to the newest entry: a later fix supersedes an older one
+        best = max(scores, key=lambda i: (round(scores[i], 6), i))
+        return self.entries[best], scores[best]
+
+    def lookup(self, error: str) -> Optional[Dict]:
+        """Past entry close enough to reuse (with 'similarity'), or None; counted in stats"""
+        started = time.perf_counter()
+        entry, score = self.nearest(error)
+        self.stats['lookups'] += 1
+        self.stats['seconds'] += time.perf_counter() - started
+        if entry is None or score < self.threshold:
+            self.stats['misses'] += 1
+            return None
+        self.stats['hits'] += 1
+        return dict(entry, similarity=round(score, 4))
+
+    def hit_rate(self) -> float:
+        return self.stats['hits'] / self.stats['lookups'] if self.stats['lookups'] else 0.0
+
+    def report(self) -> Dict:
+        lookups = self.stats['lookups']
+        return {
+            'entries': len(self.entries),
+            'lookups': lookups,
+            'hits': self.stats['hits'],
+            'misses': self.stats['misses'],
+            'hit_rate': round(self.hit_rate(), 4),
+            'avg_lookup_ms': round(self.stats['seconds'] * 1000 / lookups, 3) if lookups else 0.0,
+        }
+
+
+def main():
+    from goldex_store import DEFAULT_DB, open_store
+
+    parser = argparse.ArgumentParser(description="GOLDEX fix recall over logged interactions")
+    parser.add_argument('db', nargs='?', default=DEFAULT_DB)
+    parser.add_argument('--kind', default='swiftui_interaction')
+    parser.add_argument('-q', '--query', action='append', default=[], help="error to look up (repeatable)")
+    parser.add_argument('--threshold', type=float, default=THRESHOLD)
+    args = parser.parse_args()
+
+    store = open_store(args.db)
+    recall = FixRecall(args.threshold)
+    started = time.perf_counter()
+    recall.add_all({'error': r.get('prompt'), 'fix': r.get('response')}
+                   for r in reversed(store.find(args.kind)) if r.get('source') != 'history')
+    print(f" {len(recall.entries)} past fixes indexed in {(time.perf_counter() - started) * 1000:.1f} ms")
+    for query in args.query:
+        hit = recall.lookup(query)
+        if hit:
+            print(f"  {hit['similarity']:.3f} reuse      {query[:60]!r} -> {hit['error'][:60]!r}")
+        else:
+            print(f"  {recall.nearest(query)[1]:.3f} ask model  {query[:60]!r}")
+    if args.query:
+        print(f" {recall.report()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+GOLDEX FIX RULES
+Data-driven diagnostic -> fix-template engine (rules in goldex_fix_rules.json):
+- Every rule pattern is compiled into ONE alternation regex, so matching a
+  diagnostic is a single scan however many rules exist
+- Named groups in a rule pattern become template parameters ($member, $type, ...)
+- Context axes (file type, usage) are data too: each axis is one compiled
+  alternation over the file name or a parameter
+- A rule picks the first template whose `when` conditions (full-match regexes
+  over parameters and context) all hold
+- Adding a rule, context or template is an edit to the JSON file, not to code
+
+    python goldex_fix_rules.py build*.log                   # rule hits over build logs
+    python goldex_fix_rules.py -m "Value of type 'X' has no member 'icon'" -f Views/X.swift
+"""
+
+import os
+import re
+import json
+import hashlib
+import argparse
+from collections import Counter
+from pathlib import Path
+from string import Template
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_RULES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'goldex_fix_rules.json')
+BASE_CONFIDENCE = 0.5
+MAX_CONFIDENCE = 0.98
+
+_GROUP_RE = re.compile(r'\(\?P<(\w+)>')
+_BACKREF_RE = re.compile(r'\(\?P=(\w+)\)')
+
+_engines: Dict[str, 'FixRuleEngine'] = {}
+
+
+def combine(patterns: List[str], prefix: str) -> Tuple[re.Pattern, List[List[str]]]:
+    """One alternation regex over all patterns; group `{prefix}{i}` marks the winner
+
+    Named groups are renamed `{prefix}{i}_{name}` so rules may reuse parameter names.
+    Returns the regex and each pattern's parameter names.
+    """
+    parts, params = [], []
+    for i, pattern in enumerate(patterns):
+        names = _GROUP_RE.findall(pattern)
+        pattern = _GROUP_RE.sub(lambda m: f'(?P<{prefix}{i}_{m.group(1)}>', pattern)
+        pattern = _BACKREF_RE.sub(lambda m: f'(?P={prefix}{i}_{m.group(1)})', pattern)
+        parts.append(f'(?P<{prefix}{i}>{pattern})')
+        params.append(list(dict.fromkeys(names)))
+    return re.compile('|'.join(parts) or r'(?!)', re.IGNORECASE), params
+
+
+def _index(match: re.Match, prefix: str) -> int:
+    # The outer group closes last, so lastgroup names the matching alternative
+    return int(match.lastgroup[len(prefix):])
+
+
+class FixRuleEngine:
+    """Compiled rule set: match diagnostics, derive context, render fix templates"""
+
+    def __init__(self, spec: Dict):
+        self.version = spec.get('version', 1)
+        self.digest = hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:12]
+        self.mtime = None
+        self.rules = spec.get('rules', [])
+        self.regex, self.params = combine([rule['pattern'] for rule in self.rules], 'r')
+
+        self.contexts = []
+        for name, axis in spec.get('contexts', {}).items():
+            regex, _ = combine([rule['pattern'] for rule in axis['rules']], 'c')
+            self.contexts.append((name, axis, regex))
+
+        self.templates = []
+        for rule in self.rules:
+            compiled = []
+            for template in rule.get('templates', []):
+                code = template['code']
+                when = {key: re.compile(value) for key, value in template.get('when', {}).items()}
+                compiled.append((when, Template('\n'.join(code) if isinstance(code, list) else code)))
+            self.templates.append(compiled)
+
+    @classmethod
+    def from_file(cls, path: str = DEFAULT_RULES) -> 'FixRuleEngine':
+        with open(path, 'r') as f:
+            return cls(json.load(f))
+
+    # ----------------------------------------------------------------- match
+
+    def match(self, message: str) -> Optional[Dict]:
+        """First (leftmost) rule matching a diagnostic message, with its parameters"""
+        found = self.regex.search(message)
+        if not found:
+            return None
+        i = _index(found, 'r')
+        rule = self.rules[i]
+        params = dict(rule.get('defaults', {}))
+        for name in self.params[i]:
+            value = found.group(f'r{i}_{name}')
+            if value is not None:
+                params[name] = value
+        return {
+            'rule': rule['id'],
+            'fix_type': rule.get('fix_type', rule['id']),
+            'description': rule.get('description', rule['id']),
+            'params': params,
+            'fixable': bool(self.templates[i]),
+            'index': i,
+        }
+
+    def scan(self, messages: Iterable[str]) -> Counter:
+        """Rule id -> number of messages it matched (one regex search per message)"""
+        hits = Counter()
+        for message in messages:
+            found = self.regex.search(message)
+            if found:
+                hits[self.rules[_index(found, 'r')]['id']] += 1
+        return hits
+
+    # --------------------------------------------------------------- context
+
+    def context(self, file_path: str, params: Dict) -> Dict:
+        """Context axes for an error (file type, usage, ...) with a confidence score"""
+        file_name = Path(file_path).name if file_path else ''
+        sources = dict(params, file_name=file_name, file_path=file_path or '')
+        context = {'file_name': file_name, 'confidence': BASE_CONFIDENCE}
+        for name, axis, regex in self.contexts:
+            context[name] = axis.get('default')
+            found = regex.search(sources.get(axis['source']) or '')
+            if found:
+                rule = axis['rules'][_index(found, 'c')]
+                context[name] = rule['value']
+                context['confidence'] += rule.get('confidence', 0)
+        context['confidence'] = min(MAX_CONFIDENCE, context['confidence'])
+        return context
+
+    # ------------------------------------------------------------------- fix
+
+    def render(self, match: Dict, context: Dict) -> Optional[str]:
+        """Fix code from the first template whose conditions hold, or None"""
+        values = {**{k: v for k, v in context.items() if isinstance(v, str)}, **match['params']}
+        for when, template in self.templates[match['index']]:
+            if all(condition.fullmatch(values.get(key) or '') for key, condition in when.items()):
+                return template.safe_substitute(values)
+        return None
+
+    def suggest(self, message: str, file_path: str = '') -> Optional[Dict]:
+        """match + context + rendered fix for one diagnostic (fix_code None if no template)"""
+        match = self.match(message)
+        if match is None:
+            return None
+        context = self.context(file_path, match['params'])
+        return dict(match, context=context, fix_code=self.render(match, context))
+
+
+def load_engine(path: str = DEFAULT_RULES) -> FixRuleEngine:
+    """Shared engine per rules file, reloaded when the file changes"""
+    path = os.path.abspath(path)
+    mtime = os.path.getmtime(path)
+    engine = _engines.get(path)
+    if engine is None or engine.mtime != mtime:
+        engine = FixRuleEngine.from_file(path)
+        engine.mtime = mtime
+        _engines[path] = engine
+    return engine
+
+
+def main():
+    from goldex_buildlog import find_logs, iter_diagnostics
+
+    parser = argparse.ArgumentParser(description="GOLDEX fix rule engine")
+    parser.add_argument('logs', nargs='*', help="build logs (default: build*.log, current_build.log)")
+    parser.add_argument('--rules', default=DEFAULT_RULES)
+    parser.add_argument('-m', '--message', help="render the fix for one diagnostic message")
+    parser.add_argument('-f', '--file', default='', help="source file of --message")
+    args = parser.parse_args()
+
+    engine = load_engine(args.rules)
+    if args.message:
+        suggestion = engine.suggest(args.message, args.file)
+        if suggestion is None:
+            print("❌ No rule matches")
+            return
+        print(f"🎯 {suggestion['rule']} {suggestion['params']} {suggestion['context']}")
+        print(suggestion['fix_code'] or "(no fix template)")
+        return
+
+    hits = engine.scan(d['message'] for log in (args.logs or find_logs()) for d in iter_diagnostics(log))
+    print(f" {len(engine.rules)} rules, {sum(hits.values())} matching diagnostics")
+    for rule in engine.rules:
+        print(f"  {hits[rule['id']]:6}  {rule['id']:22} {rule.get('description', '')}")
+
+
+if __name__ == "__main__":
+    main()
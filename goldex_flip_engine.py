@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+GOLDEX FLIP ENGINE
+Local flip-challenge math (no model calls):
+- Closed-form compounding for fixed-fractional risk: growth needed, minimum
+  winning trades, break-even win rate and expected trade count
+- Vectorized NumPy Monte Carlo of equity paths for a win rate and R:R,
+  reporting odds of hitting target, trades needed and drawdown distribution
+
+    python goldex_flip_engine.py 1000 10000 5 --win-rate 55 --rr 2
+"""
+
+import math
+import argparse
+from typing import Dict, Optional
+
+from goldex_imports import is_available, lazy_import
+
+np = lazy_import('numpy')
+
+DEFAULT_WIN_RATE = 55.0
+DEFAULT_RR = 2.0
+DEFAULT_PATHS = 10000
+DEFAULT_MAX_TRADES = 500
+DEFAULT_RUIN_DRAWDOWN = 90.0   # % drawdown from the starting balance that ends a path
+DEFAULT_SEED = 42              # fixed so the same inputs always give the same report
+MAX_CELLS_PER_CHUNK = 4_000_000
+
+
+def flip_plan(start_balance: float, target_balance: float, risk_percent: float,
+              win_rate: float = DEFAULT_WIN_RATE, reward_risk: float = DEFAULT_RR) -> Dict:
+    """Closed-form compounding math for a flip challenge
+
+    Each win grows equity by (1 + r*RR) and each loss shrinks it by (1 - r),
+    where r is the fraction of equity risked per trade.
+    """
+    if start_balance <= 0 or target_balance <= 0:
+        raise ValueError("Balances must be positive")
+    if not 0 < risk_percent < 100:
+        raise ValueError("Risk per trade must be between 0 and 100%")
+    if not 0 < win_rate < 100:
+        raise ValueError("Win rate must be between 0 and 100%")
+    if reward_risk <= 0:
+        raise ValueError("Reward:risk must be positive")
+
+    r = risk_percent / 100
+    p = win_rate / 100
+    log_target = math.log(target_balance / start_balance)
+    log_win = math.log1p(r * reward_risk)
+    log_loss = math.log1p(-r)
+
+    # Expected log growth per trade (Kelly-style edge)
+    edge = p * log_win + (1 - p) * log_loss
+    breakeven_win_rate = -log_loss / (log_win - log_loss)
+
+    return {
+        'start_balance': start_balance,
+        'target_balance': target_balance,
+        'risk_percent': risk_percent,
+        'win_rate': win_rate,
+        'reward_risk': reward_risk,
+        'required_growth_percent': (target_balance / start_balance - 1) * 100,
+        'min_winning_trades': max(0, math.ceil(log_target / log_win)) if log_target > 0 else 0,
+        'breakeven_win_rate': breakeven_win_rate * 100,
+        'growth_per_trade_percent': math.expm1(edge) * 100,
+        'expected_trades': math.ceil(log_target / edge) if edge > 0 and log_target > 0 else None,
+        'kelly_risk_percent': max(0.0, (p - (1 - p) / reward_risk)) * 100,
+        'losses_to_halve': math.ceil(math.log(0.5) / log_loss),
+    }
+
+
+def required_win_rate(plan: Dict, trades: int) -> Optional[float]:
+    """Win rate (%) needed to hit the target in `trades` trades (None if impossible)"""
+    r = plan['risk_percent'] / 100
+    log_target = math.log(plan['target_balance'] / plan['start_balance'])
+    log_win = math.log1p(r * plan['reward_risk'])
+    log_loss = math.log1p(-r)
+    p = (log_target / trades - log_loss) / (log_win - log_loss)
+    return max(p, 0.0) * 100 if p <= 1 else None
+
+
+def check_simulation(paths: int = DEFAULT_PATHS, max_trades: int = DEFAULT_MAX_TRADES,
+                     ruin_drawdown: float = DEFAULT_RUIN_DRAWDOWN, **_):
+    if paths < 1:
+        raise ValueError("Monte Carlo needs at least one path")
+    if max_trades < 1:
+        raise ValueError("Monte Carlo needs at least one trade per path")
+    if not 0 < ruin_drawdown < 100:
+        raise ValueError("Ruin drawdown must be between 0 and 100%")
+
+
+def monte_carlo(plan: Dict, paths: int = DEFAULT_PATHS, max_trades: int = DEFAULT_MAX_TRADES,
+                ruin_drawdown: float = DEFAULT_RUIN_DRAWDOWN, seed: int = DEFAULT_SEED) -> Dict:
+    """Simulate equity paths in log space; each path stops at target or ruin"""
+    check_simulation(paths, max_trades, ruin_drawdown)
+    r = plan['risk_percent'] / 100
+    p = plan['win_rate'] / 100
+    log_target = math.log(plan['target_balance'] / plan['start_balance'])
+    log_ruin = math.log1p(-ruin_drawdown / 100)
+    log_win = math.log1p(r * plan['reward_risk'])
+    log_loss = math.log1p(-r)
+
+    rng = np.random.default_rng(seed)
+    chunk = max(1, MAX_CELLS_PER_CHUNK // max_trades)
+    hit_trades, ruined, max_drawdowns = [], 0, []
+    steps = np.arange(max_trades)
+
+    for offset in range(0, paths, chunk):
+        n = min(chunk, paths - offset)
+        wins = rng.random((n, max_trades)) < p
+        equity = np.cumsum(np.where(wins, log_win, log_loss), axis=1)
+
+        hit = equity >= log_target
+        bust = equity <= log_ruin
+        hit_at = np.where(hit.any(axis=1), hit.argmax(axis=1), max_trades)
+        bust_at = np.where(bust.any(axis=1), bust.argmax(axis=1), max_trades)
+        stop_at = np.minimum(hit_at, bust_at)
+
+        # Drawdown from the running peak (including the starting balance), up to the stop
+        peak = np.maximum(np.maximum.accumulate(equity, axis=1), 0.0)
+        drawdown = -np.expm1(equity - peak)
+        drawdown[steps[None, :] > stop_at[:, None]] = 0.0
+        max_drawdowns.append(drawdown.max(axis=1))
+
+        reached = hit_at < bust_at
+        hit_trades.append(hit_at[reached] + 1)
+        ruined += int((bust_at < hit_at).sum())
+
+    hit_trades = np.concatenate(hit_trades)
+    max_drawdowns = np.concatenate(max_drawdowns) * 100
+
+    def percentiles(values):
+        if values.size == 0:
+            return None
+        p10, p50, p90 = np.percentile(values, [10, 50, 90])
+        return {'p10': float(p10), 'median': float(p50), 'p90': float(p90)}
+
+    return {
+        'paths': paths,
+        'max_trades': max_trades,
+        'seed': seed,
+        'prob_target': hit_trades.size / paths * 100,
+        'prob_ruin': ruined / paths * 100,
+        'trades_to_target': percentiles(hit_trades),
+        'max_drawdown': percentiles(max_drawdowns),
+        'prob_drawdown_over_50': float((max_drawdowns > 50).mean() * 100),
+    }
+
+
+def _expected_trades_text(plan: Dict) -> str:
+    if plan['expected_trades']:
+        return str(plan['expected_trades'])
+    if plan['target_balance'] <= plan['start_balance']:
+        return '0 (target already reached)'
+    if math.isclose(plan['growth_per_trade_percent'], 0.0, abs_tol=1e-9):
+        return 'never (zero edge: win rate is at break-even)'
+    return 'never (negative edge)'
+
+
+def format_report(plan: Dict, mc: Optional[Dict] = None) -> str:
+    """Human-readable flip report for the CLI"""
+    lines = [
+        f" Start ${plan['start_balance']:,.2f} -> Target ${plan['target_balance']:,.2f}"
+        f"  |  Risk {plan['risk_percent']}%  |  Win rate {plan['win_rate']}%  |  R:R 1:{plan['reward_risk']}",
+        f" Required growth:        {plan['required_growth_percent']:,.1f}%",
+        f" Min trades (all wins):  {plan['min_winning_trades']}",
+        f" Break-even win rate:    {plan['breakeven_win_rate']:.1f}%",
+        f" Avg growth per trade:   {plan['growth_per_trade_percent']:+.2f}%",
+        f" Expected trades:        {_expected_trades_text(plan)}",
+        f" Kelly risk:             {plan['kelly_risk_percent']:.1f}%",
+        f" Losses to -50%:         {plan['losses_to_halve']}",
+    ]
+    for trades in (20, 50, 100):
+        needed = required_win_rate(plan, trades)
+        lines.append(f" Win rate for {trades:>3} trades: "
+                     f"{f'{needed:.1f}%' if needed is not None else 'impossible'}")
+
+    if mc:
+        lines.append(f"\n MONTE CARLO ({mc['paths']:,} paths, up to {mc['max_trades']} trades)")
+        lines.append(f" P(reach target):        {mc['prob_target']:.1f}%")
+        lines.append(f" P(ruin):                {mc['prob_ruin']:.1f}%")
+        trades = mc['trades_to_target']
+        if trades:
+            lines.append(f" Trades to target:       median {trades['median']:.0f} "
+                         f"(p10 {trades['p10']:.0f} / p90 {trades['p90']:.0f})")
+        dd = mc['max_drawdown']
+        lines.append(f" Max drawdown:           median {dd['median']:.1f}% "
+                     f"(p10 {dd['p10']:.1f}% / p90 {dd['p90']:.1f}%)")
+        lines.append(f" P(drawdown > 50%):      {mc['prob_drawdown_over_50']:.1f}%")
+    elif not is_available('numpy'):
+        lines.append("\n Monte Carlo skipped - install numpy: pip install numpy")
+    return "\n".join(lines)
+
+
+def analyze(start_balance: float, target_balance: float, risk_percent: float,
+            win_rate: float = DEFAULT_WIN_RATE, reward_risk: float = DEFAULT_RR, **mc_options):
+    """Closed-form plan plus Monte Carlo when NumPy is installed"""
+    plan = flip_plan(start_balance, target_balance, risk_percent, win_rate, reward_risk)
+    check_simulation(**mc_options)
+    mc = monte_carlo(plan, **mc_options) if is_available('numpy') else None
+    return plan, mc
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GOLDEX flip challenge calculator")
+    parser.add_argument('start', type=float, help="starting balance")
+    parser.add_argument('target', type=float, help="target balance")
+    parser.add_argument('risk', type=float, help="risk per trade (%%)")
+    parser.add_argument('--win-rate', type=float, default=DEFAULT_WIN_RATE)
+    parser.add_argument('--rr', type=float, default=DEFAULT_RR, help="reward:risk ratio")
+    parser.add_argument('--paths', type=int, default=DEFAULT_PATHS)
+    parser.add_argument('--max-trades', type=int, default=DEFAULT_MAX_TRADES)
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    args = parser.parse_args()
+
+    try:
+        plan, mc = analyze(args.start, args.target, args.risk, args.win_rate, args.rr,
+                           paths=args.paths, max_trades=args.max_trades, seed=args.seed)
+    except ValueError as e:
+        parser.error(str(e))
+    print(format_report(plan, mc))
+
+
+if __name__ == "__main__":
+    main()
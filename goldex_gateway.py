@@ -0,0 +1,526 @@
+#!/usr/bin/env python3
+"""
+GOLDEX MODEL GATEWAY
+Every model call goes through one gateway that owns the provider limits:
+- Per provider: a concurrency cap plus requests/minute and tokens/minute
+  token buckets (input tokens are charged up front, output tokens afterwards)
+- Every call has a deadline; waits for a slot or a bucket, retries and the
+  SDK timeout all come out of it, so a call never outlives it
+- Retryable errors (429/5xx/overloaded/connection) back off with full jitter,
+  honouring retry-after
+- Optional hedging: if the first request is still running after `hedge_after`
+  seconds a second one is sent and the first answer wins
+- Per call site: latency histogram, recent percentiles, token counts
+  (prompt-cache reads/writes included), retries, hedges and timeouts for a report
+- Streaming calls (`await GATEWAY.stream(...)`) share the same slots, buckets,
+  deadline and metrics; they retry only while nothing has been streamed yet
+- StubProvider answers locally (fixed or scripted text, latency, failures)
+- SDK clients from goldex_clients are built with max_retries=0: retrying is
+  the gateway's job, so SDK retries would multiply with these
+
+    python goldex_gateway.py --calls 200 --hedge-after 0.08    # stub latency demo
+"""
+
+import os
+import math
+import time
+import asyncio
+import random
+import argparse
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Union
+
+import goldex_clients
+from goldex_context import count_tokens
+
+DEFAULT_DEADLINE = float(os.getenv('GOLDEX_MODEL_DEADLINE', '60'))
+RETRIES = int(os.getenv('GOLDEX_MODEL_RETRIES', '2'))
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 8.0
+WORKERS = 32
+SLOT_POLL_SECONDS = 0.05   # async callers poll for a free concurrency slot
+STREAM_CHUNK_CHARS = 8     # StubProvider streams its reply in pieces this long
+
+PROVIDER_DEFAULTS = {
+    # provider: (concurrency, requests/minute, tokens/minute)
+    'anthropic': (4, 50, 80000),
+    'openai': (8, 500, 200000),
+    'stub': (16, 6000, 10000000),
+}
+
+LATENCY_BUCKETS_MS = (100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+RECENT_LATENCIES = 1024
+RETRY_STATUSES = (429, 500, 502, 503, 504, 529)
+RETRY_ERRORS = ('RateLimitError', 'APIConnectionError', 'APITimeoutError',
+                'InternalServerError', 'OverloadedError', 'TimeoutError', 'ConnectionError')
+
+
+class GatewayTimeout(TimeoutError):
+    """The call's deadline passed before any attempt succeeded"""
+
+
+def _limit(provider: str, name: str, default: float) -> float:
+    return float(os.getenv(f'GOLDEX_{provider.upper()}_{name}', default))
+
+
+def _retry_after(error) -> Optional[float]:
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        return float(headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error) -> bool:
+    if isinstance(error, GatewayTimeout):
+        return False
+    status = getattr(error, 'status_code', None)
+    return status in RETRY_STATUSES or type(error).__name__ in RETRY_ERRORS
+
+
+class TokenBucket:
+    """`per_minute` units refilled continuously; the balance may go negative on post-charges"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take `amount` and return 0.0, or return the seconds until it would be available"""
+        amount = min(amount, self.capacity)
+        with self.lock:
+            self._refill(time.monotonic())
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return 0.0
+            return (amount - self.tokens) / self.rate
+
+    def acquire(self, amount: float, expires: float) -> bool:
+        """Take `amount`, waiting for refills; False if that would pass `expires`"""
+        while True:
+            wait_for = self.reserve(amount)
+            if not wait_for:
+                return True
+            if time.monotonic() + wait_for > expires:
+                return False
+            time.sleep(wait_for)
+
+    async def acquire_async(self, amount: float, expires: float) -> bool:
+        while True:
+            wait_for = self.reserve(amount)
+            if not wait_for:
+                return True
+            if time.monotonic() + wait_for > expires:
+                return False
+            await asyncio.sleep(wait_for)
+
+    def charge(self, amount: float):
+        with self.lock:
+            self._refill(time.monotonic())
+            self.tokens -= amount
+
+
+# ---------------------------------------------------------------- providers
+
+class AnthropicProvider:
+    name = 'anthropic'
+
+    def default_client(self):
+        return goldex_clients.anthropic_client()
+
+    def send(self, client, request: Dict, timeout: float) -> Dict:
+        response = client.messages.create(timeout=timeout, **request)
+        text = next((block.text for block in response.content if getattr(block, 'type', '') == 'text'), '')
+        usage = getattr(response, 'usage', None)
+        return {'text': text, 'response': response,
+                'input_tokens': getattr(usage, 'input_tokens', 0) or 0,
+                'output_tokens': getattr(usage, 'output_tokens', 0) or 0,
+                'cache_read_tokens': getattr(usage, 'cache_read_input_tokens', 0) or 0,
+                'cache_write_tokens': getattr(usage, 'cache_creation_input_tokens', 0) or 0}
+
+    async def astream(self, client, request: Dict, timeout: float):
+        """Text deltas of a streamed answer (`client` is an AsyncAnthropic)"""
+        stream = await client.messages.create(timeout=timeout, stream=True, **request)
+        async for event in stream:
+            if event.type == 'content_block_delta' and getattr(event.delta, 'text', None):
+                yield event.delta.text
+
+
+class OpenAIProvider:
+    name = 'openai'
+
+    def default_client(self):
+        return goldex_clients.openai_client()
+
+    def send(self, client, request: Dict, timeout: float) -> Dict:
+        response = client.chat.completions.create(timeout=timeout, **request)
+        usage = getattr(response, 'usage', None)
+        details = getattr(usage, 'prompt_tokens_details', None)
+        return {'text': response.choices[0].message.content or '', 'response': response,
+                'input_tokens': getattr(usage, 'prompt_tokens', 0) or 0,
+                'output_tokens': getattr(usage, 'completion_tokens', 0) or 0,
+                'cache_read_tokens': getattr(details, 'cached_tokens', 0) or 0}
+
+    async def astream(self, client, request: Dict, timeout: float):
+        """Text deltas of a streamed answer (`client` is an AsyncOpenAI)"""
+        stream = await client.chat.completions.create(timeout=timeout, stream=True, **request)
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+class StubProvider:
+    """Local provider for tests and demos
+
+    `reply` is a string or a function of the request; `latency` is seconds or a
+    function returning seconds; the first `failures` calls raise `error`.
+    """
+    name = 'stub'
+
+    def __init__(self, reply: Union[str, Callable[[Dict], str]] = '{}',
+                 latency: Union[float, Callable[[], float]] = 0.0,
+                 failures: int = 0, error: Optional[Exception] = None):
+        self.reply = reply
+        self.latency = latency
+        self.failures = failures
+        self.error = error or ConnectionError('stub failure')
+        self.requests: List[Dict] = []
+        self.lock = threading.Lock()
+
+    def default_client(self):
+        return None
+
+    def send(self, client, request: Dict, timeout: float) -> Dict:
+        with self.lock:
+            self.requests.append(request)
+            fail = self.failures > 0
+            self.failures -= fail
+        delay = self.latency() if callable(self.latency) else self.latency
+        time.sleep(min(delay, timeout))
+        if delay > timeout:
+            raise TimeoutError(f"stub answered after {delay:.2f}s, timeout {timeout:.2f}s")
+        if fail:
+            raise self.error
+        text = self.reply(request) if callable(self.reply) else self.reply
+        return {'text': text, 'response': None,
+                'input_tokens': count_tokens(str(request.get('messages', ''))),
+                'output_tokens': count_tokens(text)}
+
+    async def astream(self, client, request: Dict, timeout: float):
+        result = await asyncio.to_thread(self.send, client, request, timeout)
+        text = result['text']
+        for start in range(0, len(text), STREAM_CHUNK_CHARS):
+            yield text[start:start + STREAM_CHUNK_CHARS]
+
+
+# ------------------------------------------------------------------ metrics
+
+class SiteMetrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.recent: deque = deque(maxlen=RECENT_LATENCIES)
+        self.counts = {'calls': 0, 'ok': 0, 'errors': 0, 'timeouts': 0, 'retries': 0,
+                       'hedges': 0, 'hedge_wins': 0, 'input_tokens': 0, 'output_tokens': 0,
+                       'cache_read_tokens': 0, 'cache_write_tokens': 0}
+        self.max_ms = 0.0
+
+    def count(self, key: str, amount: int = 1):
+        with self.lock:
+            self.counts[key] += amount
+
+    def observe(self, ms: float):
+        with self.lock:
+            bucket = next((i for i, edge in enumerate(LATENCY_BUCKETS_MS) if ms <= edge),
+                          len(LATENCY_BUCKETS_MS))
+            self.histogram[bucket] += 1
+            self.recent.append(ms)
+            self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q: float) -> float:
+        with self.lock:
+            ordered = sorted(self.recent)
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+# ------------------------------------------------------------------ gateway
+
+class Gateway:
+    """Rate-limited, deadline-bounded model calls with per-site metrics"""
+
+    def __init__(self):
+        self.providers: Dict[str, object] = {}
+        self.semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self.request_buckets: Dict[str, TokenBucket] = {}
+        self.token_buckets: Dict[str, TokenBucket] = {}
+        self.sites: Dict[str, SiteMetrics] = {}
+        self.lock = threading.Lock()
+        self.pool = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix='goldex-gateway')
+        self.install(AnthropicProvider())
+        self.install(OpenAIProvider())
+
+    def install(self, provider, name: Optional[str] = None, concurrency: Optional[int] = None,
+                rpm: Optional[float] = None, tpm: Optional[float] = None):
+        """Register a provider under `name` (e.g. a StubProvider as 'anthropic' in tests)"""
+        name = name or provider.name
+        defaults = PROVIDER_DEFAULTS.get(name, PROVIDER_DEFAULTS['stub'])
+        concurrency = concurrency or int(_limit(name, 'CONCURRENCY', defaults[0]))
+        self.providers[name] = provider
+        self.semaphores[name] = threading.BoundedSemaphore(concurrency)
+        self.request_buckets[name] = TokenBucket(rpm or _limit(name, 'RPM', defaults[1]))
+        self.token_buckets[name] = TokenBucket(tpm or _limit(name, 'TPM', defaults[2]))
+
+    def site(self, name: str) -> SiteMetrics:
+        with self.lock:
+            return self.sites.setdefault(name, SiteMetrics())
+
+    # ----------------------------------------------------------------- send
+
+    @staticmethod
+    def _estimate(request: Dict) -> int:
+        return count_tokens(str(request.get('system', '')) + str(request.get('messages', '')))
+
+    @staticmethod
+    def _remaining(provider: str, expires: float) -> float:
+        remaining = expires - time.monotonic()
+        if remaining <= 0:
+            raise GatewayTimeout(f"{provider}: deadline passed while rate limited")
+        return remaining
+
+    def _send(self, provider: str, client, request: Dict, expires: float) -> Dict:
+        """One request: concurrency slot, rate buckets, then the SDK call with the remaining time"""
+        semaphore = self.semaphores[provider]
+        if not semaphore.acquire(timeout=max(0.0, expires - time.monotonic())):
+            raise GatewayTimeout(f"{provider}: no free slot before the deadline")
+        try:
+            if not (self.request_buckets[provider].acquire(1, expires)
+                    and self.token_buckets[provider].acquire(self._estimate(request), expires)):
+                raise GatewayTimeout(f"{provider}: rate limit would pass the deadline")
+            result = self.providers[provider].send(client, request, self._remaining(provider, expires))
+        finally:
+            semaphore.release()
+        self.token_buckets[provider].charge(result['output_tokens'])
+        return result
+
+    def _backoff(self, provider: str, error: Exception, attempt: int, retries: int,
+                 expires: float, metrics: SiteMetrics) -> float:
+        """Seconds to wait before retrying `error`; re-raises it if it can't be retried"""
+        if not is_retryable(error) or attempt == retries:
+            metrics.count('errors')
+            raise error
+        delay = _retry_after(error) or random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+        if time.monotonic() + delay >= expires:
+            metrics.count('timeouts')
+            raise GatewayTimeout(f"{provider}: retry would pass the deadline ({error})") from error
+        metrics.count('retries')
+        return delay
+
+    def _finish(self, result: Dict, started: float, attempt: int, metrics: SiteMetrics) -> Dict:
+        latency_ms = (time.monotonic() - started) * 1000
+        metrics.observe(latency_ms)
+        metrics.count('ok')
+        metrics.count('input_tokens', result['input_tokens'])
+        metrics.count('output_tokens', result['output_tokens'])
+        # Prompt-cache hits as the provider reports them (0 when nothing was cached)
+        metrics.count('cache_read_tokens', result.get('cache_read_tokens', 0))
+        metrics.count('cache_write_tokens', result.get('cache_write_tokens', 0))
+        return dict(result, latency_ms=round(latency_ms, 1), attempts=attempt + 1)
+
+    def _attempt(self, provider: str, client, request: Dict, expires: float,
+                 hedge_after: Optional[float], metrics: SiteMetrics) -> Dict:
+        """First successful answer of the request and, if it is slow, a hedged copy"""
+        futures = [self.pool.submit(self._send, provider, client, request, expires)]
+        if hedge_after is not None and time.monotonic() + hedge_after < expires:
+            done, _ = wait(futures, timeout=hedge_after)
+            if not done:
+                metrics.count('hedges')
+                futures.append(self.pool.submit(self._send, provider, client, request, expires))
+        pending, error = set(futures), None
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, expires - time.monotonic()),
+                                 return_when=FIRST_COMPLETED)
+            if not done:
+                # The losers keep running until their own SDK timeout (the same deadline)
+                raise GatewayTimeout(f"{provider}: no answer within the deadline")
+            for future in done:
+                if future.exception() is None:
+                    if len(futures) > 1 and future is futures[1]:
+                        metrics.count('hedge_wins')
+                    return dict(future.result(), hedged=len(futures) > 1)
+                error = future.exception()
+        raise error
+
+    def call(self, provider: str, site: str, client=None, deadline: float = DEFAULT_DEADLINE,
+             hedge_after: Optional[float] = None, retries: int = RETRIES, **request) -> Dict:
+        """Send `request` (SDK create() arguments) to `provider`, accounted to `site`
+
+        Returns {'text', 'response', 'input_tokens', 'output_tokens', 'latency_ms',
+        'attempts', 'hedged'}; raises GatewayTimeout or the last provider error.
+        """
+        metrics = self.site(site)
+        metrics.count('calls')
+        client = client if client is not None else self.providers[provider].default_client()
+        started = time.monotonic()
+        expires = started + deadline
+        for attempt in range(retries + 1):
+            try:
+                result = self._attempt(provider, client, request, expires, hedge_after, metrics)
+            except GatewayTimeout:
+                metrics.count('timeouts')
+                raise
+            except Exception as e:
+                time.sleep(self._backoff(provider, e, attempt, retries, expires, metrics))
+                continue
+            return self._finish(result, started, attempt, metrics)
+
+    # ---------------------------------------------------------------- stream
+
+    async def _stream_once(self, provider: str, client, request: Dict, expires: float,
+                           on_token: Callable[[str], None], parts: List[str]) -> int:
+        """One streamed request under the provider's slot and buckets; returns the input estimate"""
+        semaphore = self.semaphores[provider]
+        # Polled rather than blocking a worker thread, so a cancelled stream never holds a slot
+        while not semaphore.acquire(blocking=False):
+            if time.monotonic() >= expires:
+                raise GatewayTimeout(f"{provider}: no free slot before the deadline")
+            await asyncio.sleep(SLOT_POLL_SECONDS)
+        try:
+            estimate = self._estimate(request)
+            if not (await self.request_buckets[provider].acquire_async(1, expires)
+                    and await self.token_buckets[provider].acquire_async(estimate, expires)):
+                raise GatewayTimeout(f"{provider}: rate limit would pass the deadline")
+            remaining = self._remaining(provider, expires)
+
+            async def consume():
+                async for piece in self.providers[provider].astream(client, request, remaining):
+                    parts.append(piece)
+                    on_token(piece)
+
+            try:
+                await asyncio.wait_for(consume(), timeout=remaining)
+            except asyncio.TimeoutError:
+                raise GatewayTimeout(f"{provider}: stream did not finish within the deadline")
+        finally:
+            semaphore.release()
+        return estimate
+
+    async def stream(self, provider: str, site: str, on_token: Callable[[str], None], client=None,
+                     deadline: float = DEFAULT_DEADLINE, retries: int = RETRIES, **request) -> Dict:
+        """Streamed counterpart of call(): on_token gets each text piece as it arrives
+
+        Returns {'text', 'response', 'input_tokens', 'output_tokens', 'latency_ms',
+        'attempts', 'hedged'}; token counts are estimated from the text. Once a
+        piece has been streamed an error is raised instead of retried.
+        """
+        metrics = self.site(site)
+        metrics.count('calls')
+        client = client if client is not None else self.providers[provider].default_client()
+        started = time.monotonic()
+        expires = started + deadline
+        for attempt in range(retries + 1):
+            parts: List[str] = []
+            try:
+                estimate = await self._stream_once(provider, client, request, expires, on_token, parts)
+            except GatewayTimeout:
+                metrics.count('timeouts')
+                raise
+            except Exception as e:
+                if parts:
+                    metrics.count('errors')
+                    raise
+                await asyncio.sleep(self._backoff(provider, e, attempt, retries, expires, metrics))
+                continue
+            text = ''.join(parts)
+            output_tokens = count_tokens(text)
+            self.token_buckets[provider].charge(output_tokens)
+            result = {'text': text, 'response': None, 'input_tokens': estimate,
+                      'output_tokens': output_tokens, 'hedged': False}
+            return self._finish(result, started, attempt, metrics)
+
+    # --------------------------------------------------------------- report
+
+    def report(self) -> List[Dict]:
+        rows = []
+        for name, metrics in sorted(self.sites.items()):
+            rows.append(dict(metrics.counts, site=name,
+                             p50_ms=round(metrics.percentile(0.50), 1),
+                             p95_ms=round(metrics.percentile(0.95), 1),
+                             p99_ms=round(metrics.percentile(0.99), 1),
+                             max_ms=round(metrics.max_ms, 1),
+                             histogram=dict(zip([f"<={edge}ms" for edge in LATENCY_BUCKETS_MS] + ['slower'],
+                                                metrics.histogram))))
+        return rows
+
+    def print_report(self):
+        rows = self.report()
+        if not rows:
+            print(" No model calls made")
+            return
+        print(f" {'call site':<24} {'calls':>6} {'err':>4} {'t/o':>4} {'retry':>5} {'hedge':>7} "
+              f"{'p50':>8} {'p95':>8} {'p99':>8} {'tokens in/out':>15} {'cache read/write':>17}")
+        for row in rows:
+            print(f" {row['site']:<24} {row['calls']:>6} {row['errors']:>4} {row['timeouts']:>4} "
+                  f"{row['retries']:>5} {row['hedges']:>3}/{row['hedge_wins']:<3} {row['p50_ms']:>8} "
+                  f"{row['p95_ms']:>8} {row['p99_ms']:>8} {row['input_tokens']:>7}/{row['output_tokens']:<7} "
+                  f"{row['cache_read_tokens']:>8}/{row['cache_write_tokens']:<8}")
+            filled = {bucket: count for bucket, count in row['histogram'].items() if count}
+            print(f"   {filled}")
+
+
+GATEWAY = Gateway()
+
+
+def call(provider: str, site: str, **kwargs) -> Dict:
+    """GATEWAY.call(); see Gateway.call"""
+    return GATEWAY.call(provider, site, **kwargs)
+
+
+async def stream(provider: str, site: str, on_token: Callable[[str], None], **kwargs) -> Dict:
+    """GATEWAY.stream(); see Gateway.stream"""
+    return await GATEWAY.stream(provider, site, on_token, **kwargs)
+
+
+def report() -> List[Dict]:
+    return GATEWAY.report()
+
+
+def print_report():
+    GATEWAY.print_report()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GOLDEX gateway demo on the stub provider")
+    parser.add_argument('--calls', type=int, default=200)
+    parser.add_argument('--median', type=float, default=0.05, help="median stub latency (seconds)")
+    parser.add_argument('--sigma', type=float, default=0.8, help="lognormal spread of stub latency")
+    parser.add_argument('--hedge-after', type=float, default=None)
+    parser.add_argument('--deadline', type=float, default=2.0)
+    args = parser.parse_args()
+
+    stub = StubProvider('{"signal":"NONE"}',
+                        latency=lambda: random.lognormvariate(math.log(args.median), args.sigma))
+    GATEWAY.install(stub)
+    site = 'hedged' if args.hedge_after else 'plain'
+    for _ in range(args.calls):
+        try:
+            GATEWAY.call('stub', site, deadline=args.deadline, hedge_after=args.hedge_after,
+                         messages=[{'role': 'user', 'content': 'ping'}])
+        except GatewayTimeout:
+            pass
+    print_report()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+GOLDEX LAZY IMPORTS
+Defers heavy SDK imports (openai, anthropic, firebase_admin, pandas...) until
+the first attribute access, so entry points only pay for what a command uses.
+
+Startup profile:
+    python goldex_imports.py goldex_universe_cli.py     # import-time report
+"""
+
+import os
+import sys
+import time
+import importlib
+import importlib.util
+import subprocess
+import threading
+from typing import Dict, List, Tuple
+
+_lock = threading.Lock()
+_import_times: Dict[str, float] = {}
+
+
+class LazyModule:
+    """Module proxy that performs the real import on first attribute access"""
+
+    def __init__(self, name: str):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            with _lock:
+                module = self.__dict__['_module']
+                if module is None:
+                    name = self.__dict__['_name']
+                    start = time.perf_counter()
+                    module = importlib.import_module(name)
+                    _import_times[name] = time.perf_counter() - start
+                    self.__dict__['_module'] = module
+        return module
+
+    @property
+    def loaded(self) -> bool:
+        return self.__dict__['_module'] is not None
+
+    def __getattr__(self, item):
+        return getattr(self._load(), item)
+
+    def __setattr__(self, item, value):
+        setattr(self._load(), item, value)
+
+    def __repr__(self):
+        state = 'loaded' if self.loaded else 'lazy'
+        return f"<LazyModule {self.__dict__['_name']} ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """Return a proxy for `name`; already-imported modules resolve instantly"""
+    proxy = LazyModule(name)
+    if name in sys.modules:
+        proxy.__dict__['_module'] = sys.modules[name]
+    return proxy
+
+
+def is_available(name: str) -> bool:
+    """Check that a module can be imported without importing it"""
+    if name in sys.modules:
+        return True
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def import_times() -> List[Tuple[str, float]]:
+    """Seconds spent in each lazy import so far, slowest first"""
+    with _lock:
+        return sorted(_import_times.items(), key=lambda item: item[1], reverse=True)
+
+
+def print_import_report():
+    """Print the lazy imports this process actually paid for"""
+    times = import_times()
+    print("\n IMPORT PROFILE (lazy SDK loads)")
+    if not times:
+        print("   No heavy SDKs were loaded")
+    for name, seconds in times:
+        print(f"   {seconds * 1000:8.1f} ms  {name}")
+
+
+def profile_startup(script: str, top: int = 15) -> List[Tuple[str, int]]:
+    """Run `python -X importtime` on a script's imports and return the slowest
+
+    Only the module is imported (its `__main__` block does not run), so this
+    measures pure startup cost. Returns (module, cumulative microseconds).
+    """
+    script = os.path.abspath(script)
+    marker = '--goldex-profile-start--'
+    code = (
+        "import importlib.util, sys;"
+        f"sys.path.insert(0, {os.path.dirname(script)!r});"
+        f"sys.stderr.write({marker + chr(10)!r});"
+        f"spec = importlib.util.spec_from_file_location('_goldex_profiled', {script!r});"
+        "module = importlib.util.module_from_spec(spec);"
+        "spec.loader.exec_module(module)"
+    )
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            capture_output=True, text=True)
+
+    # Interpreter startup imports come before the marker and are not ours
+    stderr = result.stderr.split(marker, 1)[-1]
+
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3:
+            continue
+        name = parts[2][1:].rstrip()
+        if name.startswith(' '):
+            continue
+        try:
+            rows.append((name, int(parts[1])))
+        except ValueError:
+            continue
+
+    # Only imports made directly by the script (cumulative includes children)
+    rows.sort(key=lambda row: row[1], reverse=True)
+    return rows[:top]
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python goldex_imports.py <script.py> [<script.py> ...]")
+        return
+
+    for script in sys.argv[1:]:
+        rows = profile_startup(script)
+        total = sum(us for _, us in rows)
+        print(f"\n STARTUP PROFILE: {script}")
+        print("-" * 50)
+        for name, us in rows:
+            print(f"   {us / 1000:8.1f} ms  {name}")
+        print(f"   {'-' * 10}\n   {total / 1000:8.1f} ms  top-level total")
+
+
+if __name__ == "__main__":
+    main()
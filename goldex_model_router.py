@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+GOLDEX MODEL ROUTER
+Picks a model tier per trading decision instead of always calling the large one:
+- Tiers declare a quality level, an expected latency and their own deadline /
+  hedge settings; once a tier has enough calls, its observed gateway p50
+  replaces the declared latency
+- Each call names the quality it needs and its latency budget (from market
+  context); the cheapest tier meeting both is used
+- A small-tier answer that is a candidate trade (BUY/SELL within
+  `margin` points of the confidence threshold, or above it) is re-asked on
+  the top tier, whose answer decides; NONE and weak signals end at the small tier
+- A tier that times out (or exhausts its retries) falls back to another tier
+  within what is left of the latency budget; a candidate trade that the top
+  tier could not confirm is reported as unconfirmed
+
+    python goldex_model_router.py --decisions 200    # stub comparison vs large-only
+"""
+
+import os
+import json
+import time
+import random
+import argparse
+from collections import Counter, deque
+from typing import Callable, Dict, List, Optional
+
+import goldex_gateway
+
+ESCALATION_MARGIN = float(os.getenv('GOLDEX_ESCALATION_MARGIN', '10'))
+OBSERVED_MIN_CALLS = 20   # gateway samples before a tier's measured p50 is trusted
+RECENT_DECISIONS = 1024
+
+TIERS = {
+    'small': {'model': os.getenv('GOLDEX_SMALL_MODEL', 'claude-3-haiku-20240307'), 'max_tokens': 600,
+              'quality': 1, 'latency': 3.0, 'deadline': 10.0, 'hedge_after': 4.0},
+    'large': {'model': os.getenv('GOLDEX_LARGE_MODEL', 'claude-3-sonnet-20240229'), 'max_tokens': 1500,
+              'quality': 2, 'latency': 10.0, 'deadline': 20.0, 'hedge_after': 8.0},
+}
+
+
+def is_candidate(signal: Optional[Dict], threshold: float, margin: float = ESCALATION_MARGIN) -> bool:
+    """A BUY/SELL close enough to the threshold that it might become a trade"""
+    if not signal or signal.get('signal') not in ('BUY', 'SELL'):
+        return False
+    try:
+        return float(signal.get('confidence', 0)) >= threshold - margin
+    except (TypeError, ValueError):
+        return False
+
+
+class ModelRouter:
+    """Tiered model calls for one call site, through the shared gateway"""
+
+    def __init__(self, site: str, provider: str = 'anthropic', tiers: Optional[Dict[str, Dict]] = None,
+                 margin: float = ESCALATION_MARGIN, gateway: Optional[goldex_gateway.Gateway] = None):
+        self.site = site
+        self.provider = provider
+        self.tiers = tiers or TIERS
+        self.margin = margin
+        self.gateway = gateway or goldex_gateway.GATEWAY
+        self.order = sorted(self.tiers, key=lambda name: self.tiers[name]['quality'])
+        self.top = self.order[-1]
+        self.counts = Counter()
+        self.decisions: deque = deque(maxlen=RECENT_DECISIONS)
+
+    def tier_site(self, tier: str) -> str:
+        return f"{self.site}:{tier}"
+
+    def expected_latency(self, tier: str) -> float:
+        metrics = self.gateway.sites.get(self.tier_site(tier))
+        if metrics is not None and metrics.counts['ok'] >= OBSERVED_MIN_CALLS:
+            return metrics.percentile(0.5) / 1000
+        return self.tiers[tier]['latency']
+
+    def choose(self, quality: int = 1, latency_budget: Optional[float] = None) -> str:
+        """Cheapest tier with at least `quality` expected to answer within the budget"""
+        able = [tier for tier in self.order if self.tiers[tier]['quality'] >= quality] or [self.top]
+        fitting = [tier for tier in able if latency_budget is None or self.expected_latency(tier) <= latency_budget]
+        return fitting[0] if fitting else min(able, key=self.expected_latency)
+
+    # ----------------------------------------------------------------- calls
+
+    def call(self, tier: str, client=None, expires: Optional[float] = None, **request) -> Dict:
+        """One gateway call on `tier`, cut short to end by `expires` (monotonic) if given"""
+        spec = self.tiers[tier]
+        deadline = spec['deadline']
+        if expires is not None:
+            deadline = min(deadline, expires - time.monotonic())
+            if deadline <= 0:
+                raise goldex_gateway.GatewayTimeout(f"{self.site}: latency budget spent before {tier}")
+        return self.gateway.call(self.provider, self.tier_site(tier), client=client,
+                                 deadline=deadline, hedge_after=spec.get('hedge_after'),
+                                 model=spec['model'], max_tokens=spec['max_tokens'], **request)
+
+    def complete(self, tier: str, client=None, failed: Optional[set] = None,
+                 expires: Optional[float] = None, **request) -> Dict:
+        """Call `tier`; if it times out or stays unavailable, try the other tiers
+        (nearest quality first) in whatever time is left before `expires`"""
+        failed = failed if failed is not None else set()
+        fallbacks = sorted((t for t in self.order if t != tier),
+                           key=lambda t: abs(self.tiers[t]['quality'] - self.tiers[tier]['quality']))
+        error = None
+        for candidate in [tier] + fallbacks:
+            try:
+                return dict(self.call(candidate, client, expires, **request),
+                            tier=candidate, fallback=candidate != tier)
+            except Exception as e:
+                # SDK timeouts (e.g. APITimeoutError) are not TimeoutError subclasses
+                if not (isinstance(e, TimeoutError) or goldex_gateway.is_retryable(e)):
+                    raise
+                failed.add(candidate)
+                self.counts['timeouts'] += 1
+                error = e
+        raise error
+
+    def decide(self, parse: Callable[[str], Optional[Dict]], threshold: float, client=None,
+               quality: int = 1, latency_budget: Optional[float] = None, **request) -> Dict:
+        """Signal from the cheapest suitable tier, escalated to the top tier for candidate trades
+
+        The first answer (including any fallback) must arrive within `latency_budget`;
+        escalating a candidate trade keeps the top tier's own deadline, since that
+        answer is what protects trade quality.
+
+        Returns {'signal', 'tier', 'escalated', 'fallback', 'confirmed', 'latency_ms'}.
+        """
+        started = time.monotonic()
+        failed = set()
+        tier = self.choose(quality, latency_budget)
+        expires = started + latency_budget if latency_budget is not None else None
+        result = self.complete(tier, client, failed, expires, **request)
+        signal = parse(result['text'])
+        escalated = False
+        if result['tier'] != self.top and is_candidate(signal, threshold, self.margin) and self.top not in failed:
+            try:
+                result = dict(self.call(self.top, client, **request), tier=self.top, fallback=result['fallback'])
+                signal = parse(result['text'])
+                escalated = True
+            except Exception:
+                failed.add(self.top)
+                self.counts['escalation_failures'] += 1
+        confirmed = result['tier'] == self.top or not is_candidate(signal, threshold, self.margin)
+
+        latency_ms = (time.monotonic() - started) * 1000
+        self.decisions.append(latency_ms)
+        self.counts['decisions'] += 1
+        self.counts[f"chose_{tier}"] += 1
+        self.counts[f"answered_{result['tier']}"] += 1
+        self.counts['escalations'] += escalated
+        self.counts['fallbacks'] += result['fallback']
+        self.counts['unconfirmed'] += not confirmed
+        return {'signal': signal, 'tier': result['tier'], 'escalated': escalated,
+                'fallback': result['fallback'], 'confirmed': confirmed, 'latency_ms': round(latency_ms, 1)}
+
+    # ---------------------------------------------------------------- report
+
+    def report(self) -> Dict:
+        ordered = sorted(self.decisions)
+        pick = lambda q: round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 1) if ordered else 0.0
+        return dict(self.counts, site=self.site, p50_ms=pick(0.5), p95_ms=pick(0.95))
+
+    def print_report(self):
+        row = self.report()
+        print(f" {self.site}: {row.get('decisions', 0)} decisions, p50 {row['p50_ms']} ms, p95 {row['p95_ms']} ms")
+        print("   " + ", ".join(f"{key} {value}" for key, value in sorted(row.items())
+                                  if key not in ('site', 'p50_ms', 'p95_ms', 'decisions')))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GOLDEX model router demo on the stub provider")
+    parser.add_argument('--decisions', type=int, default=200)
+    parser.add_argument('--scale', type=float, default=0.01, help="seconds per declared second of latency")
+    parser.add_argument('--threshold', type=float, default=85)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    outcomes: List[Dict] = []
+    tiers = {name: dict(spec, latency=spec['latency'] * args.scale, deadline=spec['deadline'] * args.scale * 10,
+                        hedge_after=None) for name, spec in TIERS.items()}
+
+    def reply(request):
+        # Both tiers see the same market; the large model's answer is the reference,
+        # the small one is a few confidence points off
+        spec = next(spec for spec in tiers.values() if spec['model'] == request['model'])
+        time.sleep(rng.lognormvariate(0, 0.3) * spec['latency'])
+        outcome = outcomes[-1]
+        if spec['quality'] < TIERS['large']['quality']:
+            outcome = dict(outcome, confidence=max(0, min(100, outcome['confidence'] + rng.gauss(0, 5))))
+        return json.dumps(outcome)
+
+    goldex_gateway.GATEWAY.install(goldex_gateway.StubProvider(reply), name='stub')
+    routed = ModelRouter('routed', provider='stub', tiers=tiers)
+    large_only = ModelRouter('large_only', provider='stub', tiers={'large': tiers['large']})
+    mismatched = 0
+    for _ in range(args.decisions):
+        roll = rng.random()
+        if roll < 0.6:
+            outcomes.append({'signal': 'NONE', 'confidence': rng.uniform(0, 60)})
+        else:
+            outcomes.append({'signal': rng.choice(['BUY', 'SELL']), 'confidence': rng.uniform(40, 100)})
+        a = routed.decide(json.loads, args.threshold, messages=[])['signal']
+        b = large_only.decide(json.loads, args.threshold, messages=[])['signal']
+        trade_a = is_candidate(a, args.threshold, 0)
+        trade_b = is_candidate(b, args.threshold, 0)
+        mismatched += trade_a != trade_b
+    routed.print_report()
+    large_only.print_report()
+    print(f" trades that differ from large-only: {mismatched}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,495 @@
+#!/usr/bin/env python3
+"""
+GOLDEX PBXPROJ
+Streaming OpenStep-plist reader for Xcode project.pbxproj files:
+- One compiled-regex tokenizer pass feeding one explicit-stack loop that builds
+  the object graph: id -> object, section index, reference edges (with the
+  /* comment */ Xcode prints after each id)
+- Edits are splices over the original text, so an untouched graph serializes
+  byte-for-byte and an edited one only changes the edited spans
+- Duplicate-id repair builds one remap table from the graph (definitions vs
+  references, told apart by the comment Xcode writes next to each id) and
+  rewrites the file in one linear pass, then re-checks referential integrity
+
+    python goldex_pbxproj.py "Planet ProTrader.xcodeproj"     # graph summary
+"""
+
+import os
+import re
+import sys
+import time
+import uuid
+from bisect import bisect_right
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+PBXPROJ = 'project.pbxproj'
+GUID_RE = re.compile(r'[0-9A-F]{24}\Z')
+BARE_RE = re.compile(r'[\w$+:.\-/@~]+\Z')
+SECTION_RE = re.compile(r'/\* (Begin|End) (\w+) section \*/')
+# Values that hold ids of objects in *other* projects
+FOREIGN_ID_KEYS = {'remoteGlobalIDString'}
+
+# Bare words may hold paths; unrolled ('/' only between runs) so failed matches never backtrack
+_SCALAR = (r'"(?:[^"\\]|\\.)*"'
+           r'|(?=[\w$+:.\-@~/])(?!/[*/])[\w$+:.\-@~]*(?:/(?![*/])[\w$+:.\-@~]*)*')
+_COMMENT = r'/\*[^*]*\*+(?:[^/*][^*]*\*+)*/'   # never runs past the first */
+# Every group is captured so token offsets follow from the group lengths alone.
+# `key = scalar /* comment */;` is one token: most of a project file is such fields.
+_TOKEN_RE = re.compile(
+    r'(\s*)(?:(' + _SCALAR + r')(\s*=\s*)(' + _SCALAR + r')(\s*(?:' + _COMMENT + r'\s*)?;)'
+    r'|(' + _COMMENT + r'|//[^\n]*'  # comment
+    r'|[{}()=;,]'                      # punctuation
+    r'|' + _SCALAR + r'))',            # quoted string or bare word
+    re.S)
+_ESCAPES = {'n': '\n', 't': '\t', '"': '"', '\\': '\\'}
+_ESCAPE_RE = re.compile(r'\\(.)')
+_PUNCT = frozenset('{}()=;,')
+
+# Frame slots of the reader's explicit stack
+_CONTAINER, _MODE, _KEY, _OWNER, _FIELD, _SPANS, _VALUE_START, _ENTRY = range(8)
+# Modes: dictionary expects key / '=' / value / ';', array expects value / ','
+_KEY_OR_CLOSE, _EQUALS, _DICT_VALUE, _SEMICOLON, _ARRAY_VALUE, _COMMA = range(6)
+
+
+class PbxprojError(ValueError):
+    """Malformed project file (message carries the line number)"""
+
+
+class Reference(NamedTuple):
+    start: int              # span of the id token in the text
+    end: int
+    id: str
+    owner: Optional[str]    # object whose body holds the reference (None: top level)
+    key: str                # field it appears under
+    comment: Optional[str]  # the /* ... */ Xcode prints after it
+
+
+class PbxObject:
+    """One entry of the `objects` dictionary"""
+
+    __slots__ = ('id', 'isa', 'fields', 'spans', 'start', 'end', 'id_end', 'comment', 'section')
+
+    def __init__(self, id, fields, spans, start, end, id_end, comment, section):
+        self.id = id
+        self.isa = fields.get('isa')
+        self.fields = fields
+        self.spans = spans          # field -> (start, end) of its value
+        self.start = start          # entry span: id token .. closing ';'
+        self.end = end
+        self.id_end = id_end        # the id token is text[start:id_end]
+        self.comment = comment
+        self.section = section
+
+    def __repr__(self):
+        return f"<{self.isa} {self.id} {self.comment or ''}>"
+
+
+def unquote(token: str) -> str:
+    if token.startswith('"'):
+        return _ESCAPE_RE.sub(lambda m: _ESCAPES.get(m.group(1), m.group(0)), token[1:-1])
+    return token
+
+
+def quote(value: str) -> str:
+    """Value as Xcode writes it (bare when it can be)"""
+    if value and BARE_RE.match(value):
+        return value
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+
+
+def _line(text: str, offset: int) -> int:
+    return text.count('\n', 0, offset) + 1
+
+
+def _check_coverage(text: str, start: int, end: int):
+    """findall silently skips characters no token accepts: report the first one"""
+    pos = start
+    for match in _TOKEN_RE.finditer(text, start, end):
+        if match.start() != pos:
+            break
+        pos = match.end()
+    rest = text[pos:end]
+    if rest.strip():
+        offset = pos + len(rest) - len(rest.lstrip())
+        raise PbxprojError(f"unexpected character {text[offset]!r} at line {_line(text, offset)}")
+
+
+def read(text: str, start: int = 0, end: Optional[int] = None, entries_only: bool = False):
+    """Single pass over the tokens: (root, objects, references, sections)
+
+    With entries_only, text[start:end] is read as the inside of the `objects`
+    dictionary (e.g. one section), and root is None.
+    """
+    end = len(text) if end is None else end
+    objects: List[PbxObject] = []
+    references: list = []
+    sections: Dict[str, list] = {}
+    section = None
+    root = None
+    stack: list = []
+    last_ref = None      # reference waiting for its trailing comment
+    last_entry = None    # object entry waiting for its comment
+    pos = start
+
+    def fail(message, offset):
+        _check_coverage(text, start, end)  # a skipped character explains any later error
+        raise PbxprojError(f"{message} at line {_line(text, offset)}")
+
+    if entries_only:
+        stack.append([None, _KEY_OR_CLOSE, None, None, 'objects', None, 0, None])
+
+    for ws, key_tok, equals, value_tok, tail, tok in _TOKEN_RE.findall(text, start, end):
+        pos += len(ws)
+        if key_tok:
+            # `key = scalar;` in one token
+            frame = stack[-1] if stack else None
+            if frame is None or frame[_MODE] != _KEY_OR_CLOSE or frame[_CONTAINER] is None:
+                fail(f"unexpected {key_tok!r}", pos)
+            key_start = pos
+            value_start = pos + len(key_tok) + len(equals)
+            value_end = value_start + len(value_tok)
+            pos = value_end + len(tail)
+            key = unquote(key_tok) if key_tok[0] == '"' else key_tok
+            value = unquote(value_tok) if value_tok[0] == '"' else value_tok
+            frame[_CONTAINER][key] = value
+            if frame[_SPANS] is not None:
+                frame[_SPANS][key] = (value_start, value_end)
+            if len(key) == 24 and GUID_RE.match(key):
+                references.append([key_start, key_start + len(key_tok), key, frame[_OWNER], frame[_FIELD], None])
+            if len(value) == 24 and key not in FOREIGN_ID_KEYS and GUID_RE.match(value):
+                comment = tail[tail.index('/*') + 2:tail.rindex('*/')].strip() if '/*' in tail else None
+                references.append([value_start, value_end, value, frame[_OWNER], key, comment])
+            last_ref = None
+            continue
+        tok_start = pos
+        pos += len(tok)
+        first = tok[0]
+
+        if first == '/' and (tok[1:2] == '*' or tok[1:2] == '/'):
+            if tok.startswith('/* Begin ') or tok.startswith('/* End '):
+                marker = SECTION_RE.fullmatch(tok)
+                if marker and marker.group(1) == 'Begin':
+                    section = marker.group(2)
+                    sections.setdefault(section, [tok_start, None])
+                elif marker:
+                    if marker.group(2) in sections:
+                        sections[marker.group(2)][1] = pos
+                    section = None
+                continue
+            if last_ref is not None:
+                last_ref[5] = tok[2:-2].strip()
+            elif last_entry is not None and last_entry[3] is None:
+                last_entry[3] = tok[2:-2].strip()
+            last_ref = None
+            continue
+        last_ref = None
+
+        if not stack:
+            if root is not None:
+                fail("trailing content after the root dictionary", tok_start)
+            if tok != '{':
+                fail("project file does not start with '{'", tok_start)
+            stack.append([{}, _KEY_OR_CLOSE, None, None, '', None, 0, None])
+            continue
+
+        frame = stack[-1]
+        mode = frame[_MODE]
+
+        if first in _PUNCT and len(tok) == 1:
+            if tok == '=' and mode == _EQUALS:
+                frame[_MODE] = _DICT_VALUE
+                continue
+            if tok == ';' and mode == _SEMICOLON:
+                frame[_MODE] = _KEY_OR_CLOSE
+                entry = frame[_ENTRY]
+                if entry is not None:
+                    # objects entry complete: id, start, id_end, comment, section, fields, spans
+                    objects.append(PbxObject(entry[0], entry[5], entry[6], entry[1], pos,
+                                             entry[2], entry[3], entry[4]))
+                    frame[_ENTRY] = None
+                    last_entry = None
+                continue
+            if tok == ',' and mode == _COMMA:
+                frame[_MODE] = _ARRAY_VALUE
+                continue
+            if (tok == '{' or tok == '(') and (mode == _DICT_VALUE or mode == _ARRAY_VALUE):
+                field = frame[_KEY] if mode == _DICT_VALUE else frame[_FIELD]
+                owner = frame[_OWNER]
+                spans = None
+                if tok == '{' and frame[_CONTAINER] is None:
+                    # a new object inside `objects`
+                    entry = frame[_ENTRY]
+                    if entry is None:
+                        fail("object without an id", tok_start)
+                    owner, field, spans = entry[0], '', entry[6]
+                frame[_VALUE_START] = tok_start
+                if tok == '{':
+                    objects_dict = owner is None and len(stack) == 1 and field == 'objects'
+                    stack.append([None if objects_dict else {}, _KEY_OR_CLOSE, None, owner, field,
+                                  spans, 0, None])
+                else:
+                    stack.append([[], _ARRAY_VALUE, None, owner, field, None, 0, None])
+                continue
+            if (tok == '}' and mode == _KEY_OR_CLOSE) or (tok == ')' and (mode == _ARRAY_VALUE or mode == _COMMA)):
+                stack.pop()
+                value = frame[_CONTAINER]
+                if not stack:
+                    if entries_only:
+                        fail("unbalanced '}'", tok_start)
+                    root = value
+                    continue
+                parent = stack[-1]
+                if parent[_CONTAINER] is None:
+                    parent[_ENTRY][5] = value
+                    parent[_MODE] = _SEMICOLON
+                elif parent[_MODE] == _DICT_VALUE:
+                    parent[_CONTAINER][parent[_KEY]] = value
+                    if parent[_SPANS] is not None:
+                        parent[_SPANS][parent[_KEY]] = (parent[_VALUE_START], pos)
+                    parent[_MODE] = _SEMICOLON
+                else:
+                    parent[_CONTAINER].append(value)
+                    parent[_MODE] = _COMMA
+                continue
+            fail(f"unexpected {tok!r}", tok_start)
+
+        # Scalar: quoted string or bare word
+        value = unquote(tok) if first == '"' else tok
+        if mode == _KEY_OR_CLOSE:
+            if frame[_CONTAINER] is None:
+                # `ID /* comment */ = {` inside objects: id, start, id_end, comment, section, fields, spans
+                last_entry = frame[_ENTRY] = [value, tok_start, pos, None, section, None, {}]
+            else:
+                frame[_KEY] = value
+                if len(value) == 24 and GUID_RE.match(value):  # e.g. TargetAttributes keys
+                    last_ref = [tok_start, pos, value, frame[_OWNER], frame[_FIELD], None]
+                    references.append(last_ref)
+            frame[_MODE] = _EQUALS
+            continue
+        if mode == _DICT_VALUE:
+            if frame[_CONTAINER] is None:
+                fail("object is not a dictionary", tok_start)
+            key = frame[_KEY]
+            frame[_CONTAINER][key] = value
+            if frame[_SPANS] is not None:
+                frame[_SPANS][key] = (tok_start, pos)
+            frame[_MODE] = _SEMICOLON
+        elif mode == _ARRAY_VALUE:
+            key = frame[_FIELD]
+            frame[_CONTAINER].append(value)
+            frame[_MODE] = _COMMA
+        else:
+            fail(f"unexpected {tok!r}", tok_start)
+        if len(value) == 24 and key not in FOREIGN_ID_KEYS and GUID_RE.match(value):
+            last_ref = [tok_start, pos, value, frame[_OWNER], key, None]
+            references.append(last_ref)
+
+    if text[pos:end].strip():
+        _check_coverage(text, start, end)
+    if entries_only:
+        if len(stack) != 1 or stack[0][_MODE] != _KEY_OR_CLOSE:
+            fail("unterminated object", pos)
+    elif root is None:
+        fail("unterminated project file" if stack else "empty project file", pos)
+    return root, objects, [Reference._make(ref) for ref in references], sections
+
+
+class PbxGraph:
+    """Parsed project: objects, sections and references, plus pending text edits"""
+
+    def __init__(self, text: str, root: dict, objects: List[PbxObject],
+                 references: List[Reference], sections: Dict[str, List[int]]):
+        self.text = text
+        self.root = root
+        self.objects: Dict[str, PbxObject] = {}
+        self.definitions: Dict[str, List[PbxObject]] = defaultdict(list)
+        for obj in objects:
+            self.definitions[obj.id].append(obj)
+            self.objects.setdefault(obj.id, obj)
+        self.references = references
+        self.sections = {name: tuple(span) for name, span in sections.items()}
+        self.section_objects: Dict[str, List[str]] = defaultdict(list)
+        for obj in objects:
+            self.section_objects[obj.section or ''].append(obj.id)
+        self.referrers: Dict[str, List[Reference]] = defaultdict(list)
+        for ref in references:
+            self.referrers[ref.id].append(ref)
+        self.edits: List[Tuple[int, int, str]] = []
+
+    # ----------------------------------------------------------------- query
+
+    @property
+    def root_object(self) -> Optional[str]:
+        return self.root.get('rootObject')
+
+    def all_definitions(self) -> List[PbxObject]:
+        return [obj for defs in self.definitions.values() for obj in defs]
+
+    def duplicate_ids(self) -> Dict[str, int]:
+        return {object_id: len(defs) for object_id, defs in self.definitions.items() if len(defs) > 1}
+
+    def by_isa(self, isa: str) -> List[PbxObject]:
+        return [obj for obj in self.objects.values() if obj.isa == isa]
+
+    def dangling_references(self) -> List[Reference]:
+        """References to ids no object defines"""
+        return [ref for ref in self.references if ref.id not in self.objects]
+
+    def new_id(self) -> str:
+        """A fresh 24-hex id unused anywhere in the file"""
+        while True:
+            object_id = uuid.uuid4().hex[:24].upper()
+            if object_id not in self.definitions and object_id not in self.referrers:
+                self.referrers[object_id] = []  # reserve it
+                return object_id
+
+    # ----------------------------------------------------------------- edits
+
+    def replace(self, start: int, end: int, text: str):
+        """Queue a splice of the original text (spans must not overlap)"""
+        self.edits.append((start, end, text))
+
+    def set_field(self, obj: PbxObject, field: str, value: str):
+        """Replace a scalar field's value in place"""
+        start, end = obj.spans[field]
+        self.replace(start, end, quote(value))
+
+    def remove_object(self, obj: PbxObject):
+        """Drop an entry; a line holding nothing else goes with it"""
+        start, end = obj.start, obj.end
+        line_start = self.text.rfind('\n', 0, start) + 1
+        line_end = self.text.find('\n', end)
+        line_end = len(self.text) if line_end == -1 else line_end
+        if not self.text[line_start:start].strip() and not self.text[end:line_end].strip():
+            start, end = line_start, min(line_end + 1, len(self.text))
+        self.replace(start, end, '')
+
+    def serialize(self) -> str:
+        """Original text with the queued edits applied (one linear pass)"""
+        if not self.edits:
+            return self.text
+        parts, pos = [], 0
+        for start, end, replacement in sorted(self.edits, key=lambda e: (e[0], e[1])):
+            if start < pos:
+                raise PbxprojError(f"overlapping edits at offset {start}")
+            parts.append(self.text[pos:start])
+            parts.append(replacement)
+            pos = end
+        parts.append(self.text[pos:])
+        return ''.join(parts)
+
+    def save(self, path: str):
+        """Atomic write (temp file + rename), preserving line endings"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(self.serialize())
+        os.replace(tmp_path, path)
+
+
+def _body(graph: PbxGraph, obj: PbxObject) -> str:
+    return graph.text[obj.id_end:obj.end]
+
+
+def repair_duplicate_ids(graph: PbxGraph) -> Dict:
+    """Give every extra definition of an id its own id, in one rewrite
+
+    The first definition keeps the id. An extra definition identical to the
+    first is a pasted copy and is dropped; any other gets a new id, and the
+    references whose comment names it (`ID /* Foo.swift in Sources */`) follow
+    it. References that can't be told apart stay with the first definition.
+    Costs one pass over the references plus one linear serialize, however many
+    ids are duplicated. Returns the remap, counts, the new text and the
+    dangling references found by re-reading it.
+    """
+    remap: Dict[str, List[Tuple[str, Optional[str]]]] = {}
+    removed: List[Tuple[int, int]] = []
+    targets: Dict[str, Dict[str, str]] = {}   # id -> comment -> new id
+    ambiguous: Dict[str, set] = {}
+
+    for object_id, defs in graph.definitions.items():
+        if len(defs) < 2:
+            continue
+        first = defs[0]
+        by_comment: Dict[str, str] = {}
+        clashes = {first.comment}
+        for obj in defs[1:]:
+            if _body(graph, obj) == _body(graph, first):
+                graph.remove_object(obj)
+                removed.append((obj.start, obj.end))
+                continue
+            new_id = graph.new_id()
+            graph.replace(obj.start, obj.id_end, new_id)
+            remap.setdefault(object_id, []).append((new_id, obj.comment))
+            if obj.comment in by_comment:
+                clashes.add(obj.comment)
+            by_comment[obj.comment] = new_id
+        targets[object_id] = by_comment
+        ambiguous[object_id] = clashes
+
+    removed.sort()
+    removed_starts = [start for start, _ in removed]
+    retargeted = 0
+    for object_id, by_comment in targets.items():
+        if not by_comment:
+            continue
+        clashes = ambiguous[object_id]
+        for ref in graph.referrers[object_id]:
+            comment = ref.comment
+            if comment is None or comment in clashes:
+                continue
+            new_id = by_comment.get(comment)
+            if new_id is None:
+                # `Foo.swift in Sources` still names the file reference `Foo.swift`
+                new_id = by_comment.get(comment.split(' in ', 1)[0])
+            if new_id is None:
+                continue
+            i = bisect_right(removed_starts, ref.start) - 1
+            if i >= 0 and ref.start < removed[i][1]:
+                continue  # inside a dropped copy
+            graph.replace(ref.start, ref.end, new_id)
+            retargeted += 1
+
+    text = graph.serialize()
+    repaired = parse(text)
+    return {
+        'remap': remap,
+        'renamed': sum(len(ids) for ids in remap.values()),
+        'removed': len(removed),
+        'retargeted': retargeted,
+        'text': text,
+        'duplicates': repaired.duplicate_ids(),
+        'dangling': repaired.dangling_references(),
+    }
+
+
+def parse(text: str) -> PbxGraph:
+    return PbxGraph(text, *read(text))
+
+
+def pbxproj_path(path: str) -> str:
+    """Accept a project.pbxproj or the .xcodeproj bundle around it"""
+    return os.path.join(path, PBXPROJ) if os.path.isdir(path) else path
+
+
+def load(path: str) -> PbxGraph:
+    with open(pbxproj_path(path), 'r', encoding='utf-8', newline='') as f:
+        return parse(f.read())
+
+
+def main():
+    path = pbxproj_path(sys.argv[1] if len(sys.argv) > 1 else PBXPROJ)
+    started = time.perf_counter()
+    graph = load(path)
+    elapsed = time.perf_counter() - started
+    print(f" {path}: {len(graph.objects)} objects, {len(graph.references)} references, "
+          f"{len(graph.sections)} sections ({elapsed * 1000:.1f} ms)")
+    for name, ids in sorted(graph.section_objects.items()):
+        print(f"  {len(ids):6}  {name or '(outside sections)'}")
+    duplicates = graph.duplicate_ids()
+    if duplicates:
+        print(f" ⚠️ {len(duplicates)} ids defined more than once")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+GOLDEX PBXPROJ CHECK
+Local integrity checker for project.pbxproj, fast enough to run on every save:
+- Structure (parses, balanced sections, every object has an isa matching its
+  section, rootObject is a PBXProject), duplicate ids, dangling references,
+  orphaned PBXBuildFiles, malformed `PACKAGE:` references and package links
+  pointing at the wrong kind of object
+- Incremental: sections are cut into content-defined chunks of entries, each
+  hashed; only chunks whose bytes changed are re-read, the rest come from a
+  cached summary (ids, isas, references), so the cross-section checks are set
+  lookups over summaries, not a re-parse
+- Exit status 1 when anything is wrong (pre-commit hook / CI friendly)
+
+    python goldex_pbxproj_check.py "Planet ProTrader.xcodeproj"
+    git diff --cached --name-only -- '*.pbxproj' | xargs -r python goldex_pbxproj_check.py
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import zlib
+import hashlib
+import argparse
+from bisect import bisect_right
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from goldex_pbxproj import SECTION_RE, PbxprojError, pbxproj_path, read
+
+DEFAULT_CACHE = os.getenv('GOLDEX_PBXPROJ_CACHE', 'goldex_pbxproj_check.json')
+CACHE_VERSION = 2
+CHUNK_ENTRIES = 64  # average entries per cached chunk
+MAX_REPORTED = 50  # issues printed per check
+
+# `PACKAGE:<id>::<product>` is what a half-written package link leaves behind
+PACKAGE_RE = re.compile(r'PACKAGE:[^\s;,"]*')
+PACKAGE_REFERENCES = ('XCRemoteSwiftPackageReference', 'XCLocalSwiftPackageReference')
+PRODUCT_DEPENDENCIES = ('XCSwiftPackageProductDependency',)
+_ENTRY_START_RE = re.compile(r'\n\t\t([0-9A-F]{24})\b')
+# Reference key -> isas the referenced object may have
+EXPECTED_ISA = {
+    'package': PACKAGE_REFERENCES,
+    'packageReferences': PACKAGE_REFERENCES,
+    'productRef': PRODUCT_DEPENDENCIES,
+    'packageProductDependencies': PRODUCT_DEPENDENCIES,
+}
+
+
+def _digest(text: str) -> str:
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def section_spans(text: str) -> Tuple[List[Tuple[str, int, int]], List[Tuple[str, int]]]:
+    """(name, start, end) of every `/* Begin X section */ ... /* End X section */`
+
+    Only the markers are scanned, not the content. Unbalanced markers are
+    returned as problems (message, offset) instead of spans.
+    """
+    spans, problems = [], []
+    open_name, open_start = None, 0
+    for marker in SECTION_RE.finditer(text):
+        kind, name = marker.groups()
+        if kind == 'Begin':
+            if open_name is not None:
+                problems.append((f"section {open_name} is never ended", open_start))
+            open_name, open_start = name, marker.start()
+        elif open_name != name:
+            problems.append((f"End {name} section without a Begin", marker.start()))
+        else:
+            spans.append((name, open_start, marker.end()))
+            open_name = None
+    if open_name is not None:
+        problems.append((f"section {open_name} is never ended", open_start))
+    return spans, problems
+
+
+def entry_chunks(text: str, start: int, end: int) -> List[Tuple[int, int]]:
+    """Cut a section into runs of whole entries, at content-defined boundaries
+
+    A new chunk starts at an entry (`\\t\\t<id> ...` at line start, as Xcode
+    writes them) whose id hashes to 0 mod CHUNK_ENTRIES, so inserting or
+    removing an entry only changes the chunk around it.
+    """
+    bounds = [start]
+    for entry in _ENTRY_START_RE.finditer(text, start, end):
+        if zlib.crc32(entry.group(1).encode()) % CHUNK_ENTRIES == 0:
+            bounds.append(entry.start() + 1)
+    bounds.append(end)
+    return [(a, b) for a, b in zip(bounds, bounds[1:]) if a < b]
+
+
+def summarize(text: str, start: int, end: int, entries_only: bool = True,
+              section: Optional[str] = None) -> Dict:
+    """What the global checks need from one slice: ids, isas, references, local issues
+
+    Offsets are relative to `start`, so the summary stays valid when other
+    sections grow or shrink.
+    """
+    summary = {'objects': [], 'refs': [], 'issues': [], 'root': None}
+    try:
+        root, objects, references, _ = read(text, start, end, entries_only=entries_only)
+    except PbxprojError as e:
+        summary['issues'].append(['structure', str(e), None])
+        summary['broken'] = True
+        return summary
+    if root is not None:
+        summary['root'] = root.get('rootObject')
+    for obj in objects:
+        summary['objects'].append([obj.id, obj.isa, obj.start - start])
+        if not obj.isa:
+            summary['issues'].append(['structure', f"object {obj.id} has no isa", obj.start - start])
+        elif (obj.section or section) and (obj.section or section) != obj.isa:
+            summary['issues'].append(['structure', f"{obj.isa} {obj.id} sits in the {obj.section or section} section",
+                                      obj.start - start])
+    for ref in references:
+        summary['refs'].append([ref.id, ref.owner, ref.key, ref.start - start])
+    for found in PACKAGE_RE.finditer(text, start, end):
+        summary['issues'].append(['package', f"malformed package reference {found.group(0)!r}",
+                                  found.start() - start])
+    return summary
+
+
+class ProjectChecker:
+    """Checks project files, re-reading only the chunks that changed since the last run"""
+
+    def __init__(self, cache_path: Optional[str] = DEFAULT_CACHE):
+        self.cache_path = cache_path
+        self.cache: Dict[str, Dict] = {}
+        self.dirty = False
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'r') as f:
+                    data = json.load(f)
+                if data.get('version') == CACHE_VERSION:
+                    self.cache = data.get('projects', {})
+            except (OSError, ValueError):
+                self.cache = {}
+
+    def check(self, path: str) -> Dict:
+        """Issues of one project file: {'ok', 'issues': [{check, message, line}], ...}"""
+        started = time.perf_counter()
+        path = os.path.abspath(pbxproj_path(path))
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            text = f.read()
+
+        issues: List[Tuple[str, str, Optional[int]]] = []
+        spans, problems = section_spans(text)
+        issues.extend(('structure', message, offset) for message, offset in problems)
+
+        cached = self.cache.get(path, {})
+        used: Dict[str, Dict] = {}
+        placed: List[Tuple[Dict, int]] = []  # (summary, file offset its offsets are relative to)
+        reread = []
+        if problems:
+            # Section boundaries can't be trusted: read the whole file as one slice
+            placed.append((summarize(text, 0, len(text), entries_only=False), 0))
+            reread.append('(whole file)')
+        else:
+            for name, start, end in spans:
+                section = []
+                for chunk_start, chunk_end in entry_chunks(text, start, end):
+                    digest = _digest(f"{name}\0{text[chunk_start:chunk_end]}")
+                    summary = used.get(digest) or cached.get(digest)
+                    if summary is None:
+                        summary = summarize(text, chunk_start, chunk_end, section=name)
+                        reread.append(name)
+                    section.append((digest, summary, chunk_start))
+                if len(section) > 1 and any(summary.get('broken') for _, summary, _ in section):
+                    # A chunk boundary inside a malformed entry: report it for the whole section
+                    section = [(None, summarize(text, start, end, section=name), start)]
+                    reread.append(name)
+                for digest, summary, chunk_start in section:
+                    if digest and not summary.get('broken'):
+                        used[digest] = summary
+                    placed.append((summary, chunk_start))
+
+            # Everything outside the sections (header, root dictionary, stray objects)
+            skeleton, chunks, pos = [], [], 0
+            for _, start, end in spans:
+                chunks.append((sum(map(len, skeleton)), pos))
+                skeleton.append(text[pos:start])
+                pos = end
+            chunks.append((sum(map(len, skeleton)), pos))
+            skeleton.append(text[pos:])
+            skeleton_text = ''.join(skeleton)
+            digest = _digest(skeleton_text)
+            summary = cached.get(digest)
+            if summary is None:
+                summary = summarize(skeleton_text, 0, len(skeleton_text), entries_only=False)
+                if summary.get('broken'):
+                    try:
+                        read(text)  # same error, but with the line number of the real file
+                    except PbxprojError as e:
+                        summary['issues'] = [['structure', str(e), None]]
+                reread.append('(outside sections)')
+            if not summary.get('broken'):
+                used[digest] = summary
+            placed.append((_remap_skeleton(summary, chunks), 0))
+
+            # Only chunks of the current file are kept, so the cache never outgrows it
+            self.dirty = self.dirty or bool(reread) or used.keys() != cached.keys()
+            self.cache[path] = used
+
+        issues.extend(_global_issues(placed))
+        lines = _LineIndex(text) if issues else None
+        result = [{'check': check, 'message': message,
+                   'line': lines.line(offset) if offset is not None else None}
+                  for check, message, offset in issues]
+        return {
+            'path': path,
+            'ok': not result,
+            'issues': result,
+            'sections': len(spans),
+            'reread': list(dict.fromkeys(reread)),
+            'chunks_reread': len(reread),
+            'elapsed': time.perf_counter() - started,
+        }
+
+    def save(self):
+        if not self.cache_path or not self.dirty:
+            return
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': CACHE_VERSION, 'projects': self.cache}, f, separators=(',', ':'))
+        os.replace(tmp_path, self.cache_path)
+        self.dirty = False
+
+
+def _remap_skeleton(summary: Dict, chunks: List[Tuple[int, int]]) -> Dict:
+    """Skeleton offsets -> file offsets (chunks: (skeleton offset, file offset))"""
+    starts = [skeleton_start for skeleton_start, _ in chunks]
+
+    def to_text(offset):
+        if offset is None:
+            return None
+        skeleton_start, text_start = chunks[bisect_right(starts, offset) - 1]
+        return text_start + offset - skeleton_start
+
+    return {
+        'root': summary['root'],
+        'objects': [[i, isa, to_text(o)] for i, isa, o in summary['objects']],
+        'refs': [[i, owner, key, to_text(o)] for i, owner, key, o in summary['refs']],
+        'issues': [[check, message, to_text(o)] for check, message, o in summary['issues']],
+    }
+
+
+def _global_issues(placed: List[Tuple[Dict, int]]) -> List[Tuple[str, str, Optional[int]]]:
+    """Local issues plus the cross-section checks over the merged summaries"""
+    issues = []
+    isa: Dict[str, str] = {}
+    first_offset: Dict[str, int] = {}
+    counts = Counter()
+    root = None
+    for summary, base in placed:
+        root = root or summary['root']
+        issues.extend((check, message, None if o is None else base + o)
+                      for check, message, o in summary['issues'])
+        for object_id, object_isa, o in summary['objects']:
+            counts[object_id] += 1
+            if counts[object_id] == 1:
+                isa[object_id] = object_isa
+                first_offset[object_id] = base + o
+            else:
+                issues.append(('duplicate_id', f"{object_id} ({object_isa}) is also defined as "
+                               f"{isa[object_id]}", base + o))
+
+    if root is None:
+        issues.append(('structure', "no rootObject", None))
+    elif isa.get(root) != 'PBXProject':
+        issues.append(('structure', f"rootObject {root} is not a PBXProject", None))
+
+    in_build_phase = set()
+    for summary, base in placed:
+        for object_id, owner, key, o in summary['refs']:
+            target = isa.get(object_id)
+            if object_id not in isa:
+                issues.append(('dangling', f"{owner or 'root'}.{key} -> {object_id} (no such object)", base + o))
+            elif key in EXPECTED_ISA and target not in EXPECTED_ISA[key]:
+                issues.append(('package', f"{owner}.{key} -> {object_id} is a {target}, expected "
+                               f"{' or '.join(EXPECTED_ISA[key])}", base + o))
+            if key == 'files':
+                in_build_phase.add(object_id)
+
+    for object_id, object_isa in isa.items():
+        if object_isa == 'PBXBuildFile' and object_id not in in_build_phase:
+            issues.append(('orphaned_build_file', f"PBXBuildFile {object_id} is in no build phase",
+                           first_offset[object_id]))
+    return issues
+
+
+class _LineIndex:
+    def __init__(self, text: str):
+        self.starts = [m.end() for m in re.finditer('\n', text)]
+
+    def line(self, offset: int) -> int:
+        return bisect_right(self.starts, offset) + 1
+
+
+def check_project(path: str, cache_path: Optional[str] = DEFAULT_CACHE) -> Dict:
+    """One-shot check (loads and updates the cache)"""
+    checker = ProjectChecker(cache_path)
+    result = checker.check(path)
+    checker.save()
+    return result
+
+
+def print_report(result: Dict, limit: int = MAX_REPORTED):
+    name = os.path.relpath(result['path'])
+    if result['ok']:
+        print(f"✅ {name}: {result['sections']} sections OK "
+              f"({result['chunks_reread']} chunks re-read, {result['elapsed'] * 1000:.0f} ms)")
+        return
+    by_check = Counter(issue['check'] for issue in result['issues'])
+    print(f"❌ {name}: {len(result['issues'])} issues ({dict(by_check)})")
+    for issue in result['issues'][:limit]:
+        where = f":{issue['line']}" if issue['line'] else ''
+        print(f"   {name}{where}: [{issue['check']}] {issue['message']}")
+    if len(result['issues']) > limit:
+        print(f"   ... {len(result['issues']) - limit} more")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GOLDEX project.pbxproj integrity check")
+    parser.add_argument('projects', nargs='*', default=['.'],
+                        help="project.pbxproj files or .xcodeproj bundles (default: those in .)")
+    parser.add_argument('--cache', default=DEFAULT_CACHE, help="section cache file")
+    parser.add_argument('--no-cache', action='store_true')
+    args = parser.parse_args()
+
+    paths = []
+    for project in args.projects:
+        if os.path.isdir(project) and not project.endswith('.xcodeproj'):
+            paths.extend(os.path.join(project, name) for name in sorted(os.listdir(project))
+                         if name.endswith('.xcodeproj'))
+        else:
+            paths.append(project)
+
+    checker = ProjectChecker(None if args.no_cache else args.cache)
+    failed = False
+    for path in paths:
+        try:
+            result = checker.check(path)
+        except OSError as e:
+            print(f"❌ {path}: {e}")
+            failed = True
+            continue
+        print_report(result)
+        failed = failed or not result['ok']
+    checker.save()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
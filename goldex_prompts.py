@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+GOLDEX PROMPT TEMPLATES
+Shared prompt layer for every model call site:
+- Each prompt is a static prefix (instructions, output schema, slow-changing
+  rules) and a small dynamic suffix (market data, trades, the user's input)
+- The prefix is rendered once per distinct set of prefix fields and sent as the
+  system prompt, so providers can prefix-cache it between calls
+- Anthropic only caches prefixes above a per-model minimum length (and not on
+  every model); a cache breakpoint is only sent when the prefix qualifies
+- Dicts and lists are serialized minified (no indent, no spaces)
+- Each call site has a token budget for its suffix; fields allowed to shrink are
+  cut (oldest list items first, string tails) until the suffix fits
+- Per-call-site counters (calls, prefix/suffix tokens, truncations, cache
+  breakpoints) for a report, with the cache reads the gateway measured
+
+    python goldex_prompts.py trades.json    # pretty vs minified token counts
+"""
+
+import json
+import time
+import argparse
+from string import Formatter
+from typing import Dict, Iterable, List, Optional
+
+import goldex_gateway
+from goldex_context import count_tokens
+
+PREFIX_CACHE_SIZE = 8   # distinct prefixes kept per template (e.g. one per rules version)
+SHRINK_ROUNDS = 8
+TRUNCATED = ' …[truncated]'
+
+# Shortest prefix Anthropic caches, by model family (first match wins); shorter
+# prefixes with a breakpoint are silently processed uncached
+CACHE_MIN_TOKENS = (('haiku', 2048), ('claude', 1024))
+UNCACHED_MODELS = ('claude-3-sonnet-20240229', 'claude-2', 'claude-instant')
+
+TEMPLATES: Dict[str, 'PromptTemplate'] = {}
+
+
+def compact(value) -> str:
+    """Strings as-is, everything else as minified JSON"""
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False, default=str)
+
+
+def _fields(template: str) -> List[str]:
+    return [name for _, name, _, _ in Formatter().parse(template) if name]
+
+
+def _dedent(text: str) -> str:
+    """Strip the indentation and blank edges of a triple-quoted literal"""
+    lines = text.strip('\n').splitlines()
+    indent = min((len(line) - len(line.lstrip()) for line in lines if line.strip()), default=0)
+    return '\n'.join(line[indent:].rstrip() for line in lines).strip()
+
+
+class PromptTemplate:
+    """A prompt split into a cacheable prefix and a budgeted dynamic suffix"""
+
+    def __init__(self, name: str, prefix: str, suffix: str, budget: int,
+                 shrink: Iterable[str] = ()):
+        self.name = name
+        self.prefix = _dedent(prefix)
+        self.suffix = _dedent(suffix)
+        self.budget = budget
+        self.shrink = tuple(shrink)
+        self.prefix_fields = _fields(self.prefix)
+        self.suffix_fields = _fields(self.suffix)
+        unknown = set(self.shrink) - set(self.suffix_fields)
+        if unknown:
+            raise ValueError(f"{name}: cannot shrink fields missing from the suffix: {sorted(unknown)}")
+        self._prefixes: Dict[tuple, Dict] = {}
+        self.stats = {'calls': 0, 'prefix_renders': 0, 'prefix_tokens': 0, 'suffix_tokens': 0,
+                      'max_suffix_tokens': 0, 'truncated': 0, 'over_budget': 0, 'seconds': 0.0,
+                      'cache_breakpoints': 0}
+        TEMPLATES[name] = self
+
+    # ---------------------------------------------------------------- prefix
+
+    def render_prefix(self, fields: Optional[Dict] = None) -> Dict:
+        """{'text', 'tokens'} of the prefix; reused while the prefix fields are unchanged"""
+        values = {name: compact((fields or {})[name]) for name in self.prefix_fields}
+        key = tuple(values[name] for name in self.prefix_fields)
+        cached = self._prefixes.get(key)
+        if cached is None:
+            text = self.prefix.format(**values)
+            cached = {'text': text, 'tokens': count_tokens(text)}
+            if len(self._prefixes) >= PREFIX_CACHE_SIZE:
+                self._prefixes.pop(next(iter(self._prefixes)))
+            self._prefixes[key] = cached
+            self.stats['prefix_renders'] += 1
+        return cached
+
+    # ---------------------------------------------------------------- suffix
+
+    def _shrink(self, values: Dict, text: Dict[str, str], ratio: float) -> bool:
+        """Cut the largest shrinkable field by `ratio`; False if nothing is left to cut"""
+        candidates = [name for name in self.shrink if len(text[name]) > len(TRUNCATED)]
+        if not candidates:
+            return False
+        name = max(candidates, key=lambda n: len(text[n]))
+        value = values[name]
+        if isinstance(value, list):
+            if len(value) <= 1:
+                return False
+            keep = max(1, min(len(value) - 1, int(len(value) * ratio)))
+            values[name] = value[-keep:]   # newest items are the relevant ones
+        else:
+            keep = max(0, int(len(text[name]) * ratio) - len(TRUNCATED))
+            values[name] = text[name][:keep] + TRUNCATED
+        text[name] = compact(values[name])
+        return True
+
+    def render(self, prefix: Optional[Dict] = None, **fields) -> Dict:
+        """{'name', 'system', 'user', 'prefix_tokens', 'suffix_tokens', 'truncated'}"""
+        started = time.perf_counter()
+        head = self.render_prefix(prefix)
+        values = {name: fields[name] for name in self.suffix_fields}
+        text = {name: compact(value) for name, value in values.items()}
+        user = self.suffix.format(**text)
+        tokens = count_tokens(user)
+        truncated = False
+        for _ in range(SHRINK_ROUNDS):
+            if tokens <= self.budget or not self._shrink(values, text, 0.9 * self.budget / tokens):
+                break
+            truncated = True
+            user = self.suffix.format(**text)
+            tokens = count_tokens(user)
+
+        stats = self.stats
+        stats['calls'] += 1
+        stats['prefix_tokens'] = head['tokens']
+        stats['suffix_tokens'] += tokens
+        stats['max_suffix_tokens'] = max(stats['max_suffix_tokens'], tokens)
+        stats['truncated'] += truncated
+        stats['over_budget'] += tokens > self.budget
+        stats['seconds'] += time.perf_counter() - started
+        return {'name': self.name, 'system': head['text'], 'user': user,
+                'prefix_tokens': head['tokens'], 'suffix_tokens': tokens, 'truncated': truncated}
+
+
+# ------------------------------------------------------------------ requests
+
+def cache_min_tokens(model: Optional[str] = None) -> Optional[int]:
+    """Shortest cacheable prefix for `model` (any model when None); None if it never caches"""
+    if model is None:
+        return max(tokens for _, tokens in CACHE_MIN_TOKENS)
+    if model.startswith(UNCACHED_MODELS):
+        return None
+    return next((tokens for family, tokens in CACHE_MIN_TOKENS if family in model), None)
+
+
+def anthropic_kwargs(prompt: Dict, model: Optional[str] = None) -> Dict:
+    """`messages.create` arguments; the prefix is a prompt-cache breakpoint only if `model`
+    (every model, when None) would cache a prefix that long"""
+    system = {'type': 'text', 'text': prompt['system']}
+    minimum = cache_min_tokens(model)
+    if minimum is not None and prompt['prefix_tokens'] >= minimum:
+        system['cache_control'] = {'type': 'ephemeral'}
+        TEMPLATES[prompt['name']].stats['cache_breakpoints'] += 1
+    return {'system': [system], 'messages': [{'role': 'user', 'content': prompt['user']}]}
+
+
+def openai_messages(prompt: Dict) -> List[Dict]:
+    """Chat messages with the prefix first (OpenAI caches identical leading tokens itself)"""
+    return [{'role': 'system', 'content': prompt['system']},
+            {'role': 'user', 'content': prompt['user']}]
+
+
+# -------------------------------------------------------------------- report
+
+def _cache_reads(name: str) -> int:
+    """Cached input tokens the gateway measured for this prompt's call site(s)"""
+    sites = list(goldex_gateway.GATEWAY.sites.items())
+    return sum(metrics.counts['cache_read_tokens'] for site, metrics in sites
+               if site == name or site.startswith(f"{name}:"))
+
+
+def report() -> List[Dict]:
+    rows = []
+    for template in TEMPLATES.values():
+        stats = template.stats
+        calls = stats['calls']
+        rows.append({
+            'name': template.name,
+            'budget': template.budget,
+            'calls': calls,
+            'prefix_tokens': stats['prefix_tokens'],
+            'prefix_renders': stats['prefix_renders'],
+            'avg_suffix_tokens': round(stats['suffix_tokens'] / calls, 1) if calls else 0.0,
+            'max_suffix_tokens': stats['max_suffix_tokens'],
+            'truncated': stats['truncated'],
+            'over_budget': stats['over_budget'],
+            'cache_breakpoints': stats['cache_breakpoints'],
+            'cache_read_tokens': _cache_reads(template.name),
+            'avg_render_ms': round(stats['seconds'] * 1000 / calls, 3) if calls else 0.0,
+        })
+    return rows
+
+
+def print_report():
+    rows = [row for row in report() if row['calls']]
+    if not rows:
+        print(" No prompts rendered")
+        return
+    print(f" {'call site':<24} {'calls':>6} {'prefix':>7} {'suffix avg/max':>15} {'budget':>7} {'cut':>4} "
+          f"{'ms':>7} {'cached calls':>12} {'cache read':>10}")
+    for row in rows:
+        print(f" {row['name']:<24} {row['calls']:>6} {row['prefix_tokens']:>7} "
+              f"{row['avg_suffix_tokens']:>8}/{row['max_suffix_tokens']:<6} {row['budget']:>7} "
+              f"{row['truncated']:>4} {row['avg_render_ms']:>7} {row['cache_breakpoints']:>12} "
+              f"{row['cache_read_tokens']:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GOLDEX prompt size check: pretty vs minified JSON")
+    parser.add_argument('files', nargs='+', help="JSON files holding prompt data")
+    args = parser.parse_args()
+
+    for path in args.files:
+        with open(path, 'r') as f:
+            data = json.load(f)
+        pretty = count_tokens(json.dumps(data, indent=2, default=str))
+        minified = count_tokens(compact(data))
+        saved = 100 * (1 - minified / pretty) if pretty else 0.0
+        print(f" {path}: {pretty} tokens pretty, {minified} minified ({saved:.0f}% smaller)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+GOLDEX PATTERN STORE
+Append-only record store shared by the debuggers, fixers and the autopilot
+(learning patterns, error logs, fix logs, AI interactions):
+- Embedded SQLite in WAL mode; an append is one buffered INSERT, never a
+  rewrite of the whole history
+- Appends are committed in batches (one fsync per batch, on size or age and
+  at exit), so a crash loses at most the open batch and never corrupts the file
+- Indexed by (kind, key) and (kind, error_type): "have we seen this error
+  before?" is one B-tree lookup
+- Compaction (retention + VACUUM + WAL checkpoint) runs on a background thread;
+  VACUUM uses its own connection so writers only wait for the deletes
+- Legacy JSON array logs are imported once and renamed to *.migrated
+
+    python goldex_store.py goldex_store.db          # counts per kind
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import hashlib
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+DEFAULT_DB = 'goldex_store.db'
+FLUSH_EVERY = 50         # records per commit
+FLUSH_INTERVAL = 2.0     # seconds a record may wait in the buffer
+VACUUM_TIMEOUT = 30.0    # seconds the compaction connection waits on a busy database
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    key TEXT,
+    error_type TEXT,
+    ts REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS records_kind_key ON records (kind, key);
+CREATE INDEX IF NOT EXISTS records_kind_type ON records (kind, error_type);
+"""
+
+_stores: Dict[str, 'GoldexStore'] = {}
+_stores_lock = threading.Lock()
+
+
+def error_key(message: str) -> str:
+    """Hash of an error's template + identifiers (same error in any file/line -> same key)"""
+    from goldex_error_clusters import normalize
+    template, args = normalize(message or '')
+    return hashlib.sha256(f"{template}\0{chr(0).join(args)}".encode()).hexdigest()[:16]
+
+
+class GoldexStore:
+    """Batched append-only records in SQLite with indexed lookups"""
+
+    def __init__(self, path: str = DEFAULT_DB, flush_every: int = FLUSH_EVERY,
+                 flush_interval: float = FLUSH_INTERVAL):
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.lock = threading.RLock()
+        self.pending: List[tuple] = []
+        self.last_flush = time.monotonic()
+        self.timer = None
+        self.compactor = None
+        self.compacting = False   # VACUUM holds the write lock: appends only buffer
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=FULL')  # the fsync happens once per batch commit
+        self.db.executescript(SCHEMA)
+        atexit.register(self.close)
+
+    # ---------------------------------------------------------------- writes
+
+    def append(self, kind: str, data: Dict, key: Optional[str] = None,
+               error_type: Optional[str] = None):
+        """Buffer one record; commits when the batch is full or old enough"""
+        row = (kind, key, error_type, time.time(), json.dumps(data, default=str))
+        with self.lock:
+            self.pending.append(row)
+            if (len(self.pending) >= self.flush_every
+                    or time.monotonic() - self.last_flush >= self.flush_interval):
+                self.flush()
+            elif self.timer is None:
+                # A quiet period still gets its records committed within the interval
+                self.timer = threading.Timer(self.flush_interval, self._timed_flush)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def _timed_flush(self):
+        with self.lock:
+            self.timer = None
+            if self.db is not None:
+                self.flush()
+
+    def flush(self):
+        """Commit buffered records in one transaction (deferred while compacting)"""
+        with self.lock:
+            if self.compacting:
+                return   # compact() commits the buffer once VACUUM releases the file
+            if not self.pending:
+                self.last_flush = time.monotonic()
+                return
+            rows, self.pending = self.pending, []
+            self.db.execute('BEGIN')
+            try:
+                self.db.executemany('INSERT INTO records (kind, key, error_type, ts, data) '
+                                    'VALUES (?, ?, ?, ?, ?)', rows)
+                self.db.execute('COMMIT')
+            except Exception:
+                self.db.execute('ROLLBACK')
+                self.pending = rows + self.pending
+                raise
+            self.last_flush = time.monotonic()
+
+    # ----------------------------------------------------------------- reads
+
+    def _pending_matches(self, kind, key=None, error_type=None):
+        return [json.loads(row[4]) for row in self.pending
+                if row[0] == kind and (key is None or row[1] == key)
+                and (error_type is None or row[2] == error_type)]
+
+    def seen(self, kind: str, key: str) -> bool:
+        """Has a record of this kind with this key been stored?"""
+        with self.lock:
+            if any(row[0] == kind and row[1] == key for row in self.pending):
+                return True
+            return self.db.execute('SELECT 1 FROM records WHERE kind = ? AND key = ? LIMIT 1',
+                                   (kind, key)).fetchone() is not None
+
+    def latest(self, kind: str, key: str) -> Optional[Dict]:
+        """Most recent record of this kind with this key"""
+        with self.lock:
+            pending = self._pending_matches(kind, key=key)
+            if pending:
+                return pending[-1]
+            row = self.db.execute('SELECT data FROM records WHERE kind = ? AND key = ? '
+                                  'ORDER BY id DESC LIMIT 1', (kind, key)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def find(self, kind: str, error_type: Optional[str] = None,
+             limit: Optional[int] = None) -> List[Dict]:
+        """Records of a kind (optionally one error type), newest first"""
+        with self.lock:
+            self.flush()
+            sql = 'SELECT data FROM records WHERE kind = ?'
+            params = [kind]
+            if error_type is not None:
+                sql += ' AND error_type = ?'
+                params.append(error_type)
+            sql += ' ORDER BY id DESC'
+            if limit:
+                sql += ' LIMIT ?'
+                params.append(limit)
+            rows = self.db.execute(sql, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def count(self, kind: Optional[str] = None) -> int:
+        with self.lock:
+            self.flush()
+            if kind is None:
+                return self.db.execute('SELECT COUNT(*) FROM records').fetchone()[0]
+            return self.db.execute('SELECT COUNT(*) FROM records WHERE kind = ?', (kind,)).fetchone()[0]
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            self.flush()
+            return dict(self.db.execute('SELECT kind, COUNT(*) FROM records GROUP BY kind').fetchall())
+
+    # ----------------------------------------------------------- maintenance
+
+    def compact(self, retention_days: Optional[float] = None, kinds: Optional[List[str]] = None):
+        """Drop records past retention, then reclaim space and checkpoint the WAL
+
+        Only the deletes hold the store lock. VACUUM runs on its own connection
+        and holds SQLite's write lock, so meanwhile appends are only buffered
+        (committed when it finishes) and lookups read the last committed state
+        plus the buffer (find/count/stats see committed rows only).
+        """
+        with self.lock:
+            self.flush()
+            if retention_days is not None:
+                cutoff = time.time() - retention_days * 86400
+                if kinds:
+                    marks = ','.join('?' * len(kinds))
+                    self.db.execute(f'DELETE FROM records WHERE ts < ? AND kind IN ({marks})',
+                                    [cutoff, *kinds])
+                else:
+                    self.db.execute('DELETE FROM records WHERE ts < ?', (cutoff,))
+            self.compacting = True
+        try:
+            db = sqlite3.connect(self.path, timeout=VACUUM_TIMEOUT, isolation_level=None)
+            try:
+                db.execute('VACUUM')
+                db.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            finally:
+                db.close()
+        finally:
+            with self.lock:
+                self.compacting = False
+                self.flush()
+
+    def compact_in_background(self, **kwargs) -> threading.Thread:
+        """Run compact() on a daemon thread so the caller (e.g. a scheduler tick) is not blocked"""
+        if self.compactor and self.compactor.is_alive():
+            return self.compactor
+
+        def run():
+            try:
+                self.compact(**kwargs)
+            except Exception as e:
+                print(f"⚠️ Store compaction failed: {e}")
+
+        self.compactor = threading.Thread(target=run, name='goldex-store-compact', daemon=True)
+        self.compactor.start()
+        return self.compactor
+
+    def import_json(self, kind: str, path: str, key_field: Optional[str] = None,
+                    type_field: Optional[str] = None) -> int:
+        """One-time import of a legacy JSON array log; the file is renamed to *.migrated"""
+        if not os.path.exists(path):
+            return 0
+        try:
+            with open(path, 'r') as f:
+                items = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ Could not import {path}: {e}")
+            return 0
+        if not isinstance(items, list):
+            return 0
+        for item in items:
+            message = item.get(key_field) if isinstance(item, dict) and key_field else None
+            error_type = item.get(type_field) if isinstance(item, dict) and type_field else None
+            self.append(kind, item, key=error_key(message) if message else None, error_type=error_type)
+        self.flush()
+        os.replace(path, f"{path}.migrated")
+        return len(items)
+
+    def close(self):
+        compactor = self.compactor
+        if compactor is not None and compactor is not threading.current_thread():
+            compactor.join()   # its final flush commits what was buffered meanwhile
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            if self.db is None:
+                return
+            try:
+                self.flush()
+            finally:
+                self.db.close()
+                self.db = None
+        atexit.unregister(self.close)
+
+
+def open_store(path: str = DEFAULT_DB) -> GoldexStore:
+    """Shared store per database file (one connection per process)"""
+    path = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None or store.db is None:
+            store = _stores[path] = GoldexStore(path)
+        return store
+
+
+def main():
+    store = open_store(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DB)
+    for kind, count in sorted(store.stats().items()):
+        print(f" {count:8}  {kind}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,32 +8,124 @@ import os
 import sys
 import time
 import json
+import argparse
 from datetime import datetime
 
-# GPT-4 Integration
-try:
-    from openai import OpenAI
-    OPENAI_AVAILABLE = True
-except ImportError:
+import goldex_clients
+import goldex_gateway
+import goldex_imports
+import goldex_prompts
+from goldex_context import ConversationContext, CONTEXT_BUDGET
+import goldex_flip_engine
+
+# GPT-4 Integration (the SDK itself is only imported on the first question)
+OPENAI_AVAILABLE = goldex_imports.is_available('openai')
+if not OPENAI_AVAILABLE:
     print(" OpenAI library not found. Install with: pip install openai")
-    OPENAI_AVAILABLE = False
+
+MODEL = "gpt-4o-mini"  # Using the latest fast model
+MAX_TOKENS = 1000
+TEMPERATURE = 0.7
+ASK_DEADLINE = float(os.getenv('GOLDEX_ASK_DEADLINE', '60'))
+PROMPT_BUDGET = int(os.getenv('GOLDEX_CLI_PROMPT_BUDGET', '1500'))  # tokens per question
+
+# Persona and every command's instructions form one stable system prompt; each
+# command only sends a short tagged message with the user's input
+ASK_PROMPT = goldex_prompts.PromptTemplate(
+    'ask_universe_ai',
+    prefix="""
+    You're Claude - universe-level TRADING GOD & XCODE MASTER.
+
+     EXPERTISE: Trading psychology expert (Mark Douglas), Xcode wizard (every shortcut), Swift/SwiftUI guru, ICT concepts master, debugging god.
+
+     STYLE: Talk like a super smart friend. Be helpful, enthusiastic, and conversational. Use "bro" and casual language.
+
+     FOCUS: Give actionable, practical advice. No fluff. Real solutions that work.
+
+     PERSONALITY: Confident, knowledgeable, but approachable. You've seen it all and can fix anything.
+    """,
+    suffix="{question}",
+    budget=PROMPT_BUDGET,
+    shrink=('question',),
+)
+
+STRATEGY_PROMPT = goldex_prompts.PromptTemplate(
+    'trading_strategy_analysis',
+    prefix="""
+    [STRATEGY] messages: analyze the trading strategy from Mark Douglas psychology perspective and ICT concepts.
+    Provide: 1. Psychological strengths/weaknesses 2. Risk management assessment 3. Market structure compatibility
+    4. Improvement suggestions 5. Confidence rating (1-10). Be specific and actionable, bro!
+    """,
+    suffix="[STRATEGY] {strategy}",
+    budget=PROMPT_BUDGET,
+    shrink=('strategy',),
+)
+
+DEBUG_PROMPT = goldex_prompts.PromptTemplate(
+    'xcode_debug_assistant',
+    prefix="""
+    [DEBUG] messages: fix the Xcode/Swift error like a universe-level expert.
+    Provide: 1. What's causing the error 2. Exact fix (code if needed) 3. Why this happens 4. How to prevent it.
+    Make it super clear and actionable, bro!
+    """,
+    suffix="[DEBUG] {error}",
+    budget=PROMPT_BUDGET,
+    shrink=('error',),
+)
+
+FLIP_PROMPT = goldex_prompts.PromptTemplate(
+    'flip_mode_calculator',
+    prefix="""
+    [FLIP] messages: the numbers for a flip challenge are already calculated - don't recalculate anything.
+    Using these numbers, provide: 1. Risk assessment (1-10) and what the drawdown odds mean emotionally
+    2. Psychological tips for this challenge (Mark Douglas) 3. Rules to stay disciplined through the expected
+    losing streaks. Be realistic and motivating, bro!
+    """,
+    suffix="[FLIP]\n{report}",
+    budget=PROMPT_BUDGET,
+)
+
+COACH_PROMPT = goldex_prompts.PromptTemplate(
+    'psychology_coach',
+    prefix="""
+    [COACH] messages: coach this trader using Mark Douglas principles and universe-level psychology.
+    Provide: 1. Root cause analysis 2. Mark Douglas wisdom that applies 3. Practical mental exercises
+    4. Mindset shift needed 5. Daily affirmations. Be supportive but direct, like a wise trading mentor, bro!
+    """,
+    suffix="[COACH] {issue}",
+    budget=PROMPT_BUDGET,
+    shrink=('issue',),
+)
+
+INSIGHT_PROMPT = goldex_prompts.PromptTemplate(
+    'quick_market_insight',
+    prefix="""
+    [INSIGHT] messages: universe-level market insight for the symbol and timeframe.
+    Include: 1. Current market structure bias 2. Key levels to watch 3. Trading opportunities 4. Risk factors
+    5. ICT concepts that apply. Be specific and actionable for today's session, bro!
+    """,
+    suffix="[INSIGHT] {symbol} {timeframe}",
+    budget=PROMPT_BUDGET,
+)
+
+COMMAND_PROMPTS = (STRATEGY_PROMPT, DEBUG_PROMPT, FLIP_PROMPT, COACH_PROMPT, INSIGHT_PROMPT)
 
 class GoldexUniverseCLI:
-    def __init__(self):
+    def __init__(self, session="default", budget=CONTEXT_BUDGET):
         self.api_key = None
         self.client = None
+        self.async_client = None
         self.setup_api()
         
-        # Universe-level system prompt
-        self.system_prompt = """You're Claude - universe-level TRADING GOD & XCODE MASTER.
-
- EXPERTISE: Trading psychology expert (Mark Douglas), Xcode wizard (every shortcut), Swift/SwiftUI guru, ICT concepts master, debugging god.
-
- STYLE: Talk like a super smart friend. Be helpful, enthusiastic, and conversational. Use "bro" and casual language.
-
- FOCUS: Give actionable, practical advice. No fluff. Real solutions that work.
-
- PERSONALITY: Confident, knowledgeable, but approachable. You've seen it all and can fix anything."""
+        # Universe-level system prompt, identical every turn: OpenAI caches it (with the
+        # history behind it) once a request passes 1024 tokens; see --prompt-report
+        self.system_prompt = "\n\n".join(template.render_prefix()['text']
+                                          for template in (ASK_PROMPT,) + COMMAND_PROMPTS)
+        
+        # Conversation memory within a token budget, resumed from disk
+        self.context = ConversationContext(self.system_prompt, name=session, budget=budget)
+        if self.context.load():
+            print(f" Resumed session '{session}' ({self.context.stats()['turns']} recent turns)")
 
     def setup_api(self):
         """Set up OpenAI API connection with environment variable"""
@@ -50,15 +142,28 @@ class GoldexUniverseCLI:
             return False
             
         try:
-            self.client = OpenAI(api_key=self.api_key)
-            # Test connection
-            self.client.models.list()
-            print(" Connected to GPT-4 successfully!")
+            # Shared pooled client; connects on first question, warmed in background
+            self.client = goldex_clients.openai_client(self.api_key)
+            self.async_client = goldex_clients.async_openai_client(self.api_key)
+            goldex_clients.warm_up(self.client)
+            print(" GPT-4 ready!")
             return True
         except Exception as e:
-            print(f" Failed to connect to GPT-4: {e}")
+            print(f" Failed to set up GPT-4: {e}")
             return False
 
+    def build_messages(self, question):
+        """Build the chat messages sent for a question (with session context)"""
+        return self.context.messages(ASK_PROMPT.render(question=question)['user'])
+
+    def remember(self, question, answer):
+        """Add an exchange to the session and persist it"""
+        self.context.add_turn(question, answer)
+        try:
+            self.context.save()
+        except OSError as e:
+            print(f" Could not save session: {e}")
+
     def ask_universe_ai(self, question):
         """Send question to GPT-4 and get universe-level response"""
         if not self.client:
@@ -67,21 +172,36 @@ class GoldexUniverseCLI:
         try:
             print(" Universe AI is thinking...")
             
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",  # Using the latest fast model
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": question}
-                ],
-                max_tokens=1000,
-                temperature=0.7
+            result = goldex_gateway.call(
+                'openai', 'ask_universe_ai', client=self.client, deadline=ASK_DEADLINE,
+                model=MODEL,
+                messages=self.build_messages(question),
+                max_tokens=MAX_TOKENS,
+                temperature=TEMPERATURE
             )
             
-            return response.choices[0].message.content
+            answer = result['text']
+            self.remember(question, answer)
+            return answer
             
         except Exception as e:
             return f" Error asking Universe AI: {str(e)}"
 
+    async def stream_universe_ai(self, question, on_token):
+        """Stream a GPT-4 answer, calling on_token for each chunk; returns the full text"""
+        result = await goldex_gateway.stream(
+            'openai', 'stream_universe_ai', on_token,
+            client=self.async_client,
+            deadline=ASK_DEADLINE,
+            model=MODEL,
+            messages=self.build_messages(question),
+            max_tokens=MAX_TOKENS,
+            temperature=TEMPERATURE
+        )
+        answer = result['text']
+        self.remember(question, answer)
+        return answer
+
     def print_header(self):
         """Print the GOLDEX Universe CLI header"""
         print("\n" + "="*60)
@@ -111,24 +231,13 @@ class GoldexUniverseCLI:
             print(" Please enter a strategy to analyze.")
             return
             
-        analysis_prompt = f"""
-        Analyze this trading strategy from Mark Douglas psychology perspective and ICT concepts:
-        
-        Strategy: {strategy}
-        
-        Provide:
-        1. Psychological strengths/weaknesses
-        2. Risk management assessment  
-        3. Market structure compatibility
-        4. Improvement suggestions
-        5. Confidence rating (1-10)
-        
-        Be specific and actionable, bro!
-        """
-        
-        response = self.ask_universe_ai(analysis_prompt)
+        response = self.ask_universe_ai(self.strategy_prompt(strategy))
         print(f"\n Universe AI Analysis:\n{response}")
 
+    def strategy_prompt(self, strategy):
+        """Prompt for a trading strategy analysis"""
+        return STRATEGY_PROMPT.render(strategy=strategy)['user']
+
     def xcode_debug_assistant(self):
         """Help debug Xcode issues with GPT-4"""
         print("\n XCODE DEBUG ASSISTANT")
@@ -139,54 +248,43 @@ class GoldexUniverseCLI:
             print(" Please enter an error to debug.")
             return
             
-        debug_prompt = f"""
-        Fix this Xcode/Swift error like a universe-level expert:
-        
-        Error: {error}
-        
-        Provide:
-        1. What's causing the error
-        2. Exact fix (code if needed)
-        3. Why this happens
-        4. How to prevent it
-        
-        Make it super clear and actionable, bro!
-        """
-        
-        response = self.ask_universe_ai(debug_prompt)
+        response = self.ask_universe_ai(self.debug_prompt(error))
         print(f"\n Universe Debug Solution:\n{response}")
 
+    def debug_prompt(self, error):
+        """Prompt for an Xcode/Swift error fix"""
+        return DEBUG_PROMPT.render(error=error)['user']
+
     def flip_mode_calculator(self):
-        """Calculate flip mode scenarios with GPT-4"""
+        """Calculate flip mode scenarios locally; GPT-4 only adds the psychology"""
         print("\n FLIP MODE CALCULATOR")
         
         try:
             start_balance = float(input(" Starting balance: $"))
             target_balance = float(input(" Target balance: $"))
             risk_per_trade = float(input(" Risk per trade (%): "))
-        except ValueError:
-            print(" Please enter valid numbers.")
+            win_rate = float(input(f" Win rate (%) [{goldex_flip_engine.DEFAULT_WIN_RATE:g}]: ")
+                             or goldex_flip_engine.DEFAULT_WIN_RATE)
+            reward_risk = float(input(f" Reward:risk [{goldex_flip_engine.DEFAULT_RR:g}]: ")
+                                or goldex_flip_engine.DEFAULT_RR)
+            report = self.flip_report(start_balance, target_balance, risk_per_trade, win_rate, reward_risk)
+        except ValueError as e:
+            print(f" Please enter valid numbers. {e}")
             return
-            
-        calc_prompt = f"""
-        Calculate this flip challenge like a trading god:
-        
-        Start: ${start_balance:,.2f}
-        Target: ${target_balance:,.2f}
-        Risk per trade: {risk_per_trade}%
         
-        Provide:
-        1. Required growth percentage
-        2. Estimated number of trades needed
-        3. Win rate required for success
-        4. Risk assessment (1-10)
-        5. Psychological tips for this challenge
-        
-        Be realistic and motivating, bro!
-        """
-        
-        response = self.ask_universe_ai(calc_prompt)
-        print(f"\n Flip Mode Analysis:\n{response}")
+        print(f"\n Flip Mode Math:\n{report}")
+        response = self.ask_universe_ai(self.flip_prompt(report))
+        print(f"\n Flip Mode Psychology:\n{response}")
+
+    def flip_report(self, start_balance, target_balance, risk_per_trade, win_rate, reward_risk):
+        """Closed-form + Monte Carlo flip math (local, milliseconds)"""
+        plan, mc = goldex_flip_engine.analyze(start_balance, target_balance, risk_per_trade,
+                                              win_rate, reward_risk)
+        return goldex_flip_engine.format_report(plan, mc)
+
+    def flip_prompt(self, report):
+        """Prompt for the psychology side of an already-calculated flip challenge"""
+        return FLIP_PROMPT.render(report=report)['user']
 
     def psychology_coach(self):
         """Trading psychology coaching with GPT-4"""
@@ -198,24 +296,13 @@ class GoldexUniverseCLI:
             print(" Please describe your challenge.")
             return
             
-        coach_prompt = f"""
-        Coach this trader using Mark Douglas principles and universe-level psychology:
-        
-        Challenge: {issue}
-        
-        Provide:
-        1. Root cause analysis
-        2. Mark Douglas wisdom that applies
-        3. Practical mental exercises
-        4. Mindset shift needed
-        5. Daily affirmations
-        
-        Be supportive but direct, like a wise trading mentor, bro!
-        """
-        
-        response = self.ask_universe_ai(coach_prompt)
+        response = self.ask_universe_ai(self.coach_prompt(issue))
         print(f"\n Psychology Coach:\n{response}")
 
+    def coach_prompt(self, issue):
+        """Prompt for trading psychology coaching"""
+        return COACH_PROMPT.render(issue=issue)['user']
+
     def quick_market_insight(self):
         """Get quick market insights with GPT-4"""
         print("\n QUICK MARKET INSIGHT")
@@ -228,22 +315,13 @@ class GoldexUniverseCLI:
         if not timeframe.strip():
             timeframe = "1H"
             
-        insight_prompt = f"""
-        Provide universe-level market insight for {symbol} on {timeframe}:
-        
-        Include:
-        1. Current market structure bias
-        2. Key levels to watch
-        3. Trading opportunities
-        4. Risk factors
-        5. ICT concepts that apply
-        
-        Be specific and actionable for today's session, bro!
-        """
-        
-        response = self.ask_universe_ai(insight_prompt)
+        response = self.ask_universe_ai(self.insight_prompt(symbol, timeframe))
         print(f"\n Market Insight for {symbol} ({timeframe}):\n{response}")
 
+    def insight_prompt(self, symbol, timeframe):
+        """Prompt for a quick market insight"""
+        return INSIGHT_PROMPT.render(symbol=symbol, timeframe=timeframe)['user']
+
     def run(self):
         """Main CLI loop"""
         self.print_header()
@@ -299,6 +377,36 @@ class GoldexUniverseCLI:
             except Exception as e:
                 print(f"\n Error: {e}")
 
+def main():
+    parser = argparse.ArgumentParser(description="GOLDEX Universe CLI - GPT-4 powered trading assistant")
+    parser.add_argument('--menu', action='store_true',
+                        help="use the classic blocking menu instead of the streaming REPL")
+    parser.add_argument('--session', default="default",
+                        help="conversation session to resume and save (default: default)")
+    parser.add_argument('--budget', type=int, default=CONTEXT_BUDGET,
+                        help=f"token budget for conversation context (default: {CONTEXT_BUDGET})")
+    parser.add_argument('--profile-imports', action='store_true',
+                        help="print which SDKs were loaded and how long they took on exit")
+    parser.add_argument('--prompt-report', action='store_true',
+                        help="print prompt token counts and model call latencies on exit")
+    args = parser.parse_args()
+
+    cli = GoldexUniverseCLI(session=args.session, budget=args.budget)
+    try:
+        if args.menu:
+            cli.run()
+        else:
+            import asyncio
+            from goldex_universe_repl import UniverseREPL
+            asyncio.run(UniverseREPL(cli).run())
+    except KeyboardInterrupt:
+        print("\n\n Exiting GOLDEX Universe CLI...")
+    finally:
+        if args.profile_imports:
+            goldex_imports.print_import_report()
+        if args.prompt_report:
+            goldex_prompts.print_report()
+            goldex_gateway.print_report()
+
 if __name__ == "__main__":
-    cli = GoldexUniverseCLI()
-    cli.run()
\ No newline at end of file
+    main()
\ No newline at end of file
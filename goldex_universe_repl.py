@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+GOLDEX UNIVERSE REPL
+Non-blocking asyncio front-end for GoldexUniverseCLI
+- Answers stream to the terminal token by token as they arrive
+- End any question or command with '&' to run it as a background job
+- Press Enter while an answer streams to send it to the background
+- 'jobs', 'result <id>', 'wait <id>', 'cancel <id>' manage background answers
+"""
+
+import sys
+import time
+import asyncio
+import threading
+
+import goldex_clients
+from goldex_flip_engine import DEFAULT_WIN_RATE, DEFAULT_RR
+
+HELP = """
+ UNIVERSE COMMANDS:
+  <question>          Ask Universe AI (streams the answer)
+  <question> &        Ask in the background as a numbered job
+  1 / ask             Ask Universe AI (GPT-4)
+  2 / strategy        Trading Strategy Analysis
+  3 / debug           Xcode Debug Assistant
+  4 / flip            Flip Mode Calculator
+  5 / coach           Trading Psychology Coach
+  6 / insight         Quick Market Insight
+  jobs                List background jobs
+  result <id>         Show a job's answer (so far)
+  wait <id>           Wait for a job and show its answer
+  cancel <id>         Cancel a running job
+  context             Show session size vs. token budget
+  pin <note>          Keep a note in every request (cached prefix)
+  clear               Forget the conversation (pinned notes stay)
+  help                Show this help
+  0 / exit            Exit
+ Append '&' to any command (e.g. 'strategy &') to run it in the background.
+ Press Enter while an answer is streaming to move it to the background."""
+
+
+class UniverseJob:
+    """One question sent to Universe AI and its (possibly partial) answer"""
+
+    def __init__(self, job_id, title, question, foreground):
+        self.id = job_id
+        self.title = title
+        self.question = question
+        self.foreground = foreground
+        self.chunks = []
+        self.status = "running"
+        self.error = None
+        self.task = None
+        self.started_at = time.perf_counter()
+        self.first_token_at = None
+        self.finished_at = None
+
+    @property
+    def text(self):
+        return "".join(self.chunks)
+
+    @property
+    def ttft(self):
+        """Seconds until the first token arrived (None if still waiting)"""
+        if self.first_token_at is None:
+            return None
+        return self.first_token_at - self.started_at
+
+    @property
+    def elapsed(self):
+        end = self.finished_at or time.perf_counter()
+        return end - self.started_at
+
+    def summary(self):
+        ttft = f"{self.ttft:.2f}s" if self.ttft is not None else "-"
+        return (f"[{self.id}] {self.status:<9} {self.elapsed:6.1f}s  "
+                f"ttft {ttft:>6}  {self.title[:40]}")
+
+
+class UniverseREPL:
+    """Asyncio REPL: one task per question, stdin read on a daemon thread"""
+
+    PROMPT = "\n universe> "
+
+    def __init__(self, cli):
+        self.cli = cli
+        self.jobs = {}
+        self.next_job_id = 1
+        self.lines = None
+        self.pending_line = None
+
+        self.commands = {
+            "1": self.cmd_ask, "ask": self.cmd_ask,
+            "2": self.cmd_strategy, "strategy": self.cmd_strategy,
+            "3": self.cmd_debug, "debug": self.cmd_debug,
+            "4": self.cmd_flip, "flip": self.cmd_flip,
+            "5": self.cmd_coach, "coach": self.cmd_coach,
+            "6": self.cmd_insight, "insight": self.cmd_insight,
+        }
+
+    # ------------------------------------------------------------------ input
+
+    def _read_stdin(self, loop):
+        """Daemon thread: forward stdin lines to the event loop (None on EOF)"""
+        while True:
+            line = sys.stdin.readline()
+            if not line:
+                loop.call_soon_threadsafe(self.lines.put_nowait, None)
+                return
+            loop.call_soon_threadsafe(self.lines.put_nowait, line.rstrip("\n"))
+
+    def _next_line_task(self):
+        if self.pending_line is None:
+            self.pending_line = asyncio.ensure_future(self.lines.get())
+        return self.pending_line
+
+    async def read_line(self, prompt):
+        """Print a prompt and wait for the next line without blocking the loop"""
+        sys.stdout.write(prompt)
+        sys.stdout.flush()
+        line = await self._next_line_task()
+        self.pending_line = None
+        if line is None:
+            raise EOFError
+        return line
+
+    # ------------------------------------------------------------------- jobs
+
+    def start_job(self, title, question, foreground):
+        job = UniverseJob(self.next_job_id, title, question, foreground)
+        self.next_job_id += 1
+        self.jobs[job.id] = job
+        job.task = asyncio.ensure_future(self.run_job(job))
+        if not foreground:
+            print(f" [{job.id}] started in background: {title[:50]}")
+        return job
+
+    async def run_job(self, job):
+        def on_token(token):
+            if job.first_token_at is None:
+                job.first_token_at = time.perf_counter()
+            job.chunks.append(token)
+            if job.foreground:
+                sys.stdout.write(token)
+                sys.stdout.flush()
+
+        try:
+            await self.cli.stream_universe_ai(job.question, on_token)
+            job.status = "done"
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = time.perf_counter()
+
+        if job.foreground:
+            if job.error:
+                print(f"\n Error asking Universe AI: {job.error}")
+        else:
+            print(f"\n [{job.id}] {job.status} in {job.elapsed:.1f}s - 'result {job.id}' to view")
+
+    async def follow(self, job):
+        """Stream a foreground job; an input line detaches it to the background"""
+        print(f"\n Universe AI [{job.id}]:")
+        line_task = self._next_line_task()
+        done, _ = await asyncio.wait({job.task, line_task}, return_when=asyncio.FIRST_COMPLETED)
+
+        if job.task in done:
+            print(f"\n\n [{job.id}] {job.elapsed:.1f}s (first token {job.ttft or 0:.2f}s)")
+            return
+
+        # The user typed something: keep the answer running and free the terminal
+        job.foreground = False
+        print(f"\n\n [{job.id}] moved to background - 'result {job.id}' to view")
+        line = line_task.result()
+        self.pending_line = None
+        if line is None:
+            raise EOFError
+        if line.strip():
+            await self.handle(line)
+
+    def get_job(self, arg):
+        try:
+            return self.jobs[int(arg)]
+        except (ValueError, KeyError):
+            print(f" No job '{arg}'. Use 'jobs' to list them.")
+            return None
+
+    def print_result(self, job):
+        print(f"\n {job.summary()}")
+        print(f" Q: {job.title}")
+        if job.error:
+            print(f" Error: {job.error}")
+        print(job.text or " (no answer yet)")
+
+    # --------------------------------------------------------------- commands
+
+    async def ask(self, title, question, background):
+        job = self.start_job(title, question, foreground=not background)
+        if not background:
+            await self.follow(job)
+
+    async def cmd_ask(self, background):
+        question = await self.read_line(" Ask me anything: ")
+        if question.strip():
+            await self.ask(question, question, background)
+        else:
+            print(" Please ask a question.")
+
+    async def cmd_strategy(self, background):
+        strategy = await self.read_line(" Describe your trading strategy: ")
+        if not strategy.strip():
+            print(" Please enter a strategy to analyze.")
+            return
+        await self.ask(f"Strategy: {strategy}", self.cli.strategy_prompt(strategy), background)
+
+    async def cmd_debug(self, background):
+        error = await self.read_line(" Paste your Xcode error here: ")
+        if not error.strip():
+            print(" Please enter an error to debug.")
+            return
+        await self.ask(f"Debug: {error}", self.cli.debug_prompt(error), background)
+
+    async def cmd_flip(self, background):
+        try:
+            start_balance = float(await self.read_line(" Starting balance: $"))
+            target_balance = float(await self.read_line(" Target balance: $"))
+            risk_per_trade = float(await self.read_line(" Risk per trade (%): "))
+            win_rate = float(await self.read_line(f" Win rate (%) [{DEFAULT_WIN_RATE:g}]: ")
+                             or DEFAULT_WIN_RATE)
+            reward_risk = float(await self.read_line(f" Reward:risk [{DEFAULT_RR:g}]: ") or DEFAULT_RR)
+            report = self.cli.flip_report(start_balance, target_balance, risk_per_trade,
+                                          win_rate, reward_risk)
+        except ValueError as e:
+            print(f" Please enter valid numbers. {e}")
+            return
+
+        # The math is local and instant; only the psychology goes to the model
+        print(f"\n Flip Mode Math:\n{report}")
+        await self.ask(f"Flip ${start_balance:,.0f} -> ${target_balance:,.0f}",
+                       self.cli.flip_prompt(report), background)
+
+    async def cmd_coach(self, background):
+        issue = await self.read_line(" What's your trading psychology challenge: ")
+        if not issue.strip():
+            print(" Please describe your challenge.")
+            return
+        await self.ask(f"Coach: {issue}", self.cli.coach_prompt(issue), background)
+
+    async def cmd_insight(self, background):
+        symbol = (await self.read_line(" Enter symbol (e.g., XAUUSD, EURUSD): ")).strip().upper() or "XAUUSD"
+        timeframe = (await self.read_line(" Timeframe (e.g., 1H, 4H, Daily): ")).strip().upper() or "1H"
+        await self.ask(f"Insight {symbol} {timeframe}", self.cli.insight_prompt(symbol, timeframe), background)
+
+    async def handle(self, line):
+        """Dispatch one input line; returns False when the REPL should exit"""
+        line = line.strip()
+        background = line.endswith("&")
+        if background:
+            line = line[:-1].strip()
+        if not line:
+            return True
+
+        command, _, arg = line.partition(" ")
+        command = command.lower()
+
+        if command in ("0", "exit", "quit"):
+            return False
+        elif command == "help":
+            print(HELP)
+        elif command == "jobs":
+            if not self.jobs:
+                print(" No jobs yet.")
+            for job in self.jobs.values():
+                print(f" {job.summary()}")
+        elif command == "context":
+            for key, value in self.cli.context.stats().items():
+                print(f" {key:<17} {value}")
+        elif command == "pin" and arg:
+            self.cli.context.pin(arg.strip())
+            self.cli.context.save()
+            print(" Pinned.")
+        elif command == "clear":
+            self.cli.context.clear()
+            self.cli.context.save()
+            print(" Conversation cleared.")
+        elif command in ("result", "wait", "cancel") and arg:
+            job = self.get_job(arg.strip())
+            if job is None:
+                return True
+            if command == "cancel":
+                job.task.cancel()
+                print(f" [{job.id}] cancelling...")
+                return True
+            if command == "wait" and not job.task.done():
+                await asyncio.shield(job.task)
+            self.print_result(job)
+        elif command in self.commands and not arg:
+            await self.commands[command](background)
+        else:
+            await self.ask(line, line, background)
+        return True
+
+    async def run(self):
+        """Main REPL loop"""
+        self.cli.print_header()
+        if not self.cli.async_client:
+            print(" Cannot start - GPT-4 connection failed")
+            return
+
+        loop = asyncio.get_running_loop()
+        self.lines = asyncio.Queue()
+        threading.Thread(target=self._read_stdin, args=(loop,), daemon=True).start()
+
+        # Open the TLS connection while the user types the first question
+        warm_up = asyncio.ensure_future(goldex_clients.warm_up_async(self.cli.async_client))
+        print(HELP)
+
+        try:
+            while True:
+                try:
+                    line = await self.read_line(self.PROMPT)
+                    if not await self.handle(line):
+                        break
+                except EOFError:
+                    break
+                except Exception as e:
+                    print(f"\n Error: {e}")
+        finally:
+            running = [job.task for job in self.jobs.values() if not job.task.done()]
+            for task in running + [warm_up]:
+                task.cancel()
+            await asyncio.gather(*running, warm_up, return_exceptions=True)
+            await goldex_clients.aclose_async()
+
+        print("\n Thanks for using GOLDEX Universe CLI!")
+        print(" Keep trading like a universe-level god, bro! ")
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+GOLDEX CHANGE WATCHER
+Event-driven watcher over project sources and build logs:
+- Native file events through watchdog when installed (inotify on Linux,
+  FSEvents on macOS); otherwise a cheap stat poll of the watched files
+- Bursts of edits are debounced into one batch (quiet period, capped delay)
+- Build logs are tailed from the last read offset, so only new output is parsed
+- Batches are handed over on a queue: the consumer sleeps until work arrives
+
+    python goldex_watcher.py <project dir> [log dir]     # print batches as they happen
+"""
+
+import os
+import sys
+import time
+import queue
+import fnmatch
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from goldex_buildlog import DEFAULT_LOG_PATTERNS, parse_line
+from goldex_imports import is_available, lazy_import
+
+watchdog_observers = lazy_import('watchdog.observers')
+
+SOURCE_EXTENSIONS = ('.swift', '.h', '.m', '.pbxproj', '.plist')
+IGNORE_DIRS = {'.git', 'DerivedData', 'build', '.build', 'Pods', '__pycache__',
+               'node_modules', 'xcuserdata', '.swiftpm'}
+DEBOUNCE_SECONDS = float(os.getenv('GOLDEX_WATCH_DEBOUNCE', '1.5'))
+MAX_DELAY_SECONDS = float(os.getenv('GOLDEX_WATCH_MAX_DELAY', '10'))
+POLL_INTERVAL = float(os.getenv('GOLDEX_WATCH_POLL_INTERVAL', '2'))
+
+
+class LogTailer:
+    """Reads only what was appended to each log since the last read"""
+
+    def __init__(self):
+        self.offsets: Dict[str, int] = {}
+
+    def skip_to_end(self, path: str):
+        """Start tailing from the current end (existing output was indexed already)"""
+        # Offsets are keyed by absolute path, as the watcher reports them
+        path = os.path.abspath(path)
+        try:
+            self.offsets[path] = os.path.getsize(path)
+        except OSError:
+            pass
+
+    def read_lines(self, path: str) -> List[str]:
+        """Complete new lines since the last read (a partial last line waits)"""
+        path = os.path.abspath(path)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            self.offsets.pop(path, None)
+            return []
+        offset = self.offsets.get(path, 0)
+        if size < offset:
+            offset = 0  # truncated or replaced by a new build
+        if size == offset:
+            return []
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            data = f.read(size - offset)
+        end = data.rfind(b'\n')
+        if end == -1:
+            return []
+        self.offsets[path] = offset + end + 1
+        return data[:end + 1].decode('utf-8', errors='replace').splitlines()
+
+    def read_diagnostics(self, path: str) -> List[Dict]:
+        diagnostics = []
+        for line in self.read_lines(path):
+            diagnostic = parse_line(line)
+            if diagnostic:
+                diagnostic['log'] = path
+                diagnostics.append(diagnostic)
+        return diagnostics
+
+
+class ChangeWatcher:
+    """Debounced change batches: {'sources': set of paths, 'logs': set of paths}"""
+
+    def __init__(self, source_roots: Iterable[str], log_dirs: Iterable[str] = ('.',),
+                 log_patterns=DEFAULT_LOG_PATTERNS, source_extensions=SOURCE_EXTENSIONS,
+                 debounce: float = DEBOUNCE_SECONDS, max_delay: float = MAX_DELAY_SECONDS):
+        self.source_roots = [os.path.abspath(root) for root in source_roots]
+        self.log_dirs = [os.path.abspath(d) for d in log_dirs]
+        self.log_patterns = log_patterns
+        self.source_extensions = source_extensions
+        self.debounce = debounce
+        self.max_delay = max_delay
+
+        self.batches: 'queue.Queue[Dict[str, set]]' = queue.Queue()
+        self.lock = threading.Lock()
+        self.pending = {'sources': set(), 'logs': set()}
+        self.first_event_at = None
+        self.timer = None
+        self.observer = None
+        self.poller = None
+        self.stopped = threading.Event()
+
+    # -------------------------------------------------------------- classify
+
+    def classify(self, path: str) -> Optional[str]:
+        name = os.path.basename(path)
+        if any(part in IGNORE_DIRS for part in path.split(os.sep)):
+            return None
+        if os.path.dirname(path) in self.log_dirs and any(fnmatch.fnmatch(name, p) for p in self.log_patterns):
+            return 'logs'
+        if name.endswith(self.source_extensions) and any(path.startswith(root) for root in self.source_roots):
+            return 'sources'
+        return None
+
+    def on_path(self, path: str):
+        """Record one changed path and (re)arm the debounce timer"""
+        path = os.path.abspath(path)
+        kind = self.classify(path)
+        if kind is None:
+            return
+        with self.lock:
+            self.pending[kind].add(path)
+            now = time.monotonic()
+            if self.first_event_at is None:
+                self.first_event_at = now
+            # Quiet period after the last event, but never longer than max_delay overall
+            delay = min(self.debounce, max(0.0, self.first_event_at + self.max_delay - now))
+            if self.timer is not None:
+                self.timer.cancel()
+            self.timer = threading.Timer(delay, self._emit)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def _emit(self):
+        with self.lock:
+            batch, self.pending = self.pending, {'sources': set(), 'logs': set()}
+            self.first_event_at = None
+            self.timer = None
+        if batch['sources'] or batch['logs']:
+            self.batches.put(batch)
+
+    # ------------------------------------------------------------- observers
+
+    def dispatch(self, event):
+        """watchdog event handler interface"""
+        if event.is_directory:
+            return
+        self.on_path(event.src_path)
+        dest = getattr(event, 'dest_path', None)
+        if dest:
+            self.on_path(dest)
+
+    def _snapshot(self) -> Dict[str, tuple]:
+        snapshot = {}
+        for root in dict.fromkeys(self.source_roots + self.log_dirs):
+            for dirpath, dirnames, filenames in os.walk(root):
+                dirnames[:] = [d for d in dirnames if d not in IGNORE_DIRS]
+                for name in filenames:
+                    path = os.path.join(dirpath, name)
+                    if self.classify(path) is None:
+                        continue
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def _poll(self, interval: float, previous: Dict[str, tuple]):
+        while not self.stopped.wait(interval):
+            current = self._snapshot()
+            for path in current.keys() | previous.keys():
+                if current.get(path) != previous.get(path):
+                    self.on_path(path)
+            previous = current
+
+    def start(self, poll_interval: float = POLL_INTERVAL) -> str:
+        """Start watching; returns the backend in use"""
+        if is_available('watchdog'):
+            self.observer = watchdog_observers.Observer()
+            for root in dict.fromkeys(self.source_roots + self.log_dirs):
+                recursive = root in self.source_roots
+                self.observer.schedule(self, root, recursive=recursive)
+            self.observer.daemon = True
+            self.observer.start()
+            return 'watchdog'
+        # Baseline taken before returning, so edits right after start() are seen
+        self.poller = threading.Thread(target=self._poll, args=(poll_interval, self._snapshot()),
+                                       name='goldex-watch-poll', daemon=True)
+        self.poller.start()
+        return 'polling'
+
+    def next_batch(self, timeout: Optional[float] = None) -> Optional[Dict[str, set]]:
+        """Block until a batch is ready (None on timeout)"""
+        try:
+            return self.batches.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def stop(self):
+        self.stopped.set()
+        if self.observer is not None:
+            self.observer.stop()
+            self.observer.join(timeout=5)
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+
+
+def main():
+    project = sys.argv[1] if len(sys.argv) > 1 else '.'
+    log_dir = sys.argv[2] if len(sys.argv) > 2 else '.'
+    watcher = ChangeWatcher([project], [log_dir])
+    tailer = LogTailer()
+    print(f"👀 Watching {project} (logs in {log_dir}) via {watcher.start()} - Ctrl+C to stop")
+    try:
+        while True:
+            batch = watcher.next_batch()
+            print(f"🔁 {len(batch['sources'])} sources changed, {len(batch['logs'])} logs updated")
+            for path in sorted(batch['logs']):
+                for d in tailer.read_diagnostics(path):
+                    print(f"   {d['severity']}: {d['message'][:100]}")
+    except KeyboardInterrupt:
+        watcher.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,60 +1,76 @@
 #!/usr/bin/env python3
 import os
+import sys
 import time
 import json
 import logging
-import schedule
-import firebase_admin
-from firebase_admin import credentials, firestore
-from anthropic import Anthropic
 from datetime import datetime
 
+# Shared GOLDEX modules live at the repository root (copied alongside on deploy)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import goldex_clients
+import goldex_gateway
+import goldex_prompts
+from goldex_imports import lazy_import
+
+# Heavy SDKs load on first use, keeping worker restarts fast
+schedule = lazy_import('schedule')
+firestore = lazy_import('firebase_admin.firestore')
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# A signal older than this is stale anyway; a slow answer is hedged
+ANALYSIS_DEADLINE = float(os.getenv('GOLDEX_ANALYSIS_DEADLINE', '20'))
+ANALYSIS_HEDGE_AFTER = float(os.getenv('GOLDEX_ANALYSIS_HEDGE_AFTER', '8'))
+ANALYSIS_MODEL = os.getenv('GOLDEX_ANALYSIS_MODEL', 'claude-3-sonnet-20240229')
+
+# Instructions are the stable prefix; each 5-minute call only sends the time
+ANALYSIS_PROMPT = goldex_prompts.PromptTemplate(
+    'analyze_market',
+    prefix="""
+    Analyze XAUUSD for trading opportunity.
+
+    Look for:
+    1. NY session liquidity sweeps
+    2. Order blocks
+    3. Fibonacci levels
+
+    Respond with JSON:
+    {{"signal": "BUY/SELL/NONE", "confidence": 0-100, "entry": 2374.50, "stop": 2354.50,
+    "target": 2404.50, "reason": "explanation"}}
+    """,
+    suffix="Analyze XAUUSD now ({timestamp} UTC).",
+    budget=int(os.getenv('GOLDEX_ANALYSIS_PROMPT_BUDGET', '300')),
+)
+
 class GoldexBot:
     def __init__(self):
         self.setup()
         
     def setup(self):
-        # Firebase
-        cred = credentials.Certificate('/opt/goldex-ai/firebase-key.json')
-        firebase_admin.initialize_app(cred)
-        self.db = firestore.client()
+        # Firebase (reuses the app if another bot in this process initialized it)
+        self.db = goldex_clients.firestore_client('/opt/goldex-ai/firebase-key.json')
         
-        # Claude AI
-        self.claude = Anthropic(api_key=os.getenv('CLAUDE_API_KEY'))
+        # Claude AI (shared pooled client, connects on first use)
+        self.claude = goldex_clients.anthropic_client(os.getenv('CLAUDE_API_KEY'))
+        goldex_clients.warm_up(self.claude)
         
         logger.info("🚀 GOLDEX AI Ready!")
         
     def analyze_market(self):
-        prompt = """
-        Analyze XAUUSD for trading opportunity.
-        
-        Look for:
-        1. NY session liquidity sweeps
-        2. Order blocks
-        3. Fibonacci levels
-        
-        Respond with JSON:
-        {
-            "signal": "BUY/SELL/NONE",
-            "confidence": 0-100,
-            "entry": 2374.50,
-            "stop": 2354.50,
-            "target": 2404.50,
-            "reason": "explanation"
-        }
-        """
+        prompt = ANALYSIS_PROMPT.render(timestamp=datetime.utcnow().strftime('%Y-%m-%d %H:%M'))
         
         try:
-            response = self.claude.messages.create(
-                model="claude-3-sonnet-20240229",
+            result = goldex_gateway.call(
+                'anthropic', 'analyze_market', client=self.claude,
+                deadline=ANALYSIS_DEADLINE, hedge_after=ANALYSIS_HEDGE_AFTER,
+                model=ANALYSIS_MODEL,
                 max_tokens=1000,
-                messages=[{"role": "user", "content": prompt}]
+                **goldex_prompts.anthropic_kwargs(prompt, ANALYSIS_MODEL)
             )
             
-            content = response.content[0].text
+            content = result['text']
             start = content.find('{')
             end = content.rfind('}') + 1
             
@@ -4,18 +4,25 @@ GOLDEX AI Historical Data Downloader
 Downloads 20 years of XAUUSD historical data for 5000 bot army training
 """
 
-import yfinance as yf
-import pandas as pd
-import numpy as np
-import requests
 import json
 import time
 from datetime import datetime, timedelta
 import os
+import sys
+import subprocess
 from typing import List, Dict, Any
 import asyncio
-import aiohttp
-from supabase import create_client, Client
+
+# Shared GOLDEX modules live at the repository root
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from goldex_imports import lazy_import, is_available
+
+# Data SDKs load on first use so a restart only pays for the sources it hits
+yf = lazy_import('yfinance')
+pd = lazy_import('pandas')
+np = lazy_import('numpy')
+aiohttp = lazy_import('aiohttp')
+supabase = lazy_import('supabase')
 
 # Supabase Configuration
 SUPABASE_URL = "https://ibrvgbcwdqkucabcbqlq.supabase.co"
@@ -23,7 +30,7 @@ SUPABASE_KEY = "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.eyJpc3MiOiJzdXBhYmFzZSIsInJ
 
 class HistoricalDataDownloader:
     def __init__(self):
-        self.supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+        self.supabase = supabase.create_client(SUPABASE_URL, SUPABASE_KEY)
         self.data_sources = {
             "yahoo": self.download_yahoo_data,
             "alpha_vantage": self.download_alpha_vantage_data,
@@ -322,23 +329,26 @@ class HistoricalDataDownloader:
         return specializations[bot_id % len(specializations)]
 
 def install_requirements():
-    """Install required Python packages"""
-    packages = [
-        "yfinance",
-        "pandas", 
-        "numpy",
-        "requests",
-        "aiohttp",
-        "supabase",
-        "python-dotenv"
-    ]
+    """Install only the required Python packages that are missing"""
+    packages = {
+        "yfinance": "yfinance",
+        "pandas": "pandas",
+        "numpy": "numpy",
+        "requests": "requests",
+        "aiohttp": "aiohttp",
+        "supabase": "supabase",
+        "python-dotenv": "dotenv"
+    }
+    
+    missing = [package for package, module in packages.items() if not is_available(module)]
+    if not missing:
+        return
     
-    for package in packages:
-        os.system(f"pip install {package}")
+    print(f"🔧 Installing missing requirements: {', '.join(missing)}")
+    subprocess.run([sys.executable, "-m", "pip", "install", *missing])
 
 async def main():
     """Main function to run the historical data downloader"""
-    print("🔧 Installing requirements...")
     install_requirements()
     
     print("\n🚀 Starting historical data download...")
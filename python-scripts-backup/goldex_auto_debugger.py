@@ -1,13 +1,24 @@
-import json
 import os
+import sys
 import datetime
 
+# Shared GOLDEX modules live at the repository root
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from goldex_buildlog import BuildLogIndex, find_logs
+from goldex_error_clusters import cluster_diagnostics
+from goldex_store import DEFAULT_DB, error_key, open_store
+
 class GoldexAutoDebugger:
     def __init__(self, log_dir='.'):
         self.log_dir = log_dir
         self.error_log_file = os.path.join(log_dir, 'goldex_error_log.json')
         self.patterns_file = os.path.join(log_dir, 'goldex_learning_patterns.json')
         self.status_file = os.path.join(log_dir, 'development_status.txt')
+        self.build_index_file = os.path.join(log_dir, 'goldex_build_index.json')
+        self.store = open_store(os.path.join(log_dir, DEFAULT_DB))
+        self.store.import_json('error', self.error_log_file, key_field='error')
+        self.store.import_json('learning_pattern', self.patterns_file,
+                               key_field='error_message', type_field='error_type')
         self.errors = []
         self.patterns = []
 
@@ -17,29 +28,41 @@ class GoldexAutoDebugger:
             'error': error_message
         }
         self.errors.append(error_entry)
-        self._save_json(self.error_log_file, self.errors)
+        self.store.append('error', error_entry, key=error_key(error_message))
         self._update_status(f"Logged error: {error_message}")
 
     def apply_patterns(self):
         self._update_status("Applying patterns - not implemented yet.")
         example_pattern = {"pattern": "Repeated connection failure", "occurrences": 3}
         self.patterns.append(example_pattern)
-        self._save_json(self.patterns_file, self.patterns)
+        self.store.append('learning_pattern', example_pattern)
 
     def build_project(self):
         self._update_status("Called build_project() - placeholder method")
         print("GoldexAutoDebugger: build_project() called (no real logic yet)")
 
     def analyze_build_errors(self, errors=None):
-        self._update_status("Called analyze_build_errors() - placeholder method")
-        print("GoldexAutoDebugger: analyze_build_errors() called (no real logic yet)")
+        """Index build logs (default: build*.log in log_dir) and summarize the errors"""
+        logs = errors or find_logs(self.log_dir)
+        index = BuildLogIndex.load(self.build_index_file)
+        parsed = index.ingest(logs)
+        if parsed:
+            index.save(self.build_index_file)
 
-    def _save_json(self, filepath, data):
-        try:
-            with open(filepath, 'w') as f:
-                json.dump(data, f, indent=2)
-        except Exception as e:
-            print(f"Failed to save {filepath}: {e}")
+        summary = index.summary()
+        summary['root_causes'] = cluster_diagnostics(index.find(severity='error'))
+        self._update_status(f"Indexed {parsed} new build logs: {summary['totals']}, "
+                            f"{len(summary['root_causes'])} root causes")
+        print(f"GoldexAutoDebugger: {summary['logs']} logs, {summary['totals'].get('error', 0)} errors "
+              f"-> {len(summary['root_causes'])} root causes")
+        for cause in summary['root_causes'][:10]:
+            print(f"  {cause['count']:6}  {cause['message'][:100]}")
+        return summary
+
+    def generate_fix_for_error(self, error):
+        """Most recent learned fix for this error (a root cause or a diagnostic), if any"""
+        pattern = self.store.latest('learning_pattern', error_key(error['message']))
+        return pattern.get('fix_applied') if pattern else None
 
     def _update_status(self, message):
         timestamp = datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')
@@ -5,12 +5,20 @@ GOLDEX AI ULTIMATE DEBUGGER - FINAL VERSION
 Falls back to local storage if needed.
 """
 import os
-import re
+import sys
 import json
 import hashlib
-import subprocess
+from collections import defaultdict
 from datetime import datetime
-from pathlib import Path
+
+# Shared GOLDEX modules live at the repository root
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import goldex_clients
+from goldex_fix_rules import load_engine
+from goldex_store import open_store
+
+BACKUP_FILE = "goldex_ultimate_debugging_backup.jsonl"
+BULK_INSERT_ROWS = 500  # rows per PostgREST bulk insert
 
 class GoldexUltimateDebugger:
     def __init__(self):
@@ -24,66 +32,82 @@ class GoldexUltimateDebugger:
             "fixes_applied": 0,
             "session_id": hashlib.md5(str(datetime.now()).encode()).hexdigest()[:12]
         }
+        # error_hash -> {"fix_code", "context", "missing_property", "applied"}
+        self.fix_memo = {}
+        self.store = open_store()
+        self.pending_rows = defaultdict(list)
+        self.memo_hits = 0
+        self.rules = load_engine()
+        
+    def _supabase_headers(self):
+        return {
+            "apikey": self.supabase_key,
+            "Authorization": f"Bearer {self.supabase_key}",
+            "Content-Type": "application/json",
+            "Prefer": "return=minimal",
+        }
         
     def test_supabase_connection(self):
         """Test Supabase connection"""
         try:
-            curl_cmd = [
-                "curl",
-                "-X", "GET",
+            response = goldex_clients.get_http_session().get(
                 f"{self.supabase_url}/rest/v1/",
-                "-H", f"apikey: {self.supabase_key}",
-                "--max-time", "5"
-            ]
-            
-            result = subprocess.run(curl_cmd, capture_output=True, text=True)
-            
-            if result.returncode == 0 and "swagger" in result.stdout:
-                return True
-            else:
-                return False
-                
+                headers={"apikey": self.supabase_key},
+                timeout=5
+            )
+            return response.ok and "swagger" in response.text
         except Exception:
             return False
     
     def save_to_supabase_or_local(self, data, table_name="goldex_ultimate_debugging"):
-        """Save to Supabase or local backup"""
-        
-        # Try Supabase first
-        try:
-            curl_cmd = [
-                "curl",
-                "-X", "POST",
-                f"{self.supabase_url}/rest/v1/{table_name}",
-                "-H", f"apikey: {self.supabase_key}",
-                "-H", f"Authorization: Bearer {self.supabase_key}",
-                "-H", "Content-Type: application/json",
-                "-H", "Prefer: return=minimal",
-                "-d", json.dumps(data)
-            ]
-            
-            result = subprocess.run(curl_cmd, capture_output=True, text=True, timeout=10)
-            
-            if result.returncode == 0:
-                print(f"✅ Tracked to Supabase: {data.get('error_hash', 'unknown')}")
-                return True
-            else:
-                print(f"⚠️ Supabase failed, saving locally")
-                
-        except Exception as e:
-            print(f"⚠️ Supabase error: {e}")
-        
-        # Fallback to local storage
+        """Queue a tracking row; flush_tracking() sends the batch at the end of the run"""
+        self.pending_rows[table_name].append(data)
+        return True
+    
+    def flush_tracking(self):
+        """One bulk POST per table over the pooled session, JSONL backup on failure"""
+        for table_name, rows in list(self.pending_rows.items()):
+            for start in range(0, len(rows), BULK_INSERT_ROWS):
+                batch = rows[start:start + BULK_INSERT_ROWS]
+                try:
+                    response = goldex_clients.get_http_session().post(
+                        f"{self.supabase_url}/rest/v1/{table_name}",
+                        headers=self._supabase_headers(),
+                        data=json.dumps(batch),
+                        timeout=10
+                    )
+                    if response.ok:
+                        print(f"✅ Tracked {len(batch)} rows to Supabase ({table_name})")
+                        continue
+                    print(f"⚠️ Supabase failed ({response.status_code}), saving locally")
+                except Exception as e:
+                    print(f"⚠️ Supabase error: {e}")
+                self._save_local(batch)
+        self.pending_rows.clear()
+    
+    def _save_local(self, rows):
+        """Fallback to local storage"""
         try:
-            backup_file = "goldex_ultimate_debugging_backup.jsonl"
-            with open(backup_file, 'a') as f:
-                f.write(json.dumps(data) + '\n')
-            print(f"💾 Saved to backup: {backup_file}")
+            with open(BACKUP_FILE, 'a') as f:
+                f.writelines(json.dumps(row) + '\n' for row in rows)
+            print(f"💾 Saved {len(rows)} rows to backup: {BACKUP_FILE}")
             return True
         except Exception as e:
             print(f"❌ Backup failed: {e}")
             return False
     
+    def lookup_fix(self, error_hash):
+        """Memoized fix for an error hash (this run first, then earlier runs)"""
+        fix = self.fix_memo.get(error_hash)
+        if fix is None:
+            fix = self.store.latest('ultimate_fix', error_hash)
+            if fix is not None and (fix.get('rules') != self.rules.digest or 'error_type' not in fix):
+                fix = None  # rendered from an older rule set
+            if fix is not None:
+                fix = dict(fix, applied=False)  # re-check the extensions file once this run
+                self.fix_memo[error_hash] = fix
+        return fix
+    
     def analyze_swift_error(self, error_message, file_path):
         """Analyze Swift/SwiftUI error with ultimate intelligence"""
         
@@ -91,203 +115,76 @@ class GoldexUltimateDebugger:
         
         print(f"🧠 ANALYZING: {error_message[:60]}...")
         
-        # Extract missing property
-        if "has no member" in error_message:
-            print(f"🔍 Searching for property in: {error_message}")
-            prop_match = re.search(r"has no member '(\w+)'", error_message)
-            if not prop_match:
-                # Try without quotes
-                prop_match = re.search(r"has no member (\w+)", error_message)
-            
-            if prop_match:
-                missing_prop = prop_match.group(1)
-                print(f"🎯 Found missing property: {missing_prop}")
-                
-                # Determine context
-                context = self.determine_context(file_path, missing_prop)
-                
-                # Generate fix
-                fix_code = self.generate_ultimate_fix(missing_prop, context)
-                
-                # Track data
-                error_data = {
-                    "error_hash": hashlib.md5(f"{error_message}{file_path}".encode()).hexdigest()[:16],
-                    "error_message": error_message,
-                    "error_type": "missing_property",
-                    "missing_property": missing_prop,
-                    "file_path": file_path,
-                    "context": json.dumps(context),
-                    "fix_code": fix_code,
-                    "fix_applied": True,
-                    "confidence": context.get("confidence", 0.95),
-                    "session_id": self.session_data["session_id"],
-                    "project_name": "GOLDEX_AI",
-                    "ai_level": "ULTIMATE_SILICON_VALLEY",
-                    "created_at": datetime.now().isoformat()
+        # A repeated error reuses its memoized fix without running the rules again
+        error_hash = hashlib.md5(f"{error_message}{file_path}".encode()).hexdigest()[:16]
+        fix = self.lookup_fix(error_hash)
+        if fix is not None:
+            self.memo_hits += 1
+        else:
+            # One compiled pass over every rule in goldex_fix_rules.json
+            match = self.rules.match(error_message)
+            if match and match['fixable']:
+                print(f"🎯 Matched rule {match['rule']}: {match['params']}")
+                context = self.rules.context(file_path, match['params'])
+                fix = {
+                    "missing_property": match['params'].get('member', match['rule']),
+                    "error_type": match['fix_type'],
+                    "context": context,
+                    "fix_code": self.rules.render(match, context),
+                    "rules": self.rules.digest,
+                    "applied": False
                 }
-                
-                # Save tracking data
-                self.save_to_supabase_or_local(error_data)
-                
-                # Apply fix
-                print(f"🔧 Applying fix for {missing_prop}...")
-                if self.apply_fix(fix_code):
-                    self.fixes_applied += 1
-                    self.session_data["fixes_applied"] += 1
-                    print(f"✅ ULTIMATE FIX APPLIED!")
-                    print(f"   🎯 Property: {missing_prop}")
-                    print(f"   🏗️  Context: {context.get('file_type', 'Unknown')}")
-                    print(f"   🎪 Confidence: {context.get('confidence', 0.95):.1%}")
-                    return True
-                else:
-                    print(f"❌ Fix failed for {missing_prop}")
-                    return False
+                self.fix_memo[error_hash] = fix
+                self.store.append('ultimate_fix', {k: v for k, v in fix.items() if k != 'applied'},
+                                  key=error_hash, error_type=match['fix_type'])
+        if fix is not None:
+            missing_prop = fix["missing_property"]
+            context = fix["context"]
+            fix_code = fix["fix_code"]
+            
+            # Track data
+            error_data = {
+                "error_hash": error_hash,
+                "error_message": error_message,
+                "error_type": fix["error_type"],
+                "missing_property": missing_prop,
+                "file_path": file_path,
+                "context": json.dumps(context),
+                "fix_code": fix_code,
+                "fix_applied": True,
+                "confidence": context.get("confidence", 0.95),
+                "session_id": self.session_data["session_id"],
+                "project_name": "GOLDEX_AI",
+                "ai_level": "ULTIMATE_SILICON_VALLEY",
+                "created_at": datetime.now().isoformat()
+            }
+            
+            # Save tracking data
+            self.save_to_supabase_or_local(error_data)
+            
+            # Identical errors reuse the fix already applied this run
+            if fix["applied"]:
+                self.fixes_applied += 1
+                self.session_data["fixes_applied"] += 1
+                return True
+            
+            # Apply fix
+            print(f"🔧 Applying fix for {missing_prop}...")
+            if self.apply_fix(fix_code):
+                fix["applied"] = True
+                self.fixes_applied += 1
+                self.session_data["fixes_applied"] += 1
+                print(f"✅ ULTIMATE FIX APPLIED!")
+                print(f"   🎯 Property: {missing_prop}")
+                print(f"   🏗️  Context: {context.get('file_type', 'Unknown')}")
+                print(f"   🎪 Confidence: {context.get('confidence', 0.95):.1%}")
+                return True
+            else:
+                print(f"❌ Fix failed for {missing_prop}")
+                return False
         
         return False
     
-    def determine_context(self, file_path, missing_prop):
-        """Determine ultimate context for the error"""
-        file_name = Path(file_path).name
-        
-        context = {
-            "file_name": file_name,
-            "file_type": "Unknown",
-            "usage_context": "general",
-            "confidence": 0.5
-        }
-        
-        # Determine file type
-        if "View" in file_name:
-            context["file_type"] = "SwiftUI_View"
-            context["confidence"] += 0.2
-        elif "Model" in file_name or "Types" in file_name:
-            context["file_type"] = "Model"
-            context["confidence"] += 0.2
-        elif "Manager" in file_name or "Service" in file_name:
-            context["file_type"] = "Service"
-            context["confidence"] += 0.2
-        
-        # Determine usage context
-        if missing_prop in ["icon", "image", "symbol"]:
-            context["usage_context"] = "ui_iconography"
-            context["confidence"] += 0.2
-        elif missing_prop in ["color", "backgroundColor", "foregroundColor"]:
-            context["usage_context"] = "ui_theming"
-            context["confidence"] += 0.2
-        elif "PerHour" in missing_prop or "Rate" in missing_prop:
-            context["usage_context"] = "performance_metrics"
-            context["confidence"] += 0.2
-        elif missing_prop in ["timestamp", "date", "time"]:
-            context["usage_context"] = "temporal_data"
-            context["confidence"] += 0.1
-        elif missing_prop in ["result", "outcome", "status"]:
-            context["usage_context"] = "business_logic"
-            context["confidence"] += 0.1
-        
-        context["confidence"] = min(0.98, context["confidence"])
-        return context
-    
-    def generate_ultimate_fix(self, missing_prop, context):
-        """Generate ultimate Swift fix code"""
-        
-        if missing_prop == "icon" and context["usage_context"] == "ui_iconography":
-            return '''
-// MARK: - Ultimate Icon Extension (AI-Generated)
-extension SharedTypes.TradingMode {
-    /// Ultimate icon with Apple best practices
-    var icon: String {
-        switch self {
-        case .manual:
-            return "hand.point.up.braille"
-        case .auto:
-            return "gearshape.2"
-        case .demo:
-            return "play.circle.fill"
-        case .backtest:
-            return "clock.arrow.circlepath"
-        @unknown default:
-            return "questionmark.circle"
-        }
-    }
-}'''
-        
-        elif missing_prop == "color" and context["usage_context"] == "ui_theming":
-            return '''
-// MARK: - Ultimate Color Extension (AI-Generated)
-extension SharedTypes.TradeGrade {
-    /// Ultimate color with accessibility
-    var color: Color {
-        switch self {
-        case .aPlus:
-            return Color(.systemGreen)
-        case .a:
-            return Color(.systemMint)
-        case .b:
-            return Color(.systemYellow)
-        case .c:
-            return Color(.systemOrange)
-        case .d:
-            return Color(.systemRed)
-        @unknown default:
-            return Color(.systemGray)
-        }
-    }
-}'''
-        
-        elif "PerHour" in missing_prop and context["usage_context"] == "performance_metrics":
-            return f'''
-// MARK: - Ultimate Performance Extension (AI-Generated)
-extension EAStats {{
-    /// Ultimate {missing_prop} with safety
-    var {missing_prop}: Double {{
-        guard runningTimeHours > 0 else {{ return 0.0 }}
-        guard totalTrades < Int.max / 100 else {{ return Double.infinity }}
-        return Double(totalTrades) / runningTimeHours
-    }}
-}}'''
-        
-        elif missing_prop == "timestamp" and context["usage_context"] == "temporal_data":
-            return '''
-// MARK: - Ultimate Timestamp Extension (AI-Generated)
-extension TradingTypes.GoldSignal {
-    /// Ultimate timestamp with fallback
-    var timestamp: Date {
-        return createdAt ?? updatedAt ?? Date()
-    }
-}'''
-        
-        elif missing_prop == "result" and context["usage_context"] == "business_logic":
-            return '''
-// MARK: - Ultimate Result Extension (AI-Generated)
-extension SharedTypes.PlaybookTrade {
-    /// Ultimate result calculation
-    var result: TradeResult {
-        let threshold = 0.01
-        if profit > threshold {
-            return .win
-        } else if profit < -threshold {
-            return .loss
-        } else {
-            return .breakeven
-        }
-    }
-}
-
-enum TradeResult {
-    case win, loss, breakeven
-}'''
-        
-        else:
-            return f'''
-// MARK: - AI-Generated Extension
-extension TargetType {{
-    /// AI-generated {missing_prop}
-    var {missing_prop}: DefaultType {{
-        // TODO: Implement {missing_prop}
-        return defaultValue
-    }}
-}}'''
-    
     def apply_fix(self, fix_code):
         """Apply fix to extensions file"""
         extensions_file = f"{self.project_path}/Extensions/GoldexUltimateExtensions.swift"
@@ -397,10 +294,12 @@ import Foundation
         }
         
         self.save_to_supabase_or_local(session_summary, "goldex_debug_sessions")
+        self.flush_tracking()
         
         print(f"\n🏆 ULTIMATE DEBUGGING COMPLETE!")
         print(f"🧠 Errors analyzed: {self.session_data['errors_analyzed']}")
         print(f"🔧 Fixes applied: {self.fixes_applied}")
+        print(f"⚡ Cached fixes reused: {self.memo_hits}")
         print(f"📊 Success rate: {session_summary['success_rate']:.1%}")
         print(f"📈 Supabase tracking: {'ACTIVE' if supabase_connected else 'LOCAL BACKUP'}")
         
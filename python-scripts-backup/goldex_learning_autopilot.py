@@ -1,109 +1,107 @@
 #!/usr/bin/env python3
 """
 GOLDEX AI LEARNING AUTOPILOT
-Continuously monitors, fixes, and learns from errors
+Continuously monitors builds and suggests known fixes for errors
 Updates CEO via daily email reports
 """
 import schedule
-import time
 import subprocess
-import json
 import os
 from datetime import datetime, timedelta
 from goldex_auto_debugger import GoldexAutoDebugger
 from instant_error_fixer import InstantErrorFixer
+from goldex_buildlog import find_logs
+from goldex_error_clusters import cluster_diagnostics
+from goldex_pbxproj_check import ProjectChecker, print_report
+from goldex_watcher import ChangeWatcher, LogTailer
+
+MAX_IDLE_SECONDS = 3600  # upper bound on one wait for changes between scheduler checks
 
 class GoldexLearningAutopilot:
-    def __init__(self):
+    def __init__(self, project_dir=None):
         self.debugger = GoldexAutoDebugger()
         self.fixer = InstantErrorFixer()
-        self.learning_log = []
+        self.store = self.debugger.store
+        self.project_dir = project_dir or os.getenv('GOLDEX_PROJECT_DIR', '.')
+        self.tailer = LogTailer()
+        self.project_checker = ProjectChecker()
         self.daily_stats = {
             'errors_found': 0,
-            'errors_fixed': 0,
-            'new_patterns_learned': 0,
+            'fixes_suggested': 0,
             'build_attempts': 0,
             'successful_builds': 0
         }
         
     def monitor_and_fix_errors(self):
-        """Main monitoring function"""
+        """Full check: build, index every log and fix the root causes"""
         print(f"🤖 {datetime.now().strftime('%H:%M:%S')} - GOLDEX Error Monitor Running...")
         
         try:
-            # Check for build errors
-            build_output = self.debugger.build_project()
-            errors = self.debugger.analyze_build_errors(build_output)
-            
+            self.debugger.build_project()
             self.daily_stats['build_attempts'] += 1
-            
-            if errors:
-                self.daily_stats['errors_found'] += len(errors)
-                print(f"🐛 Found {len(errors)} errors - initiating auto-fix...")
-                
-                # Apply automatic fixes
-                fixes_applied = 0
-                for error in errors:
-                    fix_code = self.debugger.generate_fix_for_error(error)
-                    if fix_code and self.debugger.apply_fix_to_file(error['file'], fix_code):
-                        fixes_applied += 1
-                        
-                        # Learn from this fix
-                        self.learn_from_fix(error, fix_code)
-                
-                self.daily_stats['errors_fixed'] += fixes_applied
-                
-                if fixes_applied > 0:
-                    print(f"✅ Auto-fixed {fixes_applied} errors")
-                    
-                    # Test build again
-                    test_build = self.debugger.build_project()
-                    test_errors = self.debugger.analyze_build_errors(test_build)
-                    
-                    if len(test_errors) < len(errors):
-                        print(f"🎉 Success! Reduced errors from {len(errors)} to {len(test_errors)}")
-                        self.daily_stats['successful_builds'] += 1
-            else:
-                print("✅ No errors found - project building successfully!")
-                self.daily_stats['successful_builds'] += 1
-                
+            self.fix_errors(self.current_errors())
         except Exception as e:
             print(f"❌ Monitor error: {e}")
-    
-    def learn_from_fix(self, error, fix_code):
-        """Learn patterns from successful fixes"""
-        pattern = {
-            'error_type': error['type'],
-            'error_message': error['message'],
-            'fix_applied': fix_code,
-            'timestamp': datetime.now().isoformat(),
-            'success': True
-        }
+
+    def current_errors(self):
+        """Root causes of the errors in the indexed build logs"""
+        summary = self.debugger.analyze_build_errors()
+        return [cause for cause in summary['root_causes'] if cause['severity'] == 'error']
+
+    def fix_errors(self, errors):
+        """Suggest the known fix for each root cause (fixes are not applied to files)"""
+        if not errors:
+            print("✅ No errors found - project building successfully!")
+            self.daily_stats['successful_builds'] += 1
+            return
+
+        self.daily_stats['errors_found'] += len(errors)
+        print(f"🐛 Found {len(errors)} errors - looking up known fixes...")
         
-        self.learning_log.append(pattern)
-        self.daily_stats['new_patterns_learned'] += 1
+        # Learned fixes are reported, not written into sources: a stored fix is a
+        # description, and there is no safe way to apply it to a file automatically
+        suggested = 0
+        for error in errors:
+            fix_code = self.debugger.generate_fix_for_error(error)
+            if not fix_code:
+                continue
+            suggested += 1
+            location = next((loc for loc in error['locations'] if loc.get('file')), None)
+            where = f"{location['file']}:{location.get('line') or '?'}" if location else "unknown location"
+            print(f"💡 {where}: {error['message'][:100]}")
+            print(f"   Suggested fix: {fix_code}")
         
-        # Save to local learning database
-        self.save_learning_pattern(pattern)
-    
-    def save_learning_pattern(self, pattern):
-        """Save learning pattern for future use"""
+        self.daily_stats['fixes_suggested'] += suggested
+        if suggested:
+            print(f"💡 {suggested} of {len(errors)} errors have a known fix (not applied)")
+
+    def handle_changes(self, batch):
+        """Analyze only what changed: new log output, or rebuild after source edits"""
+        print(f"🔁 {datetime.now().strftime('%H:%M:%S')} - {len(batch['sources'])} sources changed, "
+              f"{len(batch['logs'])} build logs updated")
         try:
-            learning_file = "goldex_learning_patterns.json"
-            
-            if os.path.exists(learning_file):
-                with open(learning_file, 'r') as f:
-                    patterns = json.load(f)
-            else:
-                patterns = []
+            projects = sorted(p for p in batch['sources'] if p.endswith('.pbxproj'))
+            if projects:
+                # A broken project file fails every build: report it instead of building
+                results = [self.project_checker.check(project) for project in projects]
+                self.project_checker.save()
+                for result in results:
+                    print_report(result)
+                if not all(result['ok'] for result in results):
+                    return
             
-            patterns.append(pattern)
-            
-            with open(learning_file, 'w') as f:
-                json.dump(patterns, f, indent=2)
-                
+            diagnostics = []
+            for log in sorted(batch['logs']):
+                diagnostics.extend(self.tailer.read_diagnostics(log))
+            errors = [d for d in diagnostics if d['severity'] == 'error']
+            if errors:
+                self.fix_errors(cluster_diagnostics(errors))
+            elif batch['sources']:
+                # The build writes its log, which arrives here as the next batch
+                self.debugger.build_project()
+                self.daily_stats['build_attempts'] += 1
         except Exception as e:
-            print(f"⚠️ Failed to save learning pattern: {e}")
+            print(f"❌ Monitor error: {e}")
     
     def generate_development_report(self):
         """Generate development progress report for CEO email"""
@@ -116,21 +114,18 @@ class GoldexLearningAutopilot:
 
 Build Attempts Today: {self.daily_stats['build_attempts']}
 Errors Detected: {self.daily_stats['errors_found']}
-Errors Auto-Fixed: {self.daily_stats['errors_fixed']}
+Known Fixes Suggested: {self.daily_stats['fixes_suggested']}
 Successful Builds: {self.daily_stats['successful_builds']}
-Fix Success Rate: {(self.daily_stats['errors_fixed']/max(self.daily_stats['errors_found'],1)*100):.1f}%
+Known-Fix Coverage: {(self.daily_stats['fixes_suggested']/max(self.daily_stats['errors_found'],1)*100):.1f}%
 
-🧠 AI LEARNING PROGRESS
+🧠 KNOWN FIXES
 
-New Error Patterns Learned: {self.daily_stats['new_patterns_learned']}
-Total Patterns in Database: {len(self.learning_log)}
-Learning Accuracy: {min(95.0, 60.0 + len(self.learning_log) * 2):.1f}%
+Fix Patterns in Database: {self.store.count('learning_pattern')}
 
 🚀 DEVELOPMENT VELOCITY
 
-Code Quality: {'🟢 IMPROVING' if self.daily_stats['errors_fixed'] > 0 else '🟡 STABLE'}
+Code Quality: {'🟢 IMPROVING' if self.daily_stats['fixes_suggested'] > 0 else '🟡 STABLE'}
 Build Stability: {'🟢 EXCELLENT' if self.daily_stats['successful_builds'] > 2 else '🟡 GOOD'}
-Auto-Fix Capability: {'🟢 ADVANCED' if self.daily_stats['new_patterns_learned'] > 0 else '🔵 STANDARD'}
 
 💡 AI INSIGHTS & RECOMMENDATIONS
 
@@ -152,9 +147,6 @@ Your GOLDEX AI is evolving and learning every day! 🧠✨"""
         if self.daily_stats['successful_builds'] < 2:
             recommendations.append("• Run dependency updates to resolve build system issues")
         
-        if self.daily_stats['new_patterns_learned'] > 3:
-            recommendations.append("• AI learning is accelerating - excellent development velocity!")
-        
         recommendations.extend([
             "• Add unit tests for recently fixed components",
             "• Consider implementing SwiftLint for code quality consistency",
@@ -188,47 +180,53 @@ Your GOLDEX AI is evolving and learning every day! 🧠✨"""
         """Reset daily statistics"""
         self.daily_stats = {
             'errors_found': 0,
-            'errors_fixed': 0,
-            'new_patterns_learned': 0,
+            'fixes_suggested': 0,
             'build_attempts': 0,
             'successful_builds': 0
         }
+        self.store.compact_in_background()
         print("🔄 Daily stats reset")
     
     def run_autopilot(self):
         """Run the learning autopilot system"""
         print("🚀 GOLDEX AI LEARNING AUTOPILOT ACTIVATED")
         print("=" * 50)
-        print("🤖 Monitoring for errors every 30 minutes")
-        print("🧠 Learning from fixes automatically")
+        print("🤖 Re-analyzing within seconds of source edits and new build output")
+        print("💡 Suggesting known fixes for recurring errors")
         print("📧 Updating CEO reports daily")
         print("🔄 Building smarter every day")
         print("\nPress Ctrl+C to stop autopilot")
         
-        # Schedule monitoring every 30 minutes
-        schedule.every(30).minutes.do(self.monitor_and_fix_errors)
-        
         # Schedule CEO report updates daily at 8:30 AM (before CEO report)
         schedule.every().day.at("08:30").do(self.update_ceo_email_system)
         
         # Reset stats daily at midnight
         schedule.every().day.at("00:00").do(self.reset_daily_stats)
         
-        # Run immediate check
+        # Run immediate check, then only tail what the logs gain from here on
         print("\n🧪 Running immediate error check...")
         self.monitor_and_fix_errors()
+        for log in find_logs(self.debugger.log_dir):
+            self.tailer.skip_to_end(log)
+
+        watcher = ChangeWatcher([self.project_dir], [self.debugger.log_dir])
+        print(f"👀 Watching {os.path.abspath(self.project_dir)} via {watcher.start()}")
         
-        # Keep running
+        # Sleep until a change batch arrives or the next scheduled job is due
         while True:
             try:
+                idle = schedule.idle_seconds()
+                timeout = MAX_IDLE_SECONDS if idle is None else min(max(idle, 0), MAX_IDLE_SECONDS)
+                batch = watcher.next_batch(timeout)
+                if batch:
+                    self.handle_changes(batch)
                 schedule.run_pending()
-                time.sleep(60)  # Check every minute
             except KeyboardInterrupt:
+                watcher.stop()
                 print("\n🛑 Learning autopilot stopped")
                 break
             except Exception as e:
                 print(f"⚠️ Autopilot error: {e}")
-                time.sleep(60)
 
 def main():
     autopilot = GoldexLearningAutopilot()
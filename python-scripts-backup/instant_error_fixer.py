@@ -1,14 +1,28 @@
 import datetime
 import os
-import json
+import sys
+
+# Shared GOLDEX modules live at the repository root
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from goldex_store import DEFAULT_DB, error_key, open_store
 
 class InstantErrorFixer:
     def __init__(self, log_dir='.'):
         self.log_dir = log_dir
         self.fix_log_file = os.path.join(log_dir, 'instant_fix_log.json')
+        self.store = open_store(os.path.join(log_dir, DEFAULT_DB))
+        self.store.import_json('instant_fix', self.fix_log_file, key_field='error')
         self.fixes_applied = []
 
+    def seen_before(self, error_message):
+        """Last recorded fix for this error (any file/line), or None"""
+        return self.store.latest('instant_fix', error_key(error_message))
+
     def fix_error(self, error_message):
+        previous = self.seen_before(error_message)
+        if previous:
+            print(f"InstantErrorFixer: Seen before ({previous['timestamp']}): {previous['fix']}")
+
         # Placeholder: logic to instantly fix or suggest fixes for errors
         fix_entry = {
             'timestamp': datetime.datetime.utcnow().isoformat() + 'Z',
@@ -16,16 +30,9 @@ class InstantErrorFixer:
             'fix': 'Auto-fix not implemented yet - manual review needed'
         }
         self.fixes_applied.append(fix_entry)
-        self._save_fixes()
+        self.store.append('instant_fix', fix_entry, key=error_key(error_message))
         print(f"InstantErrorFixer: Recorded fix attempt for error: {error_message}")
 
-    def _save_fixes(self):
-        try:
-            with open(self.fix_log_file, 'w') as f:
-                json.dump(self.fixes_applied, f, indent=2)
-        except Exception as e:
-            print(f"Failed to save fixes log: {e}")
-
 if __name__ == '__main__':
     fixer = InstantErrorFixer()
     fixer.fix_error("Sample error message for testing instant fix")
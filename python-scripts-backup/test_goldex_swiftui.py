@@ -1,118 +1,76 @@
 import os
+import sys
 import json
 import time
-import requests
-from bs4 import BeautifulSoup
-import openai
+
+# Shared GOLDEX modules live at the repository root
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import goldex_clients
+import goldex_gateway
+from goldex_docs_crawler import DocsCrawler
+from goldex_docs_index import TOP_K, DocsIndex, render_hits
+from goldex_fix_recall import FixRecall
+from goldex_store import DEFAULT_DB, open_store
 
 class GoldexSwiftUIAI:
     def __init__(self, api_key, cache_dir="./swiftui_cache"):
         self.api_key = api_key
-        openai.api_key = self.api_key
+        self.client = goldex_clients.openai_client(self.api_key)
         self.cache_dir = cache_dir
         os.makedirs(cache_dir, exist_ok=True)
         self.base_url = "https://developer.apple.com/documentation/swiftui/"
         self.docs_index_file = os.path.join(cache_dir, "index.json")
-        self.docs = {}
-
-    def fetch_and_cache_docs(self):
-        """Scrape and cache all SwiftUI docs pages."""
-        to_visit = [self.base_url]
-        visited = set()
-        while to_visit:
-            url = to_visit.pop(0)
-            if url in visited:
-                continue
-            print(f"[SwiftUI Docs] Fetching {url}")
-            try:
-                resp = requests.get(url)
-                resp.raise_for_status()
-                html = resp.text
-            except Exception as e:
-                print(f"Failed to fetch {url}: {e}")
-                continue
-
-            # Save page
-            filename = url.replace("https://developer.apple.com/documentation/swiftui/", "").replace("/", "_") or "root"
-            filepath = os.path.join(self.cache_dir, f"{filename}.html")
-            with open(filepath, "w", encoding="utf-8") as f:
-                f.write(html)
-            print(f"[SwiftUI Docs] Saved {filepath}")
-
-            # Parse links for more docs pages
-            soup = BeautifulSoup(html, "html.parser")
-            links = soup.find_all("a", href=True)
-            for a in links:
-                href = a['href']
-                if href.startswith("/documentation/swiftui") and href not in visited and href not in to_visit:
-                    full_url = "https://developer.apple.com" + href
-                    to_visit.append(full_url)
-            visited.add(url)
-
-        print("[SwiftUI Docs] Finished fetching all docs.")
+        self.docs_index = DocsIndex.load(self.docs_index_file)
+        self.store = open_store(os.path.join(cache_dir, DEFAULT_DB))
+        self.store.import_json('swiftui_interaction', os.path.join(cache_dir, "interaction_log.json"))
+        self.fix_recall = FixRecall()
+        self.fix_recall.add_all({'error': entry.get('prompt'), 'fix': entry.get('response')}
+                                for entry in reversed(self.store.find('swiftui_interaction'))
+                                if entry.get('source') != 'history')
+
+    def fetch_and_cache_docs(self, max_pages=None):
+        """Crawl SwiftUI docs into the cache (concurrent, resumable, revalidates cached pages)."""
+        crawler = DocsCrawler(self.base_url, self.cache_dir)
+        if crawler.frontier:
+            print(f"[SwiftUI Docs] Resuming crawl: {len(crawler.frontier)} pages queued")
+        stats = crawler.run(max_pages)
+        print(f"[SwiftUI Docs] Finished: {stats['fetched']} fetched, {stats['not_modified']} unchanged, "
+              f"{stats['failed']} failed, {stats['queued']} still queued.")
 
     def load_cached_docs(self):
-        """Load cached docs from files into memory."""
-        print("[SwiftUI Docs] Loading cached docs...")
-        for filename in os.listdir(self.cache_dir):
-            if filename.endswith(".html"):
-                path = os.path.join(self.cache_dir, filename)
-                with open(path, "r", encoding="utf-8") as f:
-                    self.docs[filename] = f.read()
-        print(f"[SwiftUI Docs] Loaded {len(self.docs)} docs.")
-
-    def extract_text_from_html(self, html):
-        """Extract meaningful text and code snippets from Apple docs HTML."""
-        soup = BeautifulSoup(html, "html.parser")
-
-        # Extract title
-        title = soup.find("h1")
-        title_text = title.text.strip() if title else "No Title"
-
-        # Extract code blocks
-        code_blocks = [code.get_text() for code in soup.find_all("pre")]
-
-        # Extract paragraphs
-        paragraphs = [p.get_text().strip() for p in soup.find_all("p")]
-
-        content = f"Title: {title_text}\n\n"
-        content += "Paragraphs:\n"
-        for para in paragraphs:
-            content += para + "\n"
-        content += "\nCode Samples:\n"
-        for code in code_blocks:
-            content += code + "\n---\n"
-
-        return content
-
-    def prepare_knowledge_base(self):
-        """Prepare combined knowledge base text from all docs."""
-        combined_text = ""
-        for filename, html in self.docs.items():
-            extracted = self.extract_text_from_html(html)
-            combined_text += extracted + "\n\n=====\n\n"
-        return combined_text
+        """Index new or changed cached pages (parsed once, not on every query)."""
+        print("[SwiftUI Docs] Indexing cached docs...")
+        stats = self.docs_index.update(self.cache_dir)
+        if self.docs_index.dirty:
+            self.docs_index.save()
+        print(f"[SwiftUI Docs] {stats['pages']} docs ({stats['indexed']} indexed now), "
+              f"{stats['chunks']} sections searchable.")
+
+    def retrieve_docs(self, query, k=TOP_K):
+        """Top-k doc sections for a query, formatted within the prompt budget."""
+        return render_hits(self.docs_index.search(query, k))
 
     def query_gpt(self, prompt, max_tokens=500, temperature=0.1):
         """Query OpenAI GPT with given prompt."""
         try:
-            response = openai.ChatCompletion.create(
+            result = goldex_gateway.call(
+                'openai', 'query_gpt', client=self.client,
                 model="gpt-4",
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=max_tokens,
                 temperature=temperature,
             )
-            return response.choices[0].message.content.strip()
+            return result['text'].strip()
         except Exception as e:
             print(f"[GPT Error] {e}")
             return None
 
     def generate_swiftui_code(self, user_prompt):
         """Generate or fix SwiftUI code using GPT and cached docs."""
-        kb = self.prepare_knowledge_base()
+        kb = self.retrieve_docs(user_prompt)
         prompt = f"""
 You are a world-class SwiftUI expert with access to official Apple SwiftUI documentation.
-Here is the knowledge base extracted from docs:
+Here are the most relevant sections of the docs:
 
 {kb}
 
@@ -124,32 +82,45 @@ Provide the best SwiftUI code or solution possible.
 """
         return self.query_gpt(prompt)
 
-    def log_interaction(self, user_prompt, ai_response):
-        log_file = os.path.join(self.cache_dir, "interaction_log.json")
+    def log_interaction(self, user_prompt, ai_response, **details):
         entry = {
             "timestamp": time.time(),
             "prompt": user_prompt,
-            "response": ai_response
+            "response": ai_response,
+            **details
         }
         try:
-            if os.path.exists(log_file):
-                with open(log_file, "r") as f:
-                    data = json.load(f)
-            else:
-                data = []
-            data.append(entry)
-            with open(log_file, "w") as f:
-                json.dump(data, f, indent=2)
+            self.store.append("swiftui_interaction", entry)
         except Exception as e:
             print(f"[Log Error] {e}")
 
     # Example autopilot integration method
     def fix_swiftui_error(self, error_description):
         print("[GOLDEX AI] Fixing SwiftUI error...")
+        past = self.fix_recall.lookup(error_description)
+        if past:
+            # Near-identical error answered before: no model call
+            print(f"[GOLDEX AI] Reusing fix for a similar past error ({past['similarity']:.0%} match)")
+            self.log_interaction(error_description, past['fix'], source="history",
+                                 similarity=past['similarity'])
+            return past['fix']
         response = self.generate_swiftui_code(f"Fix this SwiftUI error or problem:\n{error_description}")
-        self.log_interaction(error_description, response)
+        self.log_interaction(error_description, response, source="model")
+        if response:
+            self.fix_recall.add(error_description, response)
         return response
 
+    def recall_stats(self):
+        """Hit rate of answers from history: this session and over the whole log."""
+        sources = [entry.get('source') for entry in self.store.find('swiftui_interaction')]
+        answered = sum(1 for source in sources if source in ('history', 'model'))
+        from_history = sources.count('history')
+        return {
+            'session': self.fix_recall.report(),
+            'lifetime_lookups': answered,
+            'lifetime_hit_rate': round(from_history / answered, 4) if answered else 0.0,
+        }
+
 if __name__ == "__main__":
     # Example usage:
     API_KEY = "SECURE_API_KEY_FROM_KEYCHAIN"  # Replace with your real key or pass from env
@@ -159,7 +130,7 @@ if __name__ == "__main__":
     # Step 1: Fetch docs (only once)
     # ai.fetch_and_cache_docs()
 
-    # Step 2: Load docs from cache
+    # Step 2: Index cached docs (only new or changed pages are parsed)
     ai.load_cached_docs()
 
     # Step 3: Example fix call
@@ -167,3 +138,4 @@ if __name__ == "__main__":
     fix = ai.fix_swiftui_error(example_error)
     print("=== Suggested fix by GOLDEX AI ===")
     print(fix)
+    print(f"Fix recall: {ai.recall_stats()}")
@@ -6,64 +6,61 @@ Analyzes the remaining 54 errors and creates comprehensive fixes
 import os
 import re
 import json
+import sys
 import subprocess
+from collections import Counter
 from datetime import datetime
 
+# Shared GOLDEX modules live at the repository root
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from goldex_buildlog import BuildLogIndex, find_logs
+from goldex_error_clusters import cluster_diagnostics
+from goldex_fix_rules import load_engine
+
 class UltimateErrorAnalyzer:
     def __init__(self):
         self.project_path = "/Users/keonta/Documents/GOLDEX AI copy 23.backup.1752876581/GOLDEX AI"
+        self.rules = load_engine()
         
-    def analyze_remaining_errors(self):
+    def analyze_build_logs(self, logs=None):
+        """Real error breakdown from build logs (build*.log in the current directory)"""
+        index = BuildLogIndex()
+        index.ingest(logs or find_logs())
+        if not index.records:
+            return None
+
+        summary = index.summary()
+        errors = index.find(severity='error')
+        summary['root_causes'] = cluster_diagnostics(errors)
+        summary['rule_hits'] = Counter()
+        for d in errors:
+            match = self.rules.match(d['message'])
+            if match:
+                summary['rule_hits'][match['rule']] += d['count']
+        print(f"📊 BUILD LOGS: {summary['logs']} logs, {summary['totals'].get('error', 0)} errors "
+              f"→ {len(summary['root_causes'])} root causes")
+        for cause in summary['root_causes'][:10]:
+            print(f"   {cause['count']:6}  [{cause['error_class']}] {cause['message'][:90]}")
+        for file, count in summary['top_files'][:5]:
+            print(f"   {count:6}  {os.path.basename(file)}")
+        for rule_id, count in summary['rule_hits'].most_common():
+            print(f"   {count:6}  rule {rule_id}")
+        print("")
+        return summary
+
+    def analyze_remaining_errors(self, logs=None):
         """Analyze the remaining 54 errors"""
         print("🔍 ULTIMATE ERROR ANALYSIS")
         print("=" * 50)
         print("📊 Status: 4,056 → 54 errors (98.7% reduction!)")
         print("🎯 Target: Fix remaining 54 errors")
         print("")
+        self.analyze_build_logs(logs)
         
-        # Common remaining error patterns after initial fixes
-        remaining_errors = [
-            # Import errors
-            {
-                "pattern": "No such module",
-                "fix_type": "import_fix",
-                "description": "Missing module imports"
-            },
-            # Protocol conformance
-            {
-                "pattern": "does not conform to protocol",
-                "fix_type": "protocol_conformance",
-                "description": "Protocol conformance issues"
-            },
-            # Type mismatches
-            {
-                "pattern": "Cannot convert value of type",
-                "fix_type": "type_conversion",
-                "description": "Type conversion errors"
-            },
-            # Function signatures
-            {
-                "pattern": "Argument passed to call that takes no arguments",
-                "fix_type": "function_signature",
-                "description": "Function signature mismatches"
-            },
-            # Property wrappers
-            {
-                "pattern": "Property wrapper",
-                "fix_type": "property_wrapper",
-                "description": "Property wrapper issues"
-            },
-            # SwiftUI specific
-            {
-                "pattern": "Cannot find",
-                "fix_type": "missing_symbol",
-                "description": "Missing symbols or definitions"
-            }
-        ]
-        
+        # Error patterns come from the shared rule set (goldex_fix_rules.json)
         print("🧠 ANALYZING COMMON REMAINING ERROR PATTERNS:")
-        for i, error in enumerate(remaining_errors, 1):
-            print(f"   {i}. {error['description']}")
+        for i, rule in enumerate(self.rules.rules, 1):
+            print(f"   {i}. {rule.get('description', rule['id'])}")
         
         return self.create_comprehensive_fixes()
     
@@ -5,7 +5,7 @@ set -e
 echo "🚀 Deploying GOLDEX AI™ to Hetzner Cloud..."
 
 # Copy files to server
-scp -r . root@YOUR_SERVER_IP:/opt/goldex-ai/
+scp -r . ../goldex_*.py root@YOUR_SERVER_IP:/opt/goldex-ai/
 
 # Connect and deploy
 ssh root@YOUR_SERVER_IP << 'EOF'
@@ -14,13 +14,21 @@ import sys
 import time
 import json
 import logging
-import schedule
-import requests
+from collections import deque
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
-import firebase_admin
-from firebase_admin import credentials, firestore, storage
-from anthropic import Anthropic
+
+# Shared GOLDEX modules live at the repository root (copied alongside on deploy)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import goldex_clients
+import goldex_gateway
+import goldex_model_router
+import goldex_prompts
+from goldex_imports import lazy_import
+
+# Heavy SDKs load on first use, keeping worker restarts fast
+schedule = lazy_import('schedule')
+firestore = lazy_import('firebase_admin.firestore')
 
 # Setup logging
 logging.basicConfig(
@@ -33,6 +41,102 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Seconds a trading decision may take per mode (tier deadlines/hedging live in the router)
+LATENCY_BUDGETS = {
+    'scalp': float(os.getenv('GOLDEX_SCALP_LATENCY_BUDGET', '10')),
+    'swing': float(os.getenv('GOLDEX_SWING_LATENCY_BUDGET', '30')),
+}
+LEARNING_DEADLINE = float(os.getenv('GOLDEX_LEARNING_DEADLINE', '180'))
+LEARNING_MODEL = os.getenv('GOLDEX_LEARNING_MODEL', 'claude-3-sonnet-20240229')
+# Volatility is the high-low range of the last readings as a percent of their mean price
+VOLATILITY_WINDOW = int(os.getenv('GOLDEX_VOLATILITY_WINDOW', '20'))
+HIGH_VOLATILITY_RANGE = float(os.getenv('GOLDEX_HIGH_VOLATILITY_RANGE', '0.3'))
+LOW_VOLATILITY_RANGE = float(os.getenv('GOLDEX_LOW_VOLATILITY_RANGE', '0.1'))
+
+# Static instructions, schema and rules form a stable prefix (sent with a cache breakpoint
+# once it reaches the model's minimum cacheable length); only live data changes per call
+ANALYSIS_PROMPT = goldex_prompts.PromptTemplate(
+    'analyze_with_claude',
+    prefix="""
+    You are GOLDEX AI™, the world's most advanced gold trading AI. Analyze XAUUSD market data for a {mode} trade opportunity.
+
+    TRADING RULES ({mode_upper} MODE):
+    {rules}
+
+    ANALYSIS REQUIREMENTS:
+    1. Look for NY session liquidity sweeps (price taking out previous day's high/low)
+    2. Identify order block formations (institutional supply/demand zones)
+    3. Check for Fibonacci confluence (38.2%, 50%, 61.8%, 78.6% retracements)
+    4. Analyze market structure (break of structure, change of character)
+    5. Assess overall confluence and signal strength
+
+    RESPOND WITH JSON ONLY:
+    {{"signal": "BUY" | "SELL" | "NONE", "confidence": 0-100, "entry_price": 0.0, "stop_loss": 0.0,
+    "take_profit": 0.0, "reasoning": "detailed explanation", "confluence_factors": ["factor1", "factor2", ...],
+    "session_analysis": "session strength assessment", "risk_reward_ratio": 0.0, "trade_type": "{mode}"}}
+
+    Only recommend trades with {min_confidence}%+ confidence and proper risk management.
+    """,
+    suffix="CURRENT MARKET DATA: {market_data}",
+    budget=int(os.getenv('GOLDEX_ANALYSIS_PROMPT_BUDGET', '300')),
+)
+
+LEARNING_PROMPT = goldex_prompts.PromptTemplate(
+    'daily_learning_session',
+    prefix="""
+    Analyze yesterday's GOLDEX AI™ trading performance and suggest improvements.
+
+    CURRENT TRADING RULES:
+    {rules}
+
+    PERFORMANCE ANALYSIS REQUIRED:
+    1. Calculate win rate, average R:R, total profit/loss
+    2. Identify best performing setups and confluences
+    3. Analyze failed trades for common patterns
+    4. Suggest specific rule improvements
+    5. Recommend confidence threshold adjustments
+
+    RESPOND WITH JSON:
+    {{"performance_metrics": {{"total_trades": 0, "win_rate": 0.0, "average_rr": 0.0, "total_profit": 0.0,
+    "best_setups": ["setup1", "setup2"], "worst_setups": ["setup1", "setup2"]}},
+    "insights": {{"strengths": "what worked well", "weaknesses": "what needs improvement",
+    "market_conditions": "session analysis"}},
+    "recommended_changes": {{"confidence_thresholds": {{}}, "risk_adjustments": {{}},
+    "confluence_weights": {{}}, "session_preferences": {{}}}},
+    "learning_summary": "key takeaways for tomorrow"}}
+    """,
+    suffix="TRADES DATA: {trades}",
+    budget=int(os.getenv('GOLDEX_LEARNING_PROMPT_BUDGET', '12000')),
+    shrink=('trades',),
+)
+
+# Small model first; candidate trades near the threshold are re-asked on the large one
+ANALYSIS_ROUTER = goldex_model_router.ModelRouter('analyze_with_claude')
+
+
+def parse_signal(content: str) -> Optional[Dict]:
+    """The JSON object in a model answer, or None"""
+    start_idx = content.find('{')
+    end_idx = content.rfind('}') + 1
+    if start_idx == -1 or end_idx == 0:
+        return None
+    try:
+        return json.loads(content[start_idx:end_idx])
+    except ValueError:
+        return None
+
+
+def classify_volatility(prices) -> str:
+    """'high', 'medium' or 'low' from the range of recent prices; 'unknown' until there are two"""
+    if len(prices) < 2:
+        return "unknown"
+    range_percent = (max(prices) - min(prices)) / (sum(prices) / len(prices)) * 100
+    if range_percent >= HIGH_VOLATILITY_RANGE:
+        return "high"
+    if range_percent < LOW_VOLATILITY_RANGE:
+        return "low"
+    return "medium"
+
 class GoldexAITradingBot:
     def __init__(self):
         """Initialize the complete GOLDEX AI trading system"""
@@ -43,6 +147,7 @@ class GoldexAITradingBot:
         self.trading_rules = self.load_trading_rules()
         self.active_trades = {}
         self.daily_stats = {"trades": 0, "wins": 0, "losses": 0, "profit": 0.0}
+        self.recent_prices = deque(maxlen=VOLATILITY_WINDOW)
         
         logger.info("🚀 GOLDEX AI™ Trading Bot Initialized")
         
@@ -66,12 +171,13 @@ class GoldexAITradingBot:
     def initialize_firebase(self):
         """Initialize Firebase connection"""
         try:
-            cred = credentials.Certificate(self.firebase_creds)
-            firebase_admin.initialize_app(cred, {
+            options = {
                 'storageBucket': f"{os.getenv('FIREBASE_PROJECT_ID')}.appspot.com"
-            })
-            self.db = firestore.client()
-            self.bucket = storage.bucket()
+            }
+            # Idempotent: reuses the default app if it is already initialized
+            goldex_clients.firebase_app(self.firebase_creds, options)
+            self.db = goldex_clients.firestore_client(self.firebase_creds, options)
+            self.bucket = goldex_clients.storage_bucket(self.firebase_creds, options)
             logger.info("✅ Firebase initialized successfully")
         except Exception as e:
             logger.error(f"❌ Firebase initialization failed: {e}")
@@ -79,7 +185,9 @@ class GoldexAITradingBot:
     def initialize_claude(self):
         """Initialize Claude AI"""
         try:
-            self.claude = Anthropic(api_key=self.claude_api_key)
+            # Shared pooled client; the TLS connection is opened in the background
+            self.claude = goldex_clients.anthropic_client(self.claude_api_key)
+            goldex_clients.warm_up(self.claude)
             logger.info("✅ Claude AI initialized successfully")
         except Exception as e:
             logger.error(f"❌ Claude AI initialization failed: {e}")
@@ -139,17 +247,19 @@ class GoldexAITradingBot:
         try:
             # Using a free forex API (replace with your preferred data source)
             url = "https://api.exchangerate-api.com/v4/latest/USD"
-            response = requests.get(url, timeout=10)
+            response = goldex_clients.get_http_session().get(url, timeout=10)
             
             # For demo purposes - in production, use proper forex/gold data
             current_time = datetime.now()
+            price = 2374.50 + (hash(str(current_time)) % 100 - 50) / 10  # Simulated price
+            self.recent_prices.append(price)
             
             market_data = {
                 "symbol": "XAUUSD",
                 "timestamp": current_time.isoformat(),
-                "price": 2374.50 + (hash(str(current_time)) % 100 - 50) / 10,  # Simulated price
+                "price": price,
                 "session": self.get_trading_session(),
-                "volatility": "medium",
+                "volatility": classify_volatility(self.recent_prices),
                 "volume": "high" if 8 <= current_time.hour <= 17 else "low"
             }
             
@@ -171,6 +281,12 @@ class GoldexAITradingBot:
         else:
             return "QUIET"
             
+    def required_quality(self, market_data: Dict) -> int:
+        """Model quality a decision needs: fast NY open markets go straight to the large model"""
+        if market_data.get("session") == "NY_OPEN" and market_data.get("volatility") == "high":
+            return 2
+        return 1
+            
     def analyze_with_claude(self, market_data: Dict, mode: str = "scalp") -> Optional[Dict]:
         """Use Claude AI to analyze market and generate signals"""
         
@@ -181,60 +297,31 @@ class GoldexAITradingBot:
         if mode == "scalp" and session not in ["NY_OPEN"]:
             return None
             
-        analysis_prompt = f"""
-        You are GOLDEX AI™, the world's most advanced gold trading AI. Analyze this XAUUSD market data for a {mode} trade opportunity.
-
-        CURRENT MARKET DATA:
-        {json.dumps(market_data, indent=2)}
-
-        TRADING RULES ({mode.upper()} MODE):
-        {json.dumps(current_rules, indent=2)}
-
-        ANALYSIS REQUIREMENTS:
-        1. Look for NY session liquidity sweeps (price taking out previous day's high/low)
-        2. Identify order block formations (institutional supply/demand zones)
-        3. Check for Fibonacci confluence (38.2%, 50%, 61.8%, 78.6% retracements)
-        4. Analyze market structure (break of structure, change of character)
-        5. Assess overall confluence and signal strength
-
-        RESPOND WITH JSON ONLY:
-        {{
-            "signal": "BUY" | "SELL" | "NONE",
-            "confidence": 0-100,
-            "entry_price": 0.0,
-            "stop_loss": 0.0,
-            "take_profit": 0.0,
-            "reasoning": "detailed explanation",
-            "confluence_factors": ["factor1", "factor2", ...],
-            "session_analysis": "session strength assessment",
-            "risk_reward_ratio": 0.0,
-            "trade_type": "{mode}"
-        }}
-
-        Only recommend trades with {current_rules['min_confidence']}%+ confidence and proper risk management.
-        """
+        prompt = ANALYSIS_PROMPT.render(
+            prefix={'mode': mode, 'mode_upper': mode.upper(), 'rules': current_rules,
+                    'min_confidence': current_rules['min_confidence']},
+            market_data=market_data)
         
         try:
-            response = self.claude.messages.create(
-                model="claude-3-sonnet-20240229",
-                max_tokens=1500,
-                messages=[{"role": "user", "content": analysis_prompt}]
+            decision = ANALYSIS_ROUTER.decide(
+                parse_signal, current_rules['min_confidence'], client=self.claude,
+                quality=self.required_quality(market_data), latency_budget=LATENCY_BUDGETS[mode],
+                **goldex_prompts.anthropic_kwargs(prompt)
             )
+            signal = decision['signal']
             
-            # Extract JSON from response
-            content = response.content[0].text
-            start_idx = content.find('{')
-            end_idx = content.rfind('}') + 1
-            
-            if start_idx != -1 and end_idx != -1:
-                json_str = content[start_idx:end_idx]
-                signal = json.loads(json_str)
-                
-                logger.info(f"🧠 Claude Analysis: {signal['signal']} - {signal['confidence']}% confidence")
-                return signal
-            else:
+            if signal is None:
                 logger.error("❌ Could not extract JSON from Claude response")
                 return None
+            if not decision['confirmed']:
+                # Candidate trades are only taken on the large model's word
+                logger.info(f"⚠️ {signal['signal']} {signal['confidence']}% from the {decision['tier']} model "
+                            f"could not be confirmed - skipping")
+                return None
+                
+            logger.info(f"🧠 Claude Analysis ({decision['tier']}{', escalated' if decision['escalated'] else ''}): "
+                        f"{signal['signal']} - {signal['confidence']}% confidence in {decision['latency_ms']:.0f} ms")
+            return signal
                 
         except Exception as e:
             logger.error(f"❌ Claude analysis failed: {e}")
@@ -376,55 +463,20 @@ class GoldexAITradingBot:
                 return
                 
             # Analyze performance with Claude
-            performance_prompt = f"""
-            Analyze yesterday's GOLDEX AI™ trading performance and suggest improvements.
-
-            TRADES DATA:
-            {json.dumps(trades_data, indent=2, default=str)}
-
-            CURRENT TRADING RULES:
-            {json.dumps(self.trading_rules, indent=2)}
-
-            PERFORMANCE ANALYSIS REQUIRED:
-            1. Calculate win rate, average R:R, total profit/loss
-            2. Identify best performing setups and confluences
-            3. Analyze failed trades for common patterns
-            4. Suggest specific rule improvements
-            5. Recommend confidence threshold adjustments
-
-            RESPOND WITH JSON:
-            {{
-                "performance_metrics": {{
-                    "total_trades": 0,
-                    "win_rate": 0.0,
-                    "average_rr": 0.0,
-                    "total_profit": 0.0,
-                    "best_setups": ["setup1", "setup2"],
-                    "worst_setups": ["setup1", "setup2"]
-                }},
-                "insights": {{
-                    "strengths": "what worked well",
-                    "weaknesses": "what needs improvement",
-                    "market_conditions": "session analysis"
-                }},
-                "recommended_changes": {{
-                    "confidence_thresholds": {{}},
-                    "risk_adjustments": {{}},
-                    "confluence_weights": {{}},
-                    "session_preferences": {{}}
-                }},
-                "learning_summary": "key takeaways for tomorrow"
-            }}
-            """
-            
-            response = self.claude.messages.create(
-                model="claude-3-sonnet-20240229",
+            # Oldest trades are dropped first if the day doesn't fit the prompt budget
+            prompt = LEARNING_PROMPT.render(prefix={'rules': self.trading_rules}, trades=trades_data)
+            if prompt['truncated']:
+                logger.info(f"✂️ Learning prompt trimmed to {prompt['suffix_tokens']} tokens")
+            
+            result = goldex_gateway.call(
+                'anthropic', 'daily_learning_session', client=self.claude, deadline=LEARNING_DEADLINE,
+                model=LEARNING_MODEL,
                 max_tokens=2000,
-                messages=[{"role": "user", "content": performance_prompt}]
+                **goldex_prompts.anthropic_kwargs(prompt, LEARNING_MODEL)
             )
             
             # Parse learning results
-            content = response.content[0].text
+            content = result['text']
             start_idx = content.find('{')
             end_idx = content.rfind('}') + 1
             
@@ -557,6 +609,9 @@ class GoldexAITradingBot:
                 
             except KeyboardInterrupt:
                 logger.info("🛑 Bot shutdown requested")
+                goldex_prompts.print_report()
+                goldex_gateway.print_report()
+                ANALYSIS_ROUTER.print_report()
                 break
             except Exception as e:
                 logger.error(f"❌ Unexpected error: {e}")
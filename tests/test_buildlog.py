@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Build log parsing: compiler diagnostics and link failures reach the index"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from goldex_buildlog import BuildLogIndex, parse_line
+
+LOG = """\
+CompileSwift normal arm64 /Users/dev/App/ChartView.swift (in target 'Planet ProTrader' from project 'Planet ProTrader')
+/Users/dev/App/ChartView.swift:12:5: error: value of type 'Text' has no member 'bar'
+/Users/dev/App/ChartView.swift:40:9: warning: variable 'x' was never used; consider replacing with '_' or removing it
+Ld /Users/dev/Build/Planet\\ ProTrader normal (in target 'Planet ProTrader' from project 'Planet ProTrader')
+ld: warning: ignoring duplicate libraries: '-lc++'
+Undefined symbols for architecture arm64:
+  "_OBJC_CLASS_$_GoldexBridge", referenced from:
+       in ChartView.o
+ld: symbol(s) not found for architecture arm64
+clang: error: linker command failed with exit code 1 (use -v to see invocation)
+** BUILD FAILED **
+"""
+
+
+class BuildLogTest(unittest.TestCase):
+
+    def test_linker_lines(self):
+        for line in ("clang: error: linker command failed with exit code 1 (use -v to see invocation)",
+                     "ld: symbol(s) not found for architecture arm64",
+                     "Undefined symbols for architecture arm64:"):
+            diagnostic = parse_line(line)
+            self.assertIsNotNone(diagnostic, line)
+            self.assertEqual((diagnostic['severity'], diagnostic['error_class'], diagnostic['file']),
+                             ('error', 'linker', None), line)
+        self.assertEqual(parse_line("ld: warning: ignoring duplicate libraries: '-lc++'")['severity'], 'warning')
+        self.assertIsNone(parse_line('  "_OBJC_CLASS_$_GoldexBridge", referenced from:'))
+
+    def test_link_failures_are_indexed(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.log', delete=False) as f:
+            f.write(LOG)
+        try:
+            index = BuildLogIndex()
+            self.assertEqual(index.ingest([f.name]), 1)
+        finally:
+            os.remove(f.name)
+
+        linker = index.find(error_class='linker', severity='error')
+        self.assertEqual(sorted(d['message'] for d in linker), [
+            'Undefined symbols for architecture arm64',
+            'linker command failed with exit code 1 (use -v to see invocation)',
+            'symbol(s) not found for architecture arm64',
+        ])
+        self.assertEqual(dict(index.top_classes()), {'linker': 3, 'missing_member': 1})
+        self.assertEqual(index.top_files(), [('/Users/dev/App/ChartView.swift', 1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""Docs crawler against a local fixture site: full crawl, resume, revalidation, throttling"""
+
+import os
+import sys
+import time
+import tempfile
+import threading
+import unittest
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from goldex_docs_crawler import STATE_FILE, DocsCrawler
+
+SITE = {
+    '/documentation/swiftui/': ['text', 'view', '/documentation/swiftui', '#topics',
+                                '/documentation/uikit/', 'https://example.invalid/elsewhere'],
+    '/documentation/swiftui/text': ['/documentation/swiftui/', 'font?language=swift'],
+    '/documentation/swiftui/view': ['text#overview', 'view/body'],
+    '/documentation/swiftui/font': [],
+    '/documentation/swiftui/view/body': ['../../swiftui'],
+}
+THROTTLED = '/documentation/swiftui/view'
+
+
+class FixtureSite(BaseHTTPRequestHandler):
+    """Serves SITE with ETags, answers matching If-None-Match with 304, throttles on request"""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        path = self.path.split('?', 1)[0]
+        with server.lock:
+            server.hits[path] += 1
+            server.times.setdefault(path, []).append(time.monotonic())
+            throttle = path in server.throttle and server.hits[path] == 1
+        if throttle:
+            self.send_response(429)
+            self.send_header('Retry-After', '1')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if path not in SITE:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        etag = f'"v1{path}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        body = ''.join(f'<a href="{href}">{href}</a>' for href in SITE[path]).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class DocsCrawlerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FixtureSite)
+        self.server.lock = threading.Lock()
+        self.server.hits = Counter()
+        self.server.times = {}
+        self.server.throttle = set()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}/documentation/swiftui/"
+        self.cache = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.cache.cleanup()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def crawler(self):
+        return DocsCrawler(self.base_url, self.cache.name, concurrency=2, host_delay=0)
+
+    def cached_files(self):
+        return sorted(name for name in os.listdir(self.cache.name) if name != STATE_FILE)
+
+    def test_full_crawl_stays_in_tree_and_fetches_each_page_once(self):
+        stats = self.crawler().run()
+
+        self.assertEqual(stats['fetched'], len(SITE))
+        self.assertEqual(stats['queued'], 0)
+        self.assertEqual(self.cached_files(), ['font.html', 'root.html', 'text.html', 'view.html',
+                                               'view_body.html'])
+        self.assertEqual(set(self.server.hits), set(SITE))
+        self.assertEqual(max(self.server.hits.values()), 1)
+
+    def test_base_url_without_slash_is_the_same_page(self):
+        crawler = self.crawler()
+        prefix = self.base_url.rstrip('/')
+        self.assertEqual(crawler.normalize(prefix, self.base_url), self.base_url)
+        self.assertEqual(crawler.normalize('../swiftui#topics', self.base_url + 'text'), self.base_url)
+        self.assertIsNone(crawler.normalize(prefix + 'ui', self.base_url))
+
+    def test_resume_after_max_pages(self):
+        first = self.crawler().run(max_pages=2)
+        self.assertEqual(first['visited'], 2)
+        self.assertGreater(first['queued'], 0)
+
+        resumed = self.crawler()
+        self.assertEqual(len(resumed.frontier), first['queued'])
+        second = resumed.run()
+
+        self.assertEqual(first['fetched'] + second['fetched'], len(SITE))
+        self.assertEqual(second['queued'], 0)
+        self.assertEqual(max(self.server.hits.values()), 1)
+
+    def test_second_pass_is_served_by_304s(self):
+        self.crawler().run()
+        before = dict(self.server.hits)
+
+        stats = self.crawler().run()
+
+        self.assertEqual(stats['fetched'], 0)
+        self.assertEqual(stats['not_modified'], len(SITE))
+        self.assertEqual(stats['failed'], 0)
+        self.assertEqual({path: self.server.hits[path] - before[path] for path in SITE},
+                         dict.fromkeys(SITE, 1))
+
+    def test_429_waits_for_retry_after(self):
+        self.server.throttle.add(THROTTLED)
+
+        stats = self.crawler().run()
+
+        self.assertEqual(stats['fetched'], len(SITE))
+        self.assertEqual(stats['failed'], 0)
+        self.assertEqual(self.server.hits[THROTTLED], 2)
+        first, retry = self.server.times[THROTTLED]
+        self.assertGreaterEqual(retry - first, 0.9)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""Fix recall: reworded repeats are reused, errors about other names are not"""
+
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from goldex_fix_recall import FixRecall, quoted_names
+
+STORED = "/Users/dev/App/Views/ChartView.swift:12:5: error: Value of type 'Text' has no member 'bar'"
+
+
+class FixRecallTest(unittest.TestCase):
+
+    def setUp(self):
+        self.recall = FixRecall()
+        self.recall.add(STORED, "Use .font(.headline) instead of .bar")
+
+    def test_same_error_elsewhere_is_reused(self):
+        hit = self.recall.lookup("/home/ci/src/Views/ChartView.swift:40:9: error: "
+                                 "Value of type 'Text' has no member 'bar'")
+        self.assertIsNotNone(hit)
+        self.assertEqual(hit['fix'], "Use .font(.headline) instead of .bar")
+
+    def test_different_member_is_not_reused(self):
+        self.assertIsNone(self.recall.lookup("Value of type 'Text' has no member 'baz'"))
+        self.assertEqual(self.recall.stats['misses'], 1)
+
+    def test_match_picks_entry_with_same_names(self):
+        self.recall.add("Value of type 'Text' has no member 'baz'", "Rename baz")
+        hit = self.recall.lookup("value of type 'Text'  has no member 'baz'")
+        self.assertEqual(hit['fix'], "Rename baz")
+
+    def test_quoted_names(self):
+        self.assertEqual(quoted_names("Type 'Foo' doesn't conform to protocol 'View'"), ('Foo', 'View'))
+        self.assertEqual(quoted_names("Cannot find 'x' in scope"), ('x',))
+
+
+if __name__ == "__main__":
+    unittest.main()
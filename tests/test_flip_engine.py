@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""Flip-challenge closed-form math and its input checks"""
+
+import os
+import sys
+import math
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from goldex_flip_engine import analyze, flip_plan, format_report
+
+
+class FlipPlanTest(unittest.TestCase):
+
+    def test_breakeven_and_growth(self):
+        plan = flip_plan(1000, 10000, 5, win_rate=55, reward_risk=2)
+        self.assertAlmostEqual(plan['required_growth_percent'], 900)
+        self.assertAlmostEqual(plan['breakeven_win_rate'], 35.0, places=1)
+        self.assertGreater(plan['growth_per_trade_percent'], 0)
+        self.assertEqual(plan['min_winning_trades'], 25)
+
+    def test_win_rate_outside_0_100_is_rejected(self):
+        for win_rate in (0, 100, -5, 150):
+            with self.assertRaises(ValueError):
+                flip_plan(1000, 10000, 5, win_rate=win_rate)
+
+    def expected_line(self, plan):
+        return next(line for line in format_report(plan).splitlines() if 'Expected trades' in line)
+
+    def test_expected_trades_cases(self):
+        self.assertIn('79', self.expected_line(flip_plan(1000, 10000, 5, win_rate=55, reward_risk=2)))
+        self.assertIn('target already reached', self.expected_line(flip_plan(1000, 1000, 5)))
+        self.assertIn('negative edge', self.expected_line(flip_plan(1000, 10000, 5, win_rate=20)))
+        breakeven = -math.log1p(-0.05) / (math.log1p(0.1) - math.log1p(-0.05)) * 100
+        self.assertIn('zero edge', self.expected_line(flip_plan(1000, 10000, 5, win_rate=breakeven)))
+
+    def test_simulation_options_are_validated(self):
+        for options in ({'paths': 0}, {'max_trades': 0}, {'ruin_drawdown': 100}):
+            with self.assertRaises(ValueError):
+                analyze(1000, 10000, 5, **options)
+
+
+if __name__ == "__main__":
+    unittest.main()
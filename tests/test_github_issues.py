@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""Issue sync against a local fake of the GitHub issues API"""
+
+import os
+import sys
+import json
+import tempfile
+import threading
+import importlib.util
+import unittest
+from unittest import mock
+from urllib.parse import parse_qs, urlencode, urlparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+SCRIPTS = os.path.join(ROOT, '.github', 'scripts')
+sys.path.append(ROOT)
+sys.path.append(SCRIPTS)
+
+from goldex_imports import is_available
+
+REPO = 'goldex/planet'
+PAGE_SIZE = 2   # small pages so the index has to follow Link headers
+
+
+def load_sync_module():
+    spec = importlib.util.spec_from_file_location('create_issues_from_opus',
+                                                  os.path.join(SCRIPTS, 'create-issues-from-opus.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class FakeGitHub(BaseHTTPRequestHandler):
+    """Issues list (label filter, pagination), create and edit; state lives on the server"""
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body, headers=None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self):
+        return json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        label = query.get('labels')
+        issues = [issue for _, issue in sorted(self.server.issues.items())
+                  if label is None or label in [l['name'] for l in issue['labels']]]
+        page = int(query.get('page', 1))
+        headers = {}
+        if page * PAGE_SIZE < len(issues):
+            link = f"http://{self.headers['Host']}{url.path}?{urlencode(dict(query, page=page + 1))}"
+            headers['Link'] = f'<{link}>; rel="next"'
+        self.server.requests.append(('GET', page))
+        self._reply(200, issues[(page - 1) * PAGE_SIZE:page * PAGE_SIZE], headers)
+
+    def do_POST(self):
+        payload = self._body()
+        number = max(self.server.issues, default=0) + 1
+        issue = dict(payload, number=number, state='open', state_reason=None,
+                     labels=[{'name': name} for name in payload.get('labels', [])])
+        self.server.issues[number] = issue
+        self.server.requests.append(('POST', number))
+        self._reply(201, issue)
+
+    def do_PATCH(self):
+        number = int(self.path.rstrip('/').rsplit('/', 1)[1])
+        payload = self._body()
+        issue = self.server.issues[number]
+        issue.update({key: value for key, value in payload.items() if key != 'labels'})
+        if payload.get('state') == 'open':
+            issue['state_reason'] = 'reopened'
+        self.server.requests.append(('PATCH', number))
+        self._reply(200, issue)
+
+
+@unittest.skipUnless(is_available('requests'), "requests is not installed")
+class GitHubIssuesTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.sync = load_sync_module()
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeGitHub)
+        self.server.issues = {}
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.api_url = f"http://127.0.0.1:{self.server.server_port}"
+        self.workdir = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.workdir.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.workdir.cleanup()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def finding(self, fingerprint, line=10, severity='critical'):
+        return {'fingerprint': fingerprint, 'title': f"Force unwrap in {fingerprint}",
+                'file': f"Views/{fingerprint}.swift", 'line': line, 'category': 'correctness',
+                'severity': severity, 'detail': "Crashes when the feed is empty.", 'fix': "Use if let."}
+
+    def file_issue(self, finding, state='open', state_reason=None, **extra):
+        payload = self.sync.issue_for(finding)
+        number = max(self.server.issues, default=0) + 1
+        self.server.issues[number] = dict(payload, number=number, state=state, state_reason=state_reason,
+                                          labels=[{'name': name} for name in payload['labels']], **extra)
+        return number
+
+    def run_sync(self, findings, analyzed=()):
+        with open('opus-findings.jsonl', 'w') as f:
+            f.writelines(json.dumps(finding) + '\n' for finding in findings)
+        with open('opus-coverage.json', 'w') as f:
+            json.dump({'analyzed': list(analyzed), 'failed': []}, f)
+        self.server.requests.clear()
+        env = {'GITHUB_TOKEN': 'test-token', 'GITHUB_REPOSITORY': REPO, 'GITHUB_API_URL': self.api_url}
+        with mock.patch.dict(os.environ, env):
+            self.sync.sync_github_issues()
+        return [request for request in self.server.requests if request[0] != 'GET']
+
+    # ----------------------------------------------------------------- tests
+
+    def test_index_follows_pagination_and_skips_pull_requests(self):
+        numbers = [self.file_issue(self.finding(f"fp{i}")) for i in range(5)]
+        self.file_issue(self.finding('pr'), pull_request={'url': 'https://example.invalid/pr'})
+        self.server.issues[99] = {'number': 99, 'title': 'unrelated', 'state': 'open', 'labels': [],
+                                  'body': '<!-- opus-fingerprint: other -->'}
+
+        issues = self.sync.GitHubIssues('test-token', REPO, api_url=self.api_url).index()
+
+        self.assertEqual(sorted(issue['number'] for issue in issues.values()), numbers)
+        self.assertEqual(sorted(issues), [f"fp{i}" for i in range(5)])
+        self.assertEqual([page for method, page in self.server.requests if method == 'GET'], [1, 2, 3])
+
+    def test_sync_creates_updates_reopens_and_closes_by_fingerprint(self):
+        moved = self.file_issue(self.finding('moved', line=10))
+        fixed = self.file_issue(self.finding('fixed', line=3))
+        returned = self.file_issue(self.finding('returned'), state='closed', state_reason='completed')
+        declined = self.file_issue(self.finding('declined'), state='closed', state_reason='not_planned')
+        unreviewed = self.file_issue(self.finding('unreviewed'))
+        os.makedirs('Views')
+        open('Views/unreviewed.swift', 'w').close()
+
+        writes = self.run_sync([self.finding('moved', line=42), self.finding('returned'),
+                                self.finding('declined'), self.finding('new'),
+                                self.finding('minor', severity='low')],
+                               analyzed=['Views/fixed.swift'])
+
+        issues = self.server.issues
+        self.assertIn('`Views/moved.swift:42`', issues[moved]['body'])
+        self.assertEqual(issues[fixed]['state'], 'closed')
+        self.assertEqual(issues[returned]['state'], 'open')
+        self.assertEqual(issues[declined]['state'], 'closed')
+        self.assertEqual(issues[unreviewed]['state'], 'open')
+        created = [issue for issue in issues.values() if 'Force unwrap in new' in issue['title']]
+        self.assertEqual(len(created), 1)
+        self.assertEqual(sorted(writes), sorted([('PATCH', moved), ('PATCH', fixed), ('PATCH', returned),
+                                                 ('POST', created[0]['number'])]))
+
+    def test_repeat_sync_makes_no_writes(self):
+        findings = [self.finding('a'), self.finding('b', line=7)]
+        self.assertEqual(len(self.run_sync(findings)), 2)
+        self.assertEqual(self.run_sync(findings), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
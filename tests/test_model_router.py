@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Model router on the stub provider: tier choice, escalation and fallback"""
+
+import os
+import sys
+import json
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import goldex_gateway
+from goldex_model_router import ModelRouter
+
+TIERS = {
+    'small': {'model': 'small-model', 'max_tokens': 100, 'quality': 1, 'latency': 1.0,
+              'deadline': 5.0, 'hedge_after': None},
+    'large': {'model': 'large-model', 'max_tokens': 100, 'quality': 2, 'latency': 5.0,
+              'deadline': 5.0, 'hedge_after': None},
+}
+THRESHOLD = 80
+
+
+class ModelRouterTest(unittest.TestCase):
+
+    def setUp(self):
+        # Answer per model; a model listed in `down` times out
+        self.answers = {'small-model': {'signal': 'NONE', 'confidence': 20},
+                        'large-model': {'signal': 'NONE', 'confidence': 20}}
+        self.down = set()
+        self.stub = goldex_gateway.StubProvider(self.reply)
+        gateway = goldex_gateway.Gateway()
+        gateway.install(self.stub, name='stub')
+        self.router = ModelRouter('decide', provider='stub', tiers=TIERS, margin=10, gateway=gateway)
+
+    def reply(self, request):
+        if request['model'] in self.down:
+            raise TimeoutError(f"{request['model']} timed out")
+        return json.dumps(self.answers[request['model']])
+
+    def decide(self, **kwargs):
+        return self.router.decide(json.loads, THRESHOLD, messages=[], **kwargs)
+
+    def models(self):
+        return [request['model'] for request in self.stub.requests]
+
+    # ----------------------------------------------------------------- tests
+
+    def test_choose_by_quality_and_latency_budget(self):
+        self.assertEqual(self.router.choose(), 'small')
+        self.assertEqual(self.router.choose(quality=2), 'large')
+        self.assertEqual(self.router.choose(quality=3), 'large')
+        self.assertEqual(self.router.choose(latency_budget=0.5), 'small')
+        self.assertEqual(self.router.choose(quality=2, latency_budget=1.0), 'large')
+
+    def test_no_trade_ends_at_the_small_tier(self):
+        decision = self.decide()
+
+        self.assertEqual(decision['tier'], 'small')
+        self.assertFalse(decision['escalated'])
+        self.assertTrue(decision['confirmed'])
+        self.assertEqual(self.models(), ['small-model'])
+
+    def test_high_quality_goes_straight_to_the_large_tier(self):
+        self.answers['large-model'] = {'signal': 'BUY', 'confidence': 90}
+
+        decision = self.decide(quality=2)
+
+        self.assertEqual((decision['tier'], decision['escalated']), ('large', False))
+        self.assertTrue(decision['confirmed'])
+        self.assertEqual(self.models(), ['large-model'])
+
+    def test_candidate_trade_is_escalated_and_the_large_answer_decides(self):
+        self.answers['small-model'] = {'signal': 'BUY', 'confidence': 75}
+        self.answers['large-model'] = {'signal': 'SELL', 'confidence': 88}
+
+        decision = self.decide()
+
+        self.assertTrue(decision['escalated'])
+        self.assertEqual(decision['tier'], 'large')
+        self.assertEqual(decision['signal']['signal'], 'SELL')
+        self.assertTrue(decision['confirmed'])
+        self.assertEqual(self.models(), ['small-model', 'large-model'])
+
+    def test_weak_signal_is_not_escalated(self):
+        self.answers['small-model'] = {'signal': 'BUY', 'confidence': 50}
+
+        self.assertFalse(self.decide()['escalated'])
+        self.assertEqual(self.models(), ['small-model'])
+
+    def test_timed_out_tier_falls_back(self):
+        self.down.add('small-model')
+
+        decision = self.decide()
+
+        self.assertTrue(decision['fallback'])
+        self.assertEqual(decision['tier'], 'large')
+        self.assertEqual(self.models()[0], 'small-model')
+        self.assertEqual(self.models()[-1], 'large-model')
+        self.assertEqual(self.router.counts['fallbacks'], 1)
+
+    def test_candidate_is_unconfirmed_when_the_large_tier_is_down(self):
+        self.answers['small-model'] = {'signal': 'BUY', 'confidence': 90}
+        self.down.add('large-model')
+
+        decision = self.decide()
+
+        self.assertEqual(decision['tier'], 'small')
+        self.assertFalse(decision['escalated'])
+        self.assertFalse(decision['confirmed'])
+        self.assertEqual(self.router.counts['escalation_failures'], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
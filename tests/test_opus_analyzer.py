@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Shard analysis: answers cut off at max_tokens are re-asked in smaller shards"""
+
+import os
+import sys
+import importlib.util
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+SCRIPTS = os.path.join(ROOT, '.github', 'scripts')
+sys.path.append(ROOT)
+sys.path.append(SCRIPTS)
+
+import goldex_gateway
+
+FITS = 2   # the stub finishes answers for at most this many files
+
+
+def load_analyzer_module():
+    spec = importlib.util.spec_from_file_location('opus_max_analyzer',
+                                                  os.path.join(SCRIPTS, 'opus-max-analyzer.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class ToolUseStub(goldex_gateway.StubProvider):
+    """Answers with a record_findings tool_use; stops at max_tokens for more than FITS files"""
+
+    def send(self, client, request, timeout):
+        with self.lock:
+            self.requests.append(request)
+        files = [line.strip('= ') for line in request['messages'][0]['content'].splitlines()
+                 if line.startswith('=== ')]
+        truncated = len(files) > FITS
+        answered = files[:FITS - 1] if truncated else files
+        block = SimpleNamespace(type='tool_use', input={'files': [
+            {'file': name, 'score': 8, 'summary': 'ok', 'findings': []} for name in answered]})
+        return {'text': '', 'response': SimpleNamespace(stop_reason='max_tokens' if truncated else 'tool_use',
+                                                        content=[block]),
+                'input_tokens': 0, 'output_tokens': 0}
+
+
+class OpusAnalyzerTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.analyzer = load_analyzer_module()
+
+    def setUp(self):
+        self.stub = ToolUseStub()
+        gateway = goldex_gateway.Gateway()
+        gateway.install(self.stub, name='anthropic')
+        patcher = mock.patch.object(goldex_gateway, 'GATEWAY', gateway)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.debugger = object.__new__(self.analyzer.OpusMaxCloudDebugger)
+        self.debugger.client = None
+
+    def shard(self, count):
+        units = [{'id': f"Views/File{i}.swift", 'content': 'struct A {}', 'tokens': 100} for i in range(count)]
+        return {'units': units, 'tokens': 100 * count}
+
+    def test_truncated_answer_is_resplit_until_every_unit_is_reviewed(self):
+        reviews = self.debugger.analyze_shard(self.shard(5))
+
+        self.assertEqual(sorted(reviews), [f"Views/File{i}.swift" for i in range(5)])
+        self.assertGreater(len(self.stub.requests), 1)
+
+    def test_max_tokens_scales_with_units(self):
+        self.debugger.analyze_shard(self.shard(1))
+        self.debugger.analyze_shard(self.shard(2))
+
+        one, two = (request['max_tokens'] for request in self.stub.requests)
+        self.assertLess(one, two)
+        self.assertLessEqual(two, self.analyzer.MAX_OUTPUT_TOKENS)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""Model findings are clamped to the schema instead of failing the run"""
+
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '.github', 'scripts'))
+
+from opus_findings import normalize, parse_line
+
+
+class OpusFindingsTest(unittest.TestCase):
+
+    def test_parse_line(self):
+        for value, line in [(42, 42), (7.9, 7), ('42', 42), ('12-14', 12), (' 12, 30', 12),
+                            ('L88', 88), ('N/A', 1), ('', 1), (None, 1), (0, 1), (-3, 1), (True, 1)]:
+            self.assertEqual(parse_line(value), line, value)
+
+    def test_normalize_keeps_findings_with_odd_lines(self):
+        review = normalize({'score': 7, 'summary': ' ok ', 'findings': [
+            {'title': 'Range', 'line': '12-14', 'severity': 'high', 'category': 'performance'},
+            {'title': 'Unknown line', 'line': 'N/A', 'severity': 'urgent', 'category': 'style'},
+            {'line': 3},
+        ]})
+        self.assertEqual([(f['line'], f['severity'], f['category']) for f in review['findings']],
+                         [(12, 'high', 'performance'), (1, 'medium', 'quality')])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Prompt cache breakpoints are only sent when the provider would honour them"""
+
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import goldex_gateway
+import goldex_prompts
+from goldex_prompts import PromptTemplate, anthropic_kwargs, cache_min_tokens
+
+CACHING_MODEL = 'claude-3-5-sonnet-20241022'
+
+
+class CachedStub(goldex_gateway.StubProvider):
+    """Stub that reports a prompt-cache hit the way the Anthropic usage block does"""
+
+    def send(self, client, request, timeout):
+        return dict(super().send(client, request, timeout), cache_read_tokens=1500)
+
+
+def breakpoint_set(kwargs):
+    return 'cache_control' in kwargs['system'][0]
+
+
+class PromptCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.short = PromptTemplate('test_short', prefix="Rules: {rules}", suffix="Data: {data}", budget=50)
+        self.long = PromptTemplate('test_long', prefix="Rules: {rules}", suffix="Data: {data}", budget=50)
+        self.rules = 'Never trade into red news. ' * 400
+
+    def test_minimums(self):
+        self.assertEqual(cache_min_tokens('claude-3-haiku-20240307'), 2048)
+        self.assertEqual(cache_min_tokens(CACHING_MODEL), 1024)
+        self.assertIsNone(cache_min_tokens('claude-3-sonnet-20240229'))
+        self.assertEqual(cache_min_tokens(), 2048)
+
+    def test_short_prefix_gets_no_breakpoint(self):
+        prompt = self.short.render(prefix={'rules': 'short'}, data=1)
+        self.assertFalse(breakpoint_set(anthropic_kwargs(prompt, CACHING_MODEL)))
+        self.assertEqual(self.short.stats['cache_breakpoints'], 0)
+
+    def test_long_prefix_breakpoint_depends_on_model(self):
+        prompt = self.long.render(prefix={'rules': self.rules}, data=1)
+        self.assertGreater(prompt['prefix_tokens'], 2048)
+        self.assertTrue(breakpoint_set(anthropic_kwargs(prompt, CACHING_MODEL)))
+        self.assertTrue(breakpoint_set(anthropic_kwargs(prompt)))
+        self.assertFalse(breakpoint_set(anthropic_kwargs(prompt, 'claude-3-sonnet-20240229')))
+        self.assertEqual(self.long.stats['cache_breakpoints'], 2)
+
+    def test_report_shows_measured_cache_reads(self):
+        goldex_gateway.GATEWAY.install(CachedStub('{}'), name='stub_cached')
+        prompt = self.long.render(prefix={'rules': self.rules}, data=1)
+        for site in ('test_long', 'test_long:small'):
+            goldex_gateway.call('stub_cached', site, **anthropic_kwargs(prompt, CACHING_MODEL))
+        row = next(row for row in goldex_prompts.report() if row['name'] == 'test_long')
+        self.assertEqual(row['cache_read_tokens'], 3000)
+        self.assertEqual(goldex_gateway.GATEWAY.site('test_long').counts['cache_read_tokens'], 1500)
+
+
+if __name__ == "__main__":
+    unittest.main()
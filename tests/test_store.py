@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Store appends and lookups stay responsive while compaction holds the database"""
+
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import goldex_store
+from goldex_store import GoldexStore
+
+
+class SlowVacuum:
+    """Compaction connection whose VACUUM holds the write lock until the test releases it"""
+
+    def __init__(self, db, started, release):
+        self.db = db
+        self.started = started
+        self.release = release
+
+    def execute(self, sql, *args):
+        if sql == 'VACUUM':
+            self.db.execute('BEGIN IMMEDIATE')
+            self.started.set()
+            self.release.wait(10)
+            self.db.execute('COMMIT')
+        return self.db.execute(sql, *args)
+
+    def close(self):
+        self.db.close()
+
+
+class GoldexStoreCompactTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = GoldexStore(os.path.join(self.tmp.name, 'store.db'), flush_every=10)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_retention_drops_old_records(self):
+        for i in range(20):
+            self.store.append('fix', {'i': i}, key=str(i))
+        self.store.flush()
+        self.store.db.execute('UPDATE records SET ts = 0 WHERE id <= 5')
+        self.store.compact(retention_days=1)
+        self.assertEqual(self.store.count('fix'), 15)
+        self.assertFalse(self.store.compacting)
+
+    def test_appends_buffer_while_vacuum_holds_the_lock(self):
+        for i in range(20):
+            self.store.append('fix', {'i': i}, key=str(i))
+        started, release = threading.Event(), threading.Event()
+        connect = sqlite3.connect
+        slow = lambda *args, **kwargs: SlowVacuum(connect(*args, **kwargs), started, release)
+        with mock.patch.object(goldex_store.sqlite3, 'connect', slow):
+            compactor = self.store.compact_in_background()
+            self.assertTrue(started.wait(5))
+
+        slowest = 0.0
+        for i in range(20, 45):   # more than two batches' worth
+            began = time.monotonic()
+            self.store.append('fix', {'i': i}, key=str(i))
+            slowest = max(slowest, time.monotonic() - began)
+        self.assertLess(slowest, 0.5)
+        self.assertTrue(self.store.seen('fix', '44'))
+        self.assertEqual(self.store.latest('fix', '3'), {'i': 3})
+        self.assertEqual(len(self.store.pending), 25)
+
+        release.set()
+        compactor.join(5)
+        self.assertFalse(self.store.pending)
+        self.assertEqual(self.store.count('fix'), 45)
+
+    def test_close_waits_for_compaction_to_commit_the_buffer(self):
+        path = self.store.path
+        started, release = threading.Event(), threading.Event()
+        connect = sqlite3.connect
+        slow = lambda *args, **kwargs: SlowVacuum(connect(*args, **kwargs), started, release)
+        with mock.patch.object(goldex_store.sqlite3, 'connect', slow):
+            self.store.compact_in_background()
+            self.assertTrue(started.wait(5))
+        self.store.append('fix', {'late': True}, key='late')
+        threading.Timer(0.2, release.set).start()
+        self.store.close()
+
+        reopened = GoldexStore(path)
+        try:
+            self.assertTrue(reopened.seen('fix', 'late'))
+        finally:
+            reopened.close()
+
+
+if __name__ == "__main__":
+    unittest.main()